@@ -0,0 +1,90 @@
+# Per-session Firebase ID tokens: refreshed with the refresh token ahead of expiry,
+# in the background while the current token is still good, so signed-in users stay
+# signed in past the one-hour ID token lifetime.
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+TOKEN_LIFETIME_SECONDS = 3600 # Used when the sign-in response has no expiresIn
+REFRESH_AHEAD_SECONDS = 600 # Start a background refresh this long before expiry
+REFRESH_BLOCKING_SECONDS = 60 # Closer than this, the caller waits for a fresh token
+REFRESH_WORKERS = 4
+
+_refresh_executor = ThreadPoolExecutor(max_workers=REFRESH_WORKERS, thread_name_prefix="token-refresh")
+
+
+class AuthSession:
+    """
+    The signed-in user of one Streamlit session (kept in st.session_state).
+
+    token() returns a usable ID token. Within `refresh_ahead` seconds of expiry it
+    returns the current token and starts a refresh on a background thread. It
+    only blocks when the token is about to expire (or has) and no refresh has
+    finished. `user` is the sign-in response; its idToken/refreshToken are
+    updated in place, so code still reading st.session_state['user_info'] sees
+    the new token too. `auth` needs a refresh(refresh_token) method (PooledAuth,
+    FakeAuth).
+    """
+
+    def __init__(self, auth, user, refresh_ahead=REFRESH_AHEAD_SECONDS, refresh_blocking=REFRESH_BLOCKING_SECONDS,
+                 clock=time.time):
+        self._auth = auth
+        self.user = user
+        self.refresh_ahead = refresh_ahead
+        self.refresh_blocking = refresh_blocking
+        self._clock = clock
+        self._expires_at = clock() + float(user.get("expiresIn") or TOKEN_LIFETIME_SECONDS)
+        self._lock = threading.Lock() # Guards _refreshing
+        self._refresh_lock = threading.Lock() # One token exchange at a time
+        self._refreshing = None # Future of the background refresh in progress
+        self.refreshes = 0
+
+    @property
+    def uid(self):
+        return self.user["localId"]
+
+    @property
+    def expires_at(self):
+        return self._expires_at
+
+    def token(self):
+        """A valid ID token; raises if the session can't be refreshed (e.g. revoked)."""
+        remaining = self._expires_at - self._clock()
+        if remaining <= self.refresh_blocking:
+            self.refresh()
+        elif remaining <= self.refresh_ahead:
+            self._refresh_in_background()
+        return self.user["idToken"]
+
+    __call__ = token # So the session can be passed wherever a token provider is expected
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing is None:
+                self._refreshing = _refresh_executor.submit(self._background_refresh)
+
+    def _background_refresh(self):
+        try:
+            self.refresh()
+        except Exception as e: # The next token() call retries, blocking once it's urgent
+            logger.warning("Background token refresh for %s failed: %s", self.user.get("localId"), e)
+        finally:
+            with self._lock:
+                self._refreshing = None
+
+    def refresh(self):
+        """Exchanges the refresh token for a new ID token now (concurrent callers share one exchange)."""
+        expires_at = self._expires_at
+        with self._refresh_lock:
+            if self._expires_at != expires_at: # Someone else refreshed while we waited
+                return
+            started = self._clock()
+            response = self._auth.refresh(self.user["refreshToken"])
+            self.user["refreshToken"] = response.get("refreshToken") or self.user["refreshToken"]
+            self.user["idToken"] = response["idToken"]
+            self._expires_at = started + float(response.get("expiresIn") or TOKEN_LIFETIME_SECONDS)
+            self.refreshes += 1
+
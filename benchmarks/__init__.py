@@ -0,0 +1 @@
+# Benchmarks and headless load tests; run from the repo root, e.g. `python -m benchmarks.bench_numerology`
@@ -0,0 +1,119 @@
+# Chat broker load test against the in-memory Realtime Database fake: thousands of
+# concurrent user <-> expert conversations on one broker, each side replying to the
+# other, then checks every message was persisted and pages back in order.
+#
+#   python -m benchmarks.bench_chat [--conversations 5000] [--messages 10] [--think 1.0] [--firebase-latency 0.02] [--output results.json]
+import asyncio
+import random
+import time
+
+import chat
+from benchmarks import fakes
+from benchmarks.load_test import peak_rss_mb
+from benchmarks.results import benchmark_main, latency_stats
+
+EXPERTS = 50 # Each expert takes part in conversations / EXPERTS conversations at once
+
+
+async def _participant(broker, chat_id, subscription, role, token, messages, think, sent_at, latencies, rng):
+    """One side of a conversation: the user speaks on even turns, the expert replies on odd ones."""
+    for turn in range(messages):
+        if (turn % 2 == 0) == (role == chat.USER):
+            if think:
+                await asyncio.sleep(rng.uniform(0, 2 * think))
+            message = await broker.publish_async(chat_id, role, f"message {turn} from {role}", token)
+            sent_at[message.key] = time.perf_counter()
+        else:
+            received = await subscription.get()
+            while received.role == role: # Fan-out also echoes our own messages back
+                received = await subscription.get()
+            latencies.append(time.perf_counter() - sent_at.pop(received.key))
+    subscription.close()
+
+
+async def _conversation(broker, index, messages, think, sent_at, latencies, rng):
+    expert = f"expert{index % EXPERTS}"
+    chat_id = chat.conversation_id(f"user{index}", expert)
+    await asyncio.gather(*(
+        _participant(broker, chat_id, broker.subscribe(chat_id), role, token, messages, think, sent_at, latencies, rng)
+        for role, token in ((chat.USER, f"token-user{index}"), (chat.EXPERT, f"token-{expert}"))
+    ))
+    return chat_id
+
+
+def check_history(broker, chat_ids, messages, page_size):
+    """Walks every sampled conversation back page by page; all messages must come back in order."""
+    for chat_id in chat_ids:
+        history, cursor = broker.history(chat_id, None, limit=page_size)
+        while cursor is not None:
+            page, cursor = broker.history(chat_id, None, before=cursor, limit=page_size)
+            history = page + history
+        expected = [f"message {turn} from {chat.USER if turn % 2 == 0 else chat.EXPERT}" for turn in range(messages)]
+        if [message.text for message in history] != expected:
+            raise AssertionError(f"history of {chat_id} came back wrong: {len(history)} messages")
+
+
+def run(conversations=5000, messages=10, think=1.0, firebase_latency=0.02, page_size=chat.PAGE_SIZE,
+        sample=200, seed=42):
+    rng = random.Random(seed)
+    client = fakes.FakeFirebaseClient(firebase_latency)
+    broker = chat.ChatBroker(chat.ChatStore(client.database))
+    sent_at = {} # message key -> publish time
+    latencies = []
+
+    async def converse():
+        return await asyncio.gather(*(_conversation(broker, i, messages, think, sent_at, latencies, rng)
+                                      for i in range(conversations)))
+
+    start = time.perf_counter()
+    chat_ids = broker.run(converse())
+    converse_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    broker.flush()
+    drain_seconds = time.perf_counter() - start
+
+    stored = sum(len(thread) for thread in client.data.get(chat.CHAT_PATH, {}).values())
+    if stored != conversations * messages:
+        raise AssertionError(f"{stored} messages persisted, expected {conversations * messages}")
+    check_history(broker, rng.sample(chat_ids, min(sample, len(chat_ids))), messages, page_size)
+    stats = dict(broker.stats)
+    broker.close()
+
+    return {
+        "conversations": conversations,
+        "messages_per_conversation": messages,
+        "think_seconds": think,
+        "firebase_latency": firebase_latency,
+        "messages": stats["published"],
+        "converse_seconds": converse_seconds,
+        "messages_per_second": stats["published"] / converse_seconds,
+        "final_flush_seconds": drain_seconds,
+        "database_writes": stats["writes"],
+        "messages_per_write": stats["persisted"] / max(1, stats["writes"]),
+        "failed": stats["failed"],
+        "peak_rss_mb": peak_rss_mb(),
+        "delivery": latency_stats(latencies),
+    }
+
+
+def print_report(report):
+    print(f"{report['conversations']:,} conversations, {report['messages']:,} messages in "
+          f"{report['converse_seconds']:.1f}s ({report['messages_per_second']:,.0f} msg/s), "
+          f"peak RSS {report['peak_rss_mb']:.1f} MB")
+    stats = report["delivery"]
+    print(f"delivery   p50 {stats['p50_ms']:8.2f} ms   p95 {stats['p95_ms']:8.2f} ms   p99 {stats['p99_ms']:8.2f} ms")
+    print(f"persisted in {report['database_writes']:,} writes ({report['messages_per_write']:.1f} messages/write), "
+          f"final flush {report['final_flush_seconds']:.2f}s, {report['failed']} failed")
+
+
+def main(argv=None):
+    benchmark_main("chat", "Chat broker load test (in-memory database fake)", run, print_report, [
+        ("--conversations", {"type": int, "default": 5000, "help": "concurrent conversations"}),
+        ("--messages", {"type": int, "default": 10, "help": "messages per conversation"}),
+        ("--think", {"type": float, "default": 1.0, "help": "mean seconds before each message is sent (0 = flat out)"}),
+        ("--firebase-latency", {"type": float, "default": 0.02, "help": "seconds added to each fake Firebase call"}),
+    ], argv)
+
+
+if __name__ == "__main__":
+    main()
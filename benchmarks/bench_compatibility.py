@@ -0,0 +1,128 @@
+# Compatibility index benchmark against the in-memory Realtime Database fake:
+# loads N listed users, checks top-k against a brute-force scan, then measures
+# query and incremental update latency.
+#
+#   python -m benchmarks.bench_compatibility [--users 1000000] [--queries 2000] [--output results.json]
+import random
+import time
+
+import numpy as np
+
+import compatibility
+import numerology_batch
+from benchmarks import fakes
+from benchmarks.bench_numerology import make_corpus
+from benchmarks.results import benchmark_main, latency_stats
+
+# Distinct (name, DOB) pairs generated per batch; users reuse them round-robin so
+# a million users don't need a million generated names
+CORPUS_ROWS = 200000
+
+
+def _slots(numbers):
+    lookup = np.full(34, -1, dtype=np.int64)
+    lookup[list(compatibility.NUMBER_SLOTS)] = np.arange(len(compatibility.NUMBER_SLOTS))
+    return lookup[numbers]
+
+
+def build_index_data(users, seed=42):
+    """Returns (compatibility_index tree as stored in the database, per-user bucket slots)."""
+    names, dobs = make_corpus(min(users, CORPUS_ROWS), seed)
+    numbers = numerology_batch.calculate_core_numbers_batch(names, dobs)
+    slots = np.stack([_slots(numbers[key]) for key in ("life_path", "expression", "soul_urge")], axis=1)
+    first_names = [name.split()[0] for name in names]
+    tree = {}
+    user_slots = np.empty((users, 3), dtype=np.int64)
+    for i in range(users):
+        row = i % len(names)
+        bucket = tuple(slots[row].tolist())
+        user_slots[i] = bucket
+        if -1 in bucket: # Empty-name edge case; not listable
+            continue
+        tree.setdefault(compatibility.bucket_path(bucket), {})[f"uid{i}"] = first_names[row]
+    return tree, user_slots
+
+
+def check_against_brute_force(index, user_slots, queries, k, rng):
+    """The scores returned for random users must be exactly the k best of a full scan."""
+    weights = np.array(compatibility.COMPATIBILITY_WEIGHTS)
+    matrix = compatibility.COMPATIBILITY_MATRIX
+    valid = (user_slots >= 0).all(axis=1)
+    for _ in range(queries):
+        bucket = tuple(user_slots[rng.randrange(len(user_slots))].tolist())
+        if -1 in bucket:
+            continue
+        matches = index.top_matches(bucket, k)
+        scores = sum(weights[axis] * matrix[bucket[axis], user_slots[valid, axis]] for axis in range(3))
+        expected = np.sort(scores)[::-1][:k]
+        got = np.array([match.score for match in matches])
+        if len(got) != len(expected) or not np.allclose(got, expected):
+            raise AssertionError(f"top-{k} mismatch for bucket {bucket}: {got} != {expected}")
+
+
+def run(users=1000000, queries=2000, k=10, seed=42):
+    rng = random.Random(seed)
+    client = fakes.FakeFirebaseClient()
+
+    start = time.perf_counter()
+    tree, user_slots = build_index_data(users, seed)
+    client.data[compatibility.INDEX_PATH] = tree
+    build_seconds = time.perf_counter() - start
+
+    index = compatibility.CompatibilityIndex(client.database)
+    start = time.perf_counter()
+    index.ensure_loaded(id_token=None)
+    load_seconds = time.perf_counter() - start
+
+    check_against_brute_force(index, user_slots, 50, k, rng)
+
+    buckets = [tuple(row) for row in user_slots.tolist() if -1 not in row]
+    latencies = []
+    for _ in range(queries):
+        bucket = rng.choice(buckets)
+        start = time.perf_counter()
+        index.top_matches(bucket, k, exclude="uid0")
+        latencies.append(time.perf_counter() - start)
+
+    names, dobs = make_corpus(200, seed + 1)
+    update_latencies = []
+    for name, dob in zip(names, dobs):
+        uid = f"uid{rng.randrange(users)}"
+        start = time.perf_counter()
+        bucket = index.update_profile(uid, None, name, dob)
+        update_latencies.append(time.perf_counter() - start)
+        stored = client.data[compatibility.INDEX_PATH]
+        if bucket is not None and uid not in stored.get(compatibility.bucket_path(bucket), {}):
+            raise AssertionError(f"update_profile did not persist {uid} in {compatibility.bucket_path(bucket)}")
+
+    return {
+        "users": users,
+        "listed_users": len(index),
+        "k": k,
+        "build_seconds": build_seconds,
+        "load_seconds": load_seconds,
+        "top_matches": latency_stats(latencies, "us"),
+        "update_profile": latency_stats(update_latencies, "us"),
+    }
+
+
+def print_report(report):
+    print(f"{report['listed_users']:,} listed users: built in {report['build_seconds']:.1f}s, "
+          f"loaded in {report['load_seconds']:.1f}s")
+    stats = report["top_matches"]
+    print(f"top_matches (k={report['k']})  p50 {stats['p50_us']:8.1f} us   p95 {stats['p95_us']:8.1f} us   "
+          f"p99 {stats['p99_us']:8.1f} us")
+    stats = report["update_profile"]
+    print(f"update_profile        p50 {stats['p50_us']:8.1f} us   p95 {stats['p95_us']:8.1f} us")
+
+
+def main(argv=None):
+    benchmark_main("compatibility", "Compatibility index benchmark (in-memory database fake)", run, print_report, [
+        ("--users", {"type": int, "default": 1000000, "help": "listed users"}),
+        ("--queries", {"type": int, "default": 2000, "help": "top-k queries timed"}),
+        ("-k", {"type": int, "default": 10, "help": "matches per query"}),
+    ], argv)
+
+
+if __name__ == "__main__":
+    main()
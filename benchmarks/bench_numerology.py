@@ -0,0 +1,119 @@
+# Micro-benchmarks for the numerology core over realistic name/DOB corpora.
+#
+#   python -m benchmarks.bench_numerology [--rows 20000] [--output results.json]
+#
+# Results (seconds per call, calls/sec) are saved as JSON for comparison across commits.
+# Fails if the DOB index or the batch engine disagrees with the scalar helpers.
+import datetime
+import random
+import time
+
+import numerology_batch
+import numerology_core
+from benchmarks.results import benchmark_main
+
+FIRST_NAMES = [
+    "Aarav", "Vivaan", "Aditya", "Vihaan", "Arjun", "Sai", "Reyansh", "Krishna", "Ishaan", "Rohan",
+    "Ananya", "Diya", "Saanvi", "Aadhya", "Pari", "Anika", "Navya", "Meera", "Kavya", "Priya",
+    "Mohit", "Rahul", "Sneha", "Pooja", "Amit", "Neha", "Vikram", "Lakshmi", "Suresh", "Deepa",
+    "James", "Mary", "John", "Patricia", "Robert", "Jennifer", "Michael", "Linda", "David", "Elizabeth",
+]
+MIDDLE_NAMES = ["", "", "", "Kumar", "Devi", "Rani", "Prasad", "Lal", "Anne", "Marie", "Lee"]
+LAST_NAMES = [
+    "Sharma", "Verma", "Gupta", "Bakre", "Patel", "Reddy", "Iyer", "Nair", "Joshi", "Kulkarni",
+    "Deshpande", "Chatterjee", "Banerjee", "Mukherjee", "Singh", "Khan", "Das", "Mehta", "Shah", "Rao",
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "O'Brien", "Van der Berg",
+]
+
+
+def make_corpus(rows, seed=42):
+    """(names, dobs): realistic full names and birth dates spread over the last 100 years."""
+    rng = random.Random(seed)
+    today = datetime.date.today()
+    first_dob = today.replace(year=today.year - 100, day=1)
+    span_days = (today - first_dob).days
+    names = []
+    dobs = []
+    for _ in range(rows):
+        parts = [rng.choice(FIRST_NAMES), rng.choice(MIDDLE_NAMES), rng.choice(LAST_NAMES)]
+        names.append(" ".join(part for part in parts if part))
+        dobs.append(first_dob + datetime.timedelta(days=rng.randrange(span_days)))
+    return names, dobs
+
+
+def _measure(func, inputs, repeat):
+    """Best-of-`repeat` seconds per call of func over every input."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for value in inputs:
+            func(value)
+        best = min(best, time.perf_counter() - start)
+    return best / len(inputs)
+
+
+def check_backends_agree(names, dobs):
+    """The DOB index and the batch engine must give the scalar helpers' numbers for every row."""
+    numerology_core.use_dob_index(False)
+    expected = {
+        "life_path": [numerology_core.calculate_life_path(dob) for dob in dobs],
+        "birth_day": [numerology_core.calculate_birth_day_number(dob) for dob in dobs],
+        "expression": [numerology_core.calculate_expression_number(name) for name in names],
+        "soul_urge": [numerology_core.calculate_soul_urge_number(name) for name in names],
+        "personality": [numerology_core.calculate_personality_number(name) for name in names],
+    }
+    numerology_core.use_dob_index(True)
+    indexed = [numerology_core.calculate_life_path(dob) for dob in dobs]
+    numerology_core.use_dob_index(False)
+    if indexed != expected["life_path"]:
+        raise AssertionError("DOB index life paths differ from the scalar helpers")
+    batch = numerology_batch.calculate_core_numbers_batch(names, dobs)
+    for key, values in expected.items():
+        if batch[key].tolist() != values:
+            raise AssertionError(f"batch {key} differs from the scalar helpers")
+
+
+def run(rows=20000, repeat=3, seed=42):
+    names, dobs = make_corpus(rows, seed)
+    integers = [random.Random(seed).randrange(1, 10 ** 6) for _ in range(rows)]
+    results = {}
+
+    def scalar(label, func, inputs):
+        per_call = _measure(func, inputs, repeat)
+        results[label] = {"seconds_per_call": per_call, "calls_per_second": 1 / per_call}
+
+    scalar("sum_digits", numerology_core.sum_digits, integers)
+    scalar("reduce_number", numerology_core.reduce_number, integers)
+    for backend in ("scalar", "index"):
+        numerology_core.use_dob_index(backend == "index")
+        scalar(f"calculate_life_path[{backend}]", numerology_core.calculate_life_path, dobs)
+    numerology_core.use_dob_index(False)
+    scalar("calculate_birth_day_number", numerology_core.calculate_birth_day_number, dobs)
+    scalar("calculate_expression_number", numerology_core.calculate_expression_number, names)
+    scalar("calculate_soul_urge_number", numerology_core.calculate_soul_urge_number, names)
+    scalar("calculate_personality_number", numerology_core.calculate_personality_number, names)
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        numerology_batch.calculate_core_numbers_batch(names, dobs)
+        best = min(best, time.perf_counter() - start)
+    results["calculate_core_numbers_batch"] = {"seconds_per_call": best / rows, "calls_per_second": rows / best}
+    check_backends_agree(names, dobs) # After the timings, so it doesn't warm the name cache for them
+    return {"rows": rows, "repeat": repeat, "seed": seed, "benchmarks": results}
+
+
+def print_report(report):
+    for name, stats in report["benchmarks"].items():
+        print(f"{name:45s} {stats['seconds_per_call'] * 1e6:10.3f} us/call {stats['calls_per_second']:14,.0f} calls/s")
+
+
+def main(argv=None):
+    benchmark_main("numerology", "Numerology core micro-benchmarks", run, print_report, [
+        ("--rows", {"type": int, "default": 20000, "help": "corpus size (names and DOBs)"}),
+        ("--repeat", {"type": int, "default": 3, "help": "best-of-N timing runs"}),
+    ], argv)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+# Profile write path benchmark against the in-memory Firebase fake: simulated users
+# save their profile in bursts for several ID-token lifetimes, through the debounced
+# write queue, while the fake rejects expired tokens and fails a share of writes.
+# Checks that every user's last save landed, then reports how long the UI waited,
+# how many writes the saves were merged into, and how many tokens were refreshed.
+#
+#   python -m benchmarks.bench_writes [--users 200] [--token-lifetime 4] [--failure-rate 0.1] [--output results.json]
+import logging
+import random
+import threading
+import time
+
+from auth_session import AuthSession
+from benchmarks import fakes
+from benchmarks.bench_numerology import make_corpus
+from benchmarks.results import benchmark_main, latency_stats
+from compatibility import CompatibilityIndex, bucket_path
+from profile_repository import ProfileRepository
+from write_queue import WriteQueue
+
+
+def _session(index, session, profiles, compatibility, names, dobs, until, burst, pause, seed, waits, last_saved):
+    """One user: a few quick saves (e.g. fixing a typo), then a pause, until `until`."""
+    rng = random.Random(seed + index)
+    uid = session.uid
+    while time.monotonic() < until:
+        session.token() # What every rerun does: refresh ahead of expiry
+        for _ in range(burst):
+            row = rng.randrange(len(names))
+            start = time.perf_counter()
+            profiles.save(uid, session, names[row], dobs[row])
+            compatibility.update_profile(uid, session, names[row], dobs[row])
+            waits.append(time.perf_counter() - start)
+            last_saved[uid] = row
+            time.sleep(rng.uniform(0, 0.1))
+        time.sleep(rng.uniform(0, 2 * pause))
+
+
+def sync_save_ms(client, names, dobs, samples=20):
+    """Median time the UI waited per save before the queue: one synchronous update (token checks off)."""
+    profiles = ProfileRepository(client.database)
+    timings = []
+    for i in range(samples):
+        start = time.perf_counter()
+        profiles.save(f"sync{i}", None, names[i], dobs[i])
+        timings.append(time.perf_counter() - start)
+    return latency_stats(timings)["p50_ms"]
+
+
+def run(users=200, token_lifetime=4.0, lifetimes=3, failure_rate=0.1, firebase_latency=0.05, burst=3,
+        pause=0.5, seed=42):
+    client = fakes.FakeFirebaseClient(firebase_latency, token_lifetime=token_lifetime, check_tokens=True,
+                                      write_failure_rate=failure_rate, seed=seed)
+    auth = client.auth()
+    queue = WriteQueue(client.database, debounce=0.2, backoff=0.05, max_attempts=8)
+    profiles = ProfileRepository(client.database, write_queue=queue)
+    compatibility = CompatibilityIndex(client.database, queue)
+    names, dobs = make_corpus(1000, seed)
+
+    sessions = []
+    for i in range(users):
+        user = auth.create_user_with_email_and_password(f"user{i}@example.com", "password")
+        # Scaled-down refresh windows, in proportion to the default 600s / 60s of a 3600s token. The
+        # session starts its expiry clock after the sign-in round trip, so a token may be that much older.
+        sessions.append(AuthSession(auth, user, refresh_ahead=token_lifetime / 6 + firebase_latency,
+                                    refresh_blocking=token_lifetime / 60 + firebase_latency))
+
+    compatibility.ensure_loaded(sessions[0].token()) # Timed saves start from a warm index, as after the first rerun
+    waits = []
+    last_saved = {}
+    until = time.monotonic() + token_lifetime * lifetimes
+    threads = [threading.Thread(target=_session, args=(i, session, profiles, compatibility, names, dobs, until,
+                                                       burst, pause, seed, waits, last_saved))
+               for i, session in enumerate(sessions)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    session_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    if not queue.flush(timeout=120):
+        raise AssertionError("write queue did not drain")
+    drain_seconds = time.perf_counter() - start
+
+    stored = client.data.get("users", {})
+    index = client.data.get("compatibility_index", {})
+    for uid, row in last_saved.items():
+        if stored.get(uid, {}).get("name") != names[row] or stored[uid].get("dob") != dobs[row].isoformat():
+            raise AssertionError(f"{uid}: stored profile {stored.get(uid)} is not the last save ({names[row]})")
+        bucket = compatibility.bucket_of(uid)
+        if bucket is not None and uid not in index.get(bucket_path(bucket), {}):
+            raise AssertionError(f"{uid}: missing from compatibility bucket {bucket_path(bucket)}")
+    if queue.stats["failed"]:
+        raise AssertionError(f"{queue.stats['failed']} writes were given up on")
+
+    saves = len(waits)
+    return {
+        "users": users,
+        "token_lifetime": token_lifetime,
+        "failure_rate": failure_rate,
+        "firebase_latency": firebase_latency,
+        "session_seconds": session_seconds,
+        "final_flush_seconds": drain_seconds,
+        "saves": saves,
+        "database_writes": queue.stats["writes"],
+        "saves_per_write": saves / max(1, queue.stats["writes"]),
+        "retries": queue.stats["retries"],
+        "token_refreshes": auth.refreshes,
+        "ui_wait": latency_stats(waits, "us"),
+        "sync_save_p50_ms": sync_save_ms(fakes.FakeFirebaseClient(firebase_latency), names, dobs),
+    }
+
+
+def print_report(report):
+    print(f"{report['users']} users, {report['saves']:,} saves over {report['session_seconds']:.1f}s "
+          f"({report['token_refreshes']} token refreshes, 0 lost)")
+    stats = report["ui_wait"]
+    print(f"UI wait per save   p50 {stats['p50_us']:8.1f} us   p99 {stats['p99_us']:8.1f} us "
+          f"(synchronous save: {report['sync_save_p50_ms']:.1f} ms)")
+    print(f"{report['database_writes']:,} database writes ({report['saves_per_write']:.1f} saves/write), "
+          f"{report['retries']} retries, final flush {report['final_flush_seconds']:.2f}s")
+
+
+def main(argv=None):
+    logging.getLogger("write_queue").setLevel(logging.ERROR) # The injected failures make retries routine here
+    benchmark_main("writes", "Queued profile writes with token refresh (in-memory Firebase fake)", run, print_report, [
+        ("--users", {"type": int, "default": 200, "help": "concurrent signed-in users"}),
+        ("--token-lifetime", {"type": float, "default": 4.0, "help": "fake ID token lifetime, seconds"}),
+        ("--lifetimes", {"type": int, "default": 3, "help": "how many token lifetimes the users keep saving"}),
+        ("--failure-rate", {"type": float, "default": 0.1, "help": "fraction of fake writes that fail"}),
+        ("--firebase-latency", {"type": float, "default": 0.05, "help": "seconds added to each fake Firebase call"}),
+    ], argv)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+# In-process stand-ins for Firebase (Auth + Realtime Database) and Gemini, so the app
+# can be driven headlessly without network access or credentials, plus a manual clock.
+import itertools
+import random
+import threading
+import time
+
+import chat
+import compatibility
+import firebase_client
+import interpretation_cache
+import numerology_page
+import profile_repository
+import write_queue
+
+
+class FakeClock:
+    """A clock() that only moves when told to: advance it by adding to `now`."""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class FakeAuth:
+    """
+    Email/password accounts kept in memory; same call shapes as PooledAuth.
+    ID tokens expire after `token_lifetime` seconds (see check_token).
+    """
+
+    def __init__(self, latency=0.0, token_lifetime=3600):
+        self.latency = latency
+        self.token_lifetime = token_lifetime
+        self.accounts = {} # email -> (password, localId)
+        self.expires = {} # idToken -> time.monotonic() deadline
+        self.refreshes = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def _issue(self, email, local_id):
+        time.sleep(self.latency)
+        token = f"token-{local_id}-{time.monotonic_ns()}"
+        self.expires[token] = time.monotonic() + self.token_lifetime
+        return {"localId": local_id, "email": email, "idToken": token,
+                "refreshToken": f"refresh-{local_id}", "expiresIn": str(self.token_lifetime)}
+
+    def check_token(self, token):
+        """Raises like the database's 401 response if `token` was never issued or has expired."""
+        if self.expires.get(token, 0) <= time.monotonic():
+            raise Exception('[Errno 401 Client Error: Unauthorized] {"error": "Auth token is expired"}')
+
+    def create_user_with_email_and_password(self, email, password):
+        with self._lock:
+            if email in self.accounts:
+                raise Exception('{"error": {"message": "EMAIL_EXISTS"}}')
+            self.accounts[email] = (password, f"uid{next(self._ids)}")
+        return self._issue(email, self.accounts[email][1])
+
+    def sign_in_with_email_and_password(self, email, password):
+        account = self.accounts.get(email)
+        if account is None or account[0] != password:
+            raise Exception('{"error": {"message": "INVALID_LOGIN_CREDENTIALS"}}')
+        return self._issue(email, account[1])
+
+    def refresh(self, refresh_token):
+        local_id = refresh_token.split("-", 1)[1]
+        user = self._issue(None, local_id)
+        self.refreshes += 1
+        return {"userId": local_id, "idToken": user["idToken"], "refreshToken": refresh_token,
+                "expiresIn": user["expiresIn"]}
+
+
+class FakeResponse:
+    def __init__(self, value):
+        self._value = value
+
+    def val(self):
+        return self._value
+
+
+class FakeDatabase:
+    """
+    Minimal pyrebase Database look-alike over a shared nested dict: child(), get(),
+    set(), update() (including multi-path "a/b" keys), push() and remove(), plus
+    order_by_key() queries with start_at/end_at/limit_to_first/limit_to_last.
+    With an `auth`, calls made with a token are rejected once it has expired;
+    `write_failure_rate` of set()/update() calls fail like a 503.
+    """
+
+    def __init__(self, root, lock, latency=0.0, auth=None, write_failure_rate=0.0, rng=random):
+        self._root = root
+        self._lock = lock
+        self.latency = latency
+        self._auth = auth
+        self.write_failure_rate = write_failure_rate
+        self._rng = rng
+        self.path = []
+        self.build_query = {}
+
+    def _check(self, token, write=False):
+        if self._auth is not None and token is not None:
+            self._auth.check_token(token)
+        if write and self._rng.random() < self.write_failure_rate:
+            raise Exception('[Errno 503 Server Error: Service Unavailable] fake write failure')
+
+    def child(self, *args):
+        self.path.extend(str(arg).strip("/") for arg in args)
+        return self
+
+    def order_by_key(self):
+        self.build_query["orderBy"] = "$key"
+        return self
+
+    def start_at(self, start):
+        self.build_query["startAt"] = start
+        return self
+
+    def end_at(self, end):
+        self.build_query["endAt"] = end
+        return self
+
+    def limit_to_first(self, limit_first):
+        self.build_query["limitToFirst"] = limit_first
+        return self
+
+    def limit_to_last(self, limit_last):
+        self.build_query["limitToLast"] = limit_last
+        return self
+
+    def _take_path(self):
+        path, self.path = [part for segment in self.path for part in segment.split("/") if part], []
+        return path
+
+    def _take_query(self, node):
+        query, self.build_query = self.build_query, {}
+        if not query or not isinstance(node, dict):
+            return node
+        items = sorted(node.items())
+        if "startAt" in query:
+            items = [item for item in items if item[0] >= query["startAt"]]
+        if "endAt" in query:
+            items = [item for item in items if item[0] <= query["endAt"]]
+        if "limitToFirst" in query:
+            items = items[:query["limitToFirst"]]
+        if "limitToLast" in query:
+            items = items[-query["limitToLast"]:] if query["limitToLast"] else []
+        return dict(items)
+
+    def _node(self, path, create):
+        node = self._root
+        for key in path:
+            if not isinstance(node, dict) or (key not in node and not create):
+                return None
+            node = node.setdefault(key, {})
+        return node
+
+    def get(self, token=None):
+        time.sleep(self.latency)
+        path = self._take_path()
+        self._check(token)
+        with self._lock:
+            node = self._take_query(self._node(path, create=False))
+            return FakeResponse(_copy(node) if node != {} else None)
+
+    def set(self, data, token=None):
+        time.sleep(self.latency)
+        path = self._take_path()
+        self._check(token, write=True)
+        with self._lock:
+            parent = self._node(path[:-1], create=True)
+            parent[path[-1]] = _copy(data)
+        return data
+
+    def update(self, data, token=None):
+        time.sleep(self.latency)
+        path = self._take_path()
+        self._check(token, write=True)
+        with self._lock:
+            for key, value in data.items():
+                keys = path + [part for part in key.split("/") if part]
+                parent = self._node(keys[:-1], create=True)
+                if value is None:
+                    parent.pop(keys[-1], None)
+                else:
+                    parent[keys[-1]] = _copy(value)
+        return data
+
+    def push(self, data, token=None):
+        key = f"-N{time.time_ns():x}{random.getrandbits(16):04x}"
+        self.path.append(key)
+        self.set(data, token)
+        return {"name": key}
+
+    def remove(self, token=None):
+        time.sleep(self.latency)
+        path = self._take_path()
+        self._check(token)
+        with self._lock:
+            parent = self._node(path[:-1], create=False)
+            if isinstance(parent, dict):
+                parent.pop(path[-1], None)
+
+
+def _copy(value):
+    if isinstance(value, dict):
+        return {key: _copy(item) for key, item in value.items()}
+    return value
+
+
+class FakeFirebaseClient:
+    """
+    Drop-in for firebase_client.FirebaseClient (auth() / database()). With
+    check_tokens, the database rejects expired ID tokens like the real one.
+    """
+
+    def __init__(self, latency=0.0, token_lifetime=3600, check_tokens=False, write_failure_rate=0.0, seed=None):
+        self.data = {}
+        self._lock = threading.Lock()
+        self.latency = latency
+        self.check_tokens = check_tokens
+        self.write_failure_rate = write_failure_rate
+        self._random = random.Random(seed)
+        self._auth = FakeAuth(latency, token_lifetime)
+
+    def auth(self):
+        return self._auth
+
+    def database(self):
+        return FakeDatabase(self.data, self._lock, self.latency, self._auth if self.check_tokens else None,
+                            self.write_failure_rate, self._random)
+
+
+class FakeModel:
+    """Stands in for genai.GenerativeModel, with optional latency and failure rate."""
+
+    def __init__(self, model_name, latency=0.0, failure_rate=0.0, seed=None):
+        self.model_name = model_name
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def generate_content(self, prompt):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency)
+        if self._random.random() < self.failure_rate:
+            raise RuntimeError("fake model failure")
+
+        class Response:
+            text = f"[{self.model_name}] {prompt[-80:]}"
+        return Response()
+
+
+def install(firebase_latency=0.0, model_latency=0.0, model_failure_rate=0.0):
+    """
+    Points the app's process-wide singletons at the fakes (call before running
+    namaskar5.py in-process, e.g. with AppTest). Returns the FakeFirebaseClient.
+    """
+    client = FakeFirebaseClient(firebase_latency)
+    firebase_client._client = client
+    profile_repository._repository = None
+    compatibility._index = None
+    write_queue._queue = None
+    chat._broker = None
+    interpretation_cache._cache = interpretation_cache.InterpretationCache(db_path=None)
+    numerology_page.set_model_factory(
+        lambda model_name: FakeModel(model_name, model_latency, model_failure_rate))
+    return client
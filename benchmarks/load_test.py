@@ -0,0 +1,128 @@
+# Headless end-to-end load test: drives namaskar5.py with Streamlit's AppTest for N
+# concurrent simulated sessions (login -> profile update -> "Calculate My Numbers"),
+# with Firebase and Gemini replaced by the in-process fakes in benchmarks/fakes.py.
+# AppTest swaps process-global state (st.secrets, the Runtime singleton) while it
+# runs, so each concurrent session gets its own worker process.
+#
+#   python -m benchmarks.load_test [--sessions 10] [--firebase-latency 0.05] [--output results.json]
+#
+# Reports rerun latency percentiles per step and peak RSS, saved as JSON.
+import os
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from streamlit.testing.v1 import AppTest
+
+from benchmarks import fakes
+from benchmarks.bench_numerology import make_corpus
+from benchmarks.results import benchmark_main, latency_stats
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "namaskar5.py")
+FAKE_FIREBASE_SECRETS = {
+    "apiKey": "fake", "authDomain": "fake", "projectId": "fake", "storageBucket": "fake",
+    "messagingSenderId": "fake", "appId": "fake", "databaseURL": "https://fake.invalid",
+}
+
+
+def _timed_run(app, timings, step):
+    start = time.perf_counter()
+    app.run()
+    timings.setdefault(step, []).append(time.perf_counter() - start)
+    if app.exception:
+        raise RuntimeError(f"{step}: {app.exception[0].message}")
+
+
+def run_session(email, password, name, dob, timeout):
+    """One simulated user; returns {step: [rerun seconds, ...]}."""
+    timings = {}
+    app = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    app.secrets["firebase"] = FAKE_FIREBASE_SECRETS
+    _timed_run(app, timings, "initial_load")
+
+    app.text_input(key="login_email").input(email)
+    app.text_input(key="login_password").input(password)
+    next(button for button in app.button if button.label == "Login").click()
+    _timed_run(app, timings, "login")
+
+    app.radio(key="active_section").set_value("My Profile")
+    _timed_run(app, timings, "open_profile")
+    app.text_input(key="profile_name_input").input(name)
+    app.date_input(key="profile_dob_input").set_value(dob)
+    next(button for button in app.button if button.label == "Update Profile").click()
+    _timed_run(app, timings, "profile_update")
+
+    app.radio(key="active_section").set_value("Numerology")
+    _timed_run(app, timings, "open_numerology")
+    app.button(key="calculate_all_numerology").click()
+    _timed_run(app, timings, "calculate_numbers")
+    if not any("Life Path Number" in markdown.value for markdown in app.markdown):
+        raise RuntimeError("calculate_numbers: numerology report was not rendered")
+    return timings
+
+
+def run_worker(index, name, dob, firebase_latency, model_latency, model_failure_rate, timeout):
+    """Worker process: installs the fakes, registers one user and plays one session."""
+    client = fakes.install(firebase_latency, model_latency, model_failure_rate)
+    email, password = f"user{index}@example.com", f"password{index}"
+    client.auth().create_user_with_email_and_password(email, password)
+    timings = run_session(email, password, name, dob, timeout)
+    return timings, peak_rss_mb()
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run(sessions=10, firebase_latency=0.0, model_latency=0.0, model_failure_rate=0.0, timeout=60, seed=42):
+    names, dobs = make_corpus(sessions, seed)
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=sessions) as pool:
+        futures = [
+            pool.submit(run_worker, i, names[i], dobs[i], firebase_latency, model_latency, model_failure_rate, timeout)
+            for i in range(sessions)
+        ]
+        results = [future.result() for future in futures]
+    wall_seconds = time.perf_counter() - started
+    session_timings = [timings for timings, _ in results]
+    worker_rss = [rss for _, rss in results]
+
+    steps = {}
+    for timings in session_timings:
+        for step, values in timings.items():
+            steps.setdefault(step, []).extend(values)
+    latency = {step: latency_stats(values) for step, values in steps.items()}
+    return {
+        "sessions": sessions,
+        "firebase_latency": firebase_latency,
+        "model_latency": model_latency,
+        "model_failure_rate": model_failure_rate,
+        "wall_seconds": wall_seconds,
+        "peak_rss_mb": max(worker_rss), # Largest single session process
+        "total_rss_mb": sum(worker_rss),
+        "latency": latency,
+    }
+
+
+def print_report(report):
+    print(f"{report['sessions']} sessions in {report['wall_seconds']:.2f}s, "
+          f"peak RSS {report['peak_rss_mb']:.1f} MB per session process ({report['total_rss_mb']:.1f} MB total)")
+    for step, stats in report["latency"].items():
+        print(f"{step:20s} p50 {stats['p50_ms']:8.1f} ms   p95 {stats['p95_ms']:8.1f} ms   max {stats['max_ms']:8.1f} ms")
+
+
+def main(argv=None):
+    benchmark_main("load", "Headless AppTest load test for namaskar5.py", run, print_report, [
+        ("--sessions", {"type": int, "default": 10, "help": "concurrent simulated sessions"}),
+        ("--firebase-latency", {"type": float, "default": 0.0, "help": "seconds added to each fake Firebase call"}),
+        ("--model-latency", {"type": float, "default": 0.0, "help": "seconds added to each fake Gemini call"}),
+        ("--model-failure-rate", {"type": float, "default": 0.0, "help": "fraction of fake Gemini calls that fail"}),
+        ("--timeout", {"type": float, "default": 60, "help": "per-rerun AppTest timeout, seconds"}),
+    ], argv)
+
+
+if __name__ == "__main__":
+    main()
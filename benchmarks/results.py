@@ -0,0 +1,68 @@
+# Shared benchmark plumbing: latency percentiles, the common command line, and JSON
+# reports tagged with the commit they were measured on
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+
+from tracing import percentile
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+_UNITS = {"ms": 1e3, "us": 1e6}
+
+
+def latency_stats(values, unit="ms"):
+    """{"count", "p50_<unit>", "p95_<unit>", "p99_<unit>", "max_<unit>"} for durations in seconds."""
+    values = sorted(values)
+    scale = _UNITS[unit]
+    return {
+        "count": len(values),
+        f"p50_{unit}": percentile(values, 0.50) * scale,
+        f"p95_{unit}": percentile(values, 0.95) * scale,
+        f"p99_{unit}": percentile(values, 0.99) * scale,
+        f"max_{unit}": values[-1] * scale,
+    }
+
+
+def current_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(RESULTS_DIR)).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def save_results(name, report, output=None):
+    """Writes `report` plus run metadata to `output` (default: results/<name>-<commit>.json)."""
+    commit = current_commit()
+    report = dict(report, name=name, commit=commit, python=platform.python_version(),
+                  platform=platform.platform(), recorded_at=datetime.datetime.now().isoformat(timespec="seconds"))
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{name}-{commit}.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    return output
+
+
+def benchmark_main(name, description, run, print_report, arguments, argv=None):
+    """
+    The command line every benchmark shares: parses `arguments` ((flag, add_argument
+    options) pairs, named like run()'s parameters) plus --seed and --output, calls
+    run(), prints the report and saves it. run() raises AssertionError when the
+    benchmark's own correctness checks fail.
+    """
+    parser = argparse.ArgumentParser(description=description)
+    for flag, options in arguments:
+        parser.add_argument(flag, **options)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help=f"JSON results path (default: benchmarks/results/{name}-<commit>.json)")
+    args = vars(parser.parse_args(argv))
+    output = args.pop("output")
+    report = run(**args)
+    print_report(report)
+    print(f"Saved {save_results(name, report, output)}")
+    return report
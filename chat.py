@@ -0,0 +1,401 @@
+# Expert chat: an asyncio broker that fans new messages out to the sessions
+# subscribed to a conversation and writes them to Realtime Database in batches.
+# History is read back a page at a time, using message keys as cursors.
+import asyncio
+import atexit
+import datetime
+import logging
+import random
+import threading
+import time
+import weakref
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+CHAT_PATH = "chats" # chats/<conversation id>/<message key> = {"r": role, "t": text}
+CHAT_INDEX_PATH = "chat_index" # chat_index/<uid>/<conversation id> = {"with": display name, "as": role}
+
+PAGE_SIZE = 30
+MAX_MESSAGE_LENGTH = 2000
+SUBSCRIPTION_BUFFER = 200 # Undrained messages kept per subscription; the oldest are dropped first
+FLUSH_INTERVAL = 0.25 # Seconds new messages wait, so bursts are written together
+FLUSH_MAX_BATCH = 500 # Messages per multi-path update
+FLUSH_CONCURRENCY = 16 # Parallel database writes (well under the pooled HTTP connections)
+FLUSH_RETRIES = 4
+FLUSH_BACKOFF = 0.5 # Seconds before the first retry; doubled after each failure
+
+# Roles are stored instead of uids: the conversation id already names both people
+USER = "u"
+EXPERT = "e"
+
+# --- Messages ---
+
+# Message keys sort by time: 11 hex digits of epoch milliseconds, a 4-digit
+# per-process counter, then a random 4-digit node id so keys made by different
+# processes in the same millisecond can't collide
+_NODE = f"{random.getrandbits(16):04x}"
+_last_ms = 0
+_sequence = 0
+_key_lock = threading.Lock()
+
+
+def message_key(now=None):
+    """A new, unique message key, greater than every key made before it in this process."""
+    global _last_ms, _sequence
+    ms = int((time.time() if now is None else now) * 1000)
+    with _key_lock:
+        if ms > _last_ms:
+            _last_ms, _sequence = ms, 0
+        elif _sequence < 0xFFFF:
+            _sequence += 1
+        else: # Counter exhausted within one millisecond: borrow the next one
+            _last_ms, _sequence = _last_ms + 1, 0
+        return f"{_last_ms:011x}{_sequence:04x}{_NODE}"
+
+
+class Message(namedtuple("Message", ["key", "role", "text"])):
+    """One chat message; when it was sent is encoded in its key."""
+    __slots__ = ()
+
+    @property
+    def sent_at(self):
+        return datetime.datetime.fromtimestamp(int(self.key[:11], 16) / 1000, datetime.timezone.utc)
+
+
+def _record(message):
+    """Stored form of a message (the key is the database key)."""
+    return {"r": message.role, "t": message.text}
+
+
+def _from_record(key, record):
+    if not isinstance(record, dict) or record.get("r") not in (USER, EXPERT):
+        return None
+    return Message(key, record["r"], str(record.get("t", "")))
+
+
+def conversation_id(user_uid, expert_uid):
+    """Database key of the conversation between a user and an expert."""
+    return f"{user_uid}_{expert_uid}"
+
+# --- Persistence ---
+
+
+class ChatStore:
+    """
+    Messages under CHAT_PATH and each person's conversation list under
+    CHAT_INDEX_PATH in Realtime Database. `database_factory` returns a fresh
+    pyrebase Database handle (see FirebaseClient.database).
+    """
+
+    def __init__(self, database_factory):
+        self._database_factory = database_factory
+
+    def write(self, changes, id_token):
+        """One multi-path update of {"<conversation id>/<message key>": record, ...}."""
+        self._database_factory().child(CHAT_PATH).update(changes, id_token)
+
+    def page(self, conversation_id, id_token, before=None, limit=PAGE_SIZE):
+        """
+        Up to `limit` messages older than the `before` key (the newest ones if
+        None), oldest first, and the cursor for the page before them (None when
+        there are no older messages).
+        """
+        query = self._database_factory().child(CHAT_PATH).child(conversation_id).order_by_key()
+        if before is not None:
+            query = query.end_at(before) # Inclusive, so one extra row is fetched and skipped
+        data = query.limit_to_last(limit + 1 + (before is not None)).get(id_token).val() or {}
+        messages = [message for message in (_from_record(key, record) for key, record in sorted(data.items()))
+                    if message is not None and message.key != before]
+        if len(messages) > limit:
+            return messages[-limit:], messages[-limit].key
+        return messages, None
+
+    def start_conversation(self, user_uid, user_name, expert_uid, expert_name, id_token):
+        """Adds the conversation to both people's lists; returns its id."""
+        chat_id = conversation_id(user_uid, expert_uid)
+        self._database_factory().child(CHAT_INDEX_PATH).update({
+            f"{user_uid}/{chat_id}": {"with": expert_name, "as": USER},
+            f"{expert_uid}/{chat_id}": {"with": user_name, "as": EXPERT},
+        }, id_token)
+        return chat_id
+
+    def conversations(self, uid, id_token):
+        """{conversation id: {"with": display name, "as": role}} for everyone `uid` chats with."""
+        return self._database_factory().child(CHAT_INDEX_PATH).child(uid).get(id_token).val() or {}
+
+# --- Broker ---
+
+
+class Subscription:
+    """Live messages of one conversation for one session, buffered until drained."""
+
+    def __init__(self, broker, conversation_id, buffer_size=SUBSCRIPTION_BUFFER):
+        self.conversation_id = conversation_id
+        self._broker = broker
+        self._messages = deque(maxlen=buffer_size)
+        self._ready = asyncio.Event()
+
+    def _deliver(self, message):
+        # On the broker loop
+        self._messages.append(message)
+        self._ready.set()
+
+    def drain(self):
+        """Messages received since the last drain, oldest first (from any thread)."""
+        messages = []
+        while self._messages:
+            messages.append(self._messages.popleft())
+        return messages
+
+    async def get(self):
+        """Waits for the next message (coroutines running on the broker loop only)."""
+        while not self._messages:
+            self._ready.clear()
+            await self._ready.wait()
+        return self._messages.popleft()
+
+    def close(self):
+        self._broker.unsubscribe(self)
+
+
+class ChatBroker:
+    """
+    In-process pub/sub for chat messages, running on its own asyncio event loop thread.
+
+    publish() hands a message to every live Subscription of its conversation at
+    once and queues it for the ChatStore; a background task writes the queue
+    every `flush_interval` seconds as multi-path updates. There is one update per
+    signing token, since the database rules check who writes. Failed writes are
+    retried with exponential backoff. Sessions never poll the database for new
+    messages: they drain their Subscription and load older ones with history().
+
+    Subscriptions are held weakly, so a session that goes away unsubscribes
+    itself. Fan-out reaches this process's sessions only; people connected to
+    another process see the messages on their next history() load. With
+    store=None nothing is persisted (e.g. in tests).
+    """
+
+    def __init__(self, store=None, flush_interval=FLUSH_INTERVAL, max_batch=FLUSH_MAX_BATCH,
+                 retries=FLUSH_RETRIES, backoff=FLUSH_BACKOFF):
+        self.store = store
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.retries = retries
+        self.backoff = backoff
+        self._subscribers = {} # conversation id -> WeakSet of Subscription
+        self._unflushed = {} # conversation id -> {key: Message} published but not yet written
+        self._lock = threading.Lock()
+        self._pending = [] # (conversation id, Message, id_token) waiting for the next flush
+        self._writes_in_flight = 0
+        self._loop = None
+        self._loop_lock = threading.Lock()
+        self._thread = None
+        self._wakeup = None
+        self._flush_task = None
+        self._executor = None
+        self.stats = {"published": 0, "delivered": 0, "writes": 0, "persisted": 0, "failed": 0}
+
+    # --- Event loop ---
+    @property
+    def loop(self):
+        """The broker's event loop, started (with its flush task) on first use."""
+        if self._loop is None:
+            with self._loop_lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    self._thread = threading.Thread(target=loop.run_forever, name="chat-broker", daemon=True)
+                    self._thread.start()
+                    if self.store is not None:
+                        self._wakeup = asyncio.Event()
+                        self._executor = ThreadPoolExecutor(max_workers=FLUSH_CONCURRENCY,
+                                                            thread_name_prefix="chat-writer")
+                        self._flush_task = asyncio.run_coroutine_threadsafe(self._start_flushing(), loop).result()
+                    self._loop = loop
+        return self._loop
+
+    async def _start_flushing(self):
+        return asyncio.get_running_loop().create_task(self._flush_forever())
+
+    def close(self, timeout=None):
+        """Writes everything pending, then stops the event loop thread."""
+        with self._loop_lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        if self._flush_task is not None:
+            asyncio.run_coroutine_threadsafe(self._stop_flushing(), loop).result(timeout)
+            self._executor.shutdown()
+        loop.call_soon_threadsafe(loop.stop)
+        self._thread.join(timeout)
+        loop.close()
+
+    async def _stop_flushing(self):
+        await self.flush_async()
+        self._flush_task.cancel()
+        try:
+            await self._flush_task
+        except asyncio.CancelledError:
+            pass
+        self._flush_task = None
+
+    def run(self, coroutine, timeout=None):
+        """Runs a coroutine on the broker loop and waits for its result (from another thread)."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result(timeout)
+
+    # --- Pub/sub ---
+    def subscribe(self, conversation_id, buffer_size=SUBSCRIPTION_BUFFER):
+        """A Subscription receiving every message published to the conversation from now on."""
+        subscription = Subscription(self, conversation_id, buffer_size)
+        with self._lock:
+            self._subscribers.setdefault(conversation_id, weakref.WeakSet()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.conversation_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.conversation_id]
+
+    def subscriber_count(self, conversation_id=None):
+        with self._lock:
+            if conversation_id is not None:
+                return len(self._subscribers.get(conversation_id, ()))
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def _new_message(self, conversation_id, role, text):
+        text = (text or "").strip()
+        if not text:
+            raise ValueError("Message is empty.")
+        if len(text) > MAX_MESSAGE_LENGTH:
+            raise ValueError(f"Message is longer than {MAX_MESSAGE_LENGTH} characters.")
+        if role not in (USER, EXPERT):
+            raise ValueError(f"Unknown chat role: {role!r}")
+        message = Message(message_key(), role, text)
+        if self.store is not None:
+            with self._lock:
+                self._unflushed.setdefault(conversation_id, {})[message.key] = message
+        return message
+
+    def publish(self, conversation_id, role, text, id_token=None):
+        """Sends a message; returns it at once, before it is delivered or written."""
+        message = self._new_message(conversation_id, role, text)
+        self.loop.call_soon_threadsafe(self._dispatch, conversation_id, message, id_token)
+        return message
+
+    async def publish_async(self, conversation_id, role, text, id_token=None):
+        """publish() for coroutines running on the broker loop."""
+        message = self._new_message(conversation_id, role, text)
+        self._dispatch(conversation_id, message, id_token)
+        return message
+
+    def _dispatch(self, conversation_id, message, id_token):
+        # On the broker loop
+        with self._lock:
+            subscribers = list(self._subscribers.get(conversation_id, ()))
+        for subscription in subscribers:
+            subscription._deliver(message)
+        self.stats["published"] += 1
+        self.stats["delivered"] += len(subscribers)
+        if self.store is not None:
+            self._pending.append((conversation_id, message, id_token))
+            self._wakeup.set()
+
+    # --- Persistence ---
+    async def _flush_forever(self):
+        while True:
+            await self._wakeup.wait()
+            await asyncio.sleep(self.flush_interval) # Let a burst of messages collect
+            self._wakeup.clear()
+            pending, self._pending = self._pending, []
+            try:
+                await self._flush(pending)
+            except Exception: # Never let the flush task die
+                logger.exception("Chat flush failed")
+
+    async def _flush(self, pending):
+        batches = {} # id_token -> [[(conversation id, Message), ...], ...]
+        for conversation_id, message, id_token in pending:
+            chunks = batches.setdefault(id_token, [[]])
+            if len(chunks[-1]) == self.max_batch:
+                chunks.append([])
+            chunks[-1].append((conversation_id, message))
+        await asyncio.gather(*(self._write(chunk, id_token)
+                               for id_token, chunks in batches.items() for chunk in chunks))
+
+    async def _write(self, entries, id_token):
+        changes = {f"{conversation_id}/{message.key}": _record(message) for conversation_id, message in entries}
+        self._writes_in_flight += 1
+        try:
+            for attempt in range(self.retries + 1):
+                try:
+                    await asyncio.get_running_loop().run_in_executor(self._executor, self.store.write, changes, id_token)
+                    self.stats["writes"] += 1
+                    self.stats["persisted"] += len(entries)
+                    break
+                except Exception as e:
+                    if attempt == self.retries:
+                        # They were delivered live, but won't be in history
+                        self.stats["failed"] += len(entries)
+                        logger.error("Dropping %d chat messages after %d attempts: %s", len(entries), attempt + 1, e)
+                        break
+                    await asyncio.sleep(self.backoff * 2 ** attempt)
+        finally:
+            self._writes_in_flight -= 1
+            with self._lock:
+                for conversation_id, message in entries:
+                    unflushed = self._unflushed.get(conversation_id)
+                    if unflushed is not None:
+                        unflushed.pop(message.key, None)
+                        if not unflushed:
+                            del self._unflushed[conversation_id]
+
+    async def flush_async(self):
+        """Writes everything published so far, including writes already under way."""
+        pending, self._pending = self._pending, []
+        await self._flush(pending)
+        while self._writes_in_flight:
+            await asyncio.sleep(0.01)
+
+    def flush(self, timeout=None):
+        """flush_async() from another thread."""
+        self.run(self.flush_async(), timeout)
+
+    # --- History ---
+    def history(self, conversation_id, id_token, before=None, limit=PAGE_SIZE):
+        """
+        ChatStore.page() for the conversation; the newest page also includes
+        messages published from this process that haven't been written yet.
+        """
+        if self.store is None:
+            return [], None
+        messages, cursor = self.store.page(conversation_id, id_token, before, limit)
+        if before is None:
+            with self._lock:
+                unflushed = list(self._unflushed.get(conversation_id, {}).values())
+            if unflushed:
+                merged = {message.key: message for message in messages}
+                merged.update((message.key, message) for message in unflushed)
+                messages = [merged[key] for key in sorted(merged)]
+                if len(messages) > limit:
+                    messages = messages[-limit:]
+                    cursor = messages[0].key
+        return messages, cursor
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_chat_broker(database_factory):
+    """Returns the process-wide ChatBroker, creating it on first call."""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = ChatBroker(ChatStore(database_factory))
+                atexit.register(_broker.close, timeout=30) # Writes what is still queued on shutdown
+    return _broker
@@ -0,0 +1,296 @@
+# Numerology compatibility matching: an inverted index from core-number buckets
+# (Life Path, Expression, Soul Urge) to the users who opted in, kept in memory and
+# mirrored under compatibility_index/ in Realtime Database.
+import logging
+import threading
+import time
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+from numerology_core import analyze_name, calculate_life_path
+from numerology_systems import DEFAULT_SYSTEM
+from write_queue import resolve_token
+
+logger = logging.getLogger(__name__)
+
+INDEX_PATH = "compatibility_index"
+INDEX_RELOAD_SECONDS = 300 # Listings written by other processes show up within this long
+
+_MISSING = object()
+
+# Every value a core number can take; its position is the row/column in the matrix
+NUMBER_SLOTS = (1, 2, 3, 4, 5, 6, 7, 8, 9, 11, 22, 33)
+_SLOT = {number: slot for slot, number in enumerate(NUMBER_SLOTS)}
+
+# Number families: 1-5-7 (mind), 2-4-8 (practical), 3-6-9 (creative).
+# Master numbers belong to the family of their root (11 -> 2, 22 -> 4, 33 -> 6).
+_FAMILY = {1: 0, 5: 0, 7: 0, 2: 1, 4: 1, 8: 1, 3: 2, 6: 2, 9: 2}
+_ROOT = {11: 2, 22: 4, 33: 6}
+
+# Life Path counts most; Expression and Soul Urge refine the match
+COMPATIBILITY_WEIGHTS = (0.5, 0.25, 0.25)
+
+
+def _pair_score(a, b):
+    root_a, root_b = _ROOT.get(a, a), _ROOT.get(b, b)
+    if a == b:
+        return 1.0
+    if root_a == root_b: # A master number and its root
+        return 0.9
+    if _FAMILY[root_a] == _FAMILY[root_b]:
+        return 0.8
+    return 0.4
+
+
+COMPATIBILITY_MATRIX = np.array([[_pair_score(a, b) for b in NUMBER_SLOTS] for a in NUMBER_SLOTS])
+COMPATIBILITY_MATRIX.flags.writeable = False
+
+Match = namedtuple("Match", ["uid", "display_name", "life_path", "expression", "soul_urge", "score"])
+
+
+def core_bucket(life_path, expression, soul_urge):
+    """(life path, expression, soul urge) as matrix slots, or None if any can't be matched (e.g. 0)."""
+    try:
+        return _SLOT[life_path], _SLOT[expression], _SLOT[soul_urge]
+    except KeyError:
+        return None
+
+
+def profile_bucket(name, dob, system=DEFAULT_SYSTEM):
+    """The bucket a profile belongs in, or None if its numbers can't be calculated."""
+    analysis = analyze_name(name or "", system)
+    return core_bucket(calculate_life_path(dob), analysis.expression, analysis.soul_urge)
+
+
+def bucket_numbers(bucket):
+    return tuple(NUMBER_SLOTS[slot] for slot in bucket)
+
+
+def bucket_path(bucket):
+    """Database key for a bucket, e.g. "11-3-5"."""
+    return "-".join(str(number) for number in bucket_numbers(bucket))
+
+
+def _parse_bucket_path(key):
+    try:
+        return core_bucket(*(int(part) for part in key.split("-")))
+    except (TypeError, ValueError):
+        return None
+
+
+def compatibility_score(bucket_a, bucket_b):
+    """Weighted 0..1 score between two buckets."""
+    return float(sum(weight * COMPATIBILITY_MATRIX[a, b]
+                     for weight, a, b in zip(COMPATIBILITY_WEIGHTS, bucket_a, bucket_b)))
+
+
+def _bucket_id(bucket):
+    """Flat position of a bucket in the 12x12x12 score cube."""
+    life_path, expression, soul_urge = bucket
+    return (life_path * len(NUMBER_SLOTS) + expression) * len(NUMBER_SLOTS) + soul_urge
+
+
+_BUCKETS_BY_ID = [(a, b, c) for a in range(len(NUMBER_SLOTS))
+                  for b in range(len(NUMBER_SLOTS)) for c in range(len(NUMBER_SLOTS))]
+
+
+@lru_cache(maxsize=len(_BUCKETS_BY_ID))
+def _ranked_bucket_ids(bucket):
+    """(bucket ids, scores) of every bucket against `bucket`, best first (computed once per bucket)."""
+    life_path, expression, soul_urge = bucket
+    w_life_path, w_expression, w_soul_urge = COMPATIBILITY_WEIGHTS
+    scores = (w_life_path * COMPATIBILITY_MATRIX[life_path][:, None, None]
+              + w_expression * COMPATIBILITY_MATRIX[expression][None, :, None]
+              + w_soul_urge * COMPATIBILITY_MATRIX[soul_urge][None, None, :]).ravel()
+    order = np.argsort(-scores, kind="stable")
+    return order.tolist(), scores[order].tolist()
+
+
+class CompatibilityIndex:
+    """
+    Inverted index bucket -> {uid: display name} for users listed in matching.
+
+    A query scores the 12^3 buckets (not the users) against the asker's bucket and
+    walks them best first, so top-k costs O(k) plus one cached bucket ranking,
+    however many users are listed. `database_factory` returns a fresh pyrebase
+    Database handle; the index is read from INDEX_PATH on first use (the
+    database rules must let signed-in users read it) and re-read in the
+    background once it is `reload_seconds` old, so listings made by other
+    processes show up. Every change made through update_profile() is written
+    back with one multi-path update, through `write_queue` if given (merged with
+    the user's other queued changes); a queued change is visible at once, kept
+    across reloads until it is stored, and rolled back if the queue gives up.
+    """
+
+    def __init__(self, database_factory=None, write_queue=None, reload_seconds=INDEX_RELOAD_SECONDS,
+                 clock=time.monotonic):
+        self._database_factory = database_factory
+        self._write_queue = write_queue
+        self.reload_seconds = reload_seconds
+        self._clock = clock
+        self._buckets = {} # bucket id -> {uid: display name}
+        self._user_buckets = {} # uid -> bucket
+        self._unconfirmed = {} # uid -> (bucket, display name) or None: queued, not yet stored
+        self._lock = threading.Lock()
+        self._loaded = database_factory is None
+        self._loaded_at = clock()
+        self._reloading = False
+
+    def __len__(self):
+        return len(self._user_buckets)
+
+    def ensure_loaded(self, id_token):
+        """Loads the index on first use; refreshes it in the background once it is stale."""
+        if not self._loaded:
+            self.reload(id_token)
+        elif self._database_factory is not None and self._clock() - self._loaded_at >= self.reload_seconds:
+            self._reload_in_background(id_token)
+
+    def reload(self, id_token):
+        """Replaces the in-memory index with the one stored in the database (plus queued changes)."""
+        data = self._database_factory().child(INDEX_PATH).get(id_token).val() or {}
+        buckets = {}
+        user_buckets = {}
+        for key, users in data.items():
+            bucket = _parse_bucket_path(key)
+            if bucket is None or not isinstance(users, dict):
+                continue
+            buckets[_bucket_id(bucket)] = dict(users)
+            user_buckets.update(dict.fromkeys(users, bucket))
+        with self._lock:
+            self._buckets = buckets
+            self._user_buckets = user_buckets
+            for uid, listing in self._unconfirmed.items(): # The snapshot may predate them
+                self._set_listing(uid, listing)
+            self._loaded = True
+            self._loaded_at = self._clock()
+
+    def _reload_in_background(self, id_token):
+        with self._lock:
+            if self._reloading:
+                return
+            self._reloading = True
+        threading.Thread(target=self._background_reload, args=(id_token,), name="compatibility-reload",
+                         daemon=True).start()
+
+    def _background_reload(self, id_token):
+        try:
+            self.reload(id_token)
+        except Exception as e: # Keep serving the current index; try again after another reload_seconds
+            logger.warning("Compatibility index reload failed: %s", e)
+            self._loaded_at = self._clock()
+        finally:
+            with self._lock:
+                self._reloading = False
+
+    def add(self, uid, bucket, display_name=""):
+        """Lists `uid` in `bucket` (in memory only), moving it from its old bucket if needed."""
+        with self._lock:
+            self._set_listing(uid, (bucket, display_name))
+
+    def remove(self, uid):
+        """Unlists `uid` (in memory only)."""
+        with self._lock:
+            self._set_listing(uid, None)
+
+    # Called with the lock held
+    def _listing(self, uid):
+        bucket = self._user_buckets.get(uid)
+        return None if bucket is None else (bucket, self._buckets[_bucket_id(bucket)][uid])
+
+    def _set_listing(self, uid, listing):
+        bucket = self._user_buckets.pop(uid, None)
+        if bucket is not None:
+            bucket_id = _bucket_id(bucket)
+            users = self._buckets[bucket_id]
+            users.pop(uid, None)
+            if not users:
+                del self._buckets[bucket_id]
+        if listing is not None:
+            bucket, display_name = listing
+            self._buckets.setdefault(_bucket_id(bucket), {})[uid] = display_name
+            self._user_buckets[uid] = bucket
+
+    def is_listed(self, uid):
+        return uid in self._user_buckets
+
+    def bucket_of(self, uid):
+        return self._user_buckets.get(uid)
+
+    def update_profile(self, uid, id_token, name, dob, system=DEFAULT_SYSTEM, listed=True):
+        """
+        Re-buckets (or unlists) a user after a profile change and persists it
+        (`id_token` may be a token provider). Returns the user's bucket, or None
+        if they aren't listed.
+        """
+        self.ensure_loaded(resolve_token(id_token))
+        with self._lock:
+            previous = self._listing(uid)
+        old_bucket = previous[0] if previous else None
+        new_bucket = profile_bucket(name, dob, system) if listed else None
+        first_names = (name or "").split()
+        listing = None if new_bucket is None else (new_bucket, first_names[0] if first_names else "") # Only the first name is shared
+        changes = {}
+        if old_bucket is not None and old_bucket != new_bucket:
+            changes[f"{bucket_path(old_bucket)}/{uid}"] = None
+        if listing is not None:
+            changes[f"{bucket_path(new_bucket)}/{uid}"] = listing[1]
+        if changes and self._write_queue is not None:
+            with self._lock:
+                self._set_listing(uid, listing)
+                self._unconfirmed[uid] = listing
+            self._write_queue.enqueue(uid, id_token, {f"{INDEX_PATH}/{path}": value for path, value in changes.items()},
+                                      on_failure=lambda uid, error: self._roll_back(uid, listing, previous),
+                                      on_success=lambda uid: self._confirm(uid, listing))
+            return new_bucket
+        if changes and self._database_factory is not None:
+            self._database_factory().child(INDEX_PATH).update(changes, resolve_token(id_token))
+        with self._lock:
+            self._set_listing(uid, listing)
+        return new_bucket
+
+    def _confirm(self, uid, listing):
+        with self._lock:
+            if self._unconfirmed.get(uid, _MISSING) == listing: # Not superseded by a later queued change
+                del self._unconfirmed[uid]
+
+    def _roll_back(self, uid, listing, previous):
+        # The queue calls these newest first, so undoing a run of failed changes ends at the stored state
+        with self._lock:
+            if self._unconfirmed.get(uid, _MISSING) == listing:
+                del self._unconfirmed[uid]
+            if self._listing(uid) == listing:
+                self._set_listing(uid, previous)
+
+    def top_matches(self, bucket, k=10, exclude=None):
+        """The k best-scoring listed users for `bucket` (ties in no particular order)."""
+        matches = []
+        with self._lock:
+            for candidate, score in zip(*_ranked_bucket_ids(bucket)):
+                users = self._buckets.get(candidate)
+                if not users:
+                    continue
+                numbers = bucket_numbers(_BUCKETS_BY_ID[candidate])
+                for uid, display_name in users.items():
+                    if uid == exclude:
+                        continue
+                    matches.append(Match(uid, display_name, *numbers, score))
+                    if len(matches) == k:
+                        return matches
+        return matches
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_compatibility_index(database_factory, write_queue=None):
+    """Returns the process-wide CompatibilityIndex, creating it on first call."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = CompatibilityIndex(database_factory, write_queue)
+    return _index
@@ -0,0 +1,184 @@
+# Two-tier (in-memory LRU + on-disk SQLite) cache for LLM interpretations,
+# with identical concurrent requests collapsed into a single in-flight call.
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "interpretations.sqlite3")
+MEMORY_MAX_ENTRIES = 512
+DISK_MAX_ENTRIES = 20000
+TTL_SECONDS = 30 * 24 * 3600 # Interpretations don't go stale quickly
+
+
+def normalize_prompt(prompt):
+    """Collapses whitespace so cosmetic prompt differences share one cache entry."""
+    return " ".join(prompt.split())
+
+
+def cache_key(model_name, prompt):
+    return hashlib.sha256(f"{model_name}\0{normalize_prompt(prompt)}".encode("utf-8")).hexdigest()
+
+
+class InterpretationCache:
+    """
+    get_or_compute(model_name, prompt, compute) returns the cached text for
+    (model, normalized prompt), or calls `compute()` once and stores its result.
+
+    Lookups go memory LRU -> SQLite -> compute. Both tiers expire entries after
+    `ttl_seconds`; the memory tier keeps at most `memory_max_entries` and the disk
+    tier at most `disk_max_entries` (least recently used are evicted first).
+    Exceptions from `compute()` propagate to every waiter and are never cached;
+    a waiter on someone else's call gives up after `wait_timeout` seconds.
+    Pass db_path=None for a memory-only cache.
+    """
+
+    def __init__(self, db_path=DEFAULT_CACHE_PATH, memory_max_entries=MEMORY_MAX_ENTRIES,
+                 disk_max_entries=DISK_MAX_ENTRIES, ttl_seconds=TTL_SECONDS, clock=time.time):
+        self.memory_max_entries = memory_max_entries
+        self.disk_max_entries = disk_max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._memory = OrderedDict() # key -> (expires_at, text)
+        self._lock = threading.Lock()
+        self._in_flight = {} # key -> Future
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "collapsed": 0}
+
+        self._db = None
+        self._db_lock = threading.Lock()
+        if db_path:
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS interpretations ("
+                " key TEXT PRIMARY KEY, model TEXT NOT NULL, text TEXT NOT NULL,"
+                " expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS interpretations_last_access ON interpretations (last_access)")
+
+    # --- Memory tier ---
+    def _memory_get(self, key, now):
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= now:
+            del self._memory[key]
+            return None
+        self._memory.move_to_end(key)
+        return entry[1]
+
+    def _memory_put(self, key, text, expires_at):
+        self._memory[key] = (expires_at, text)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_max_entries:
+            self._memory.popitem(last=False)
+
+    # --- Disk tier ---
+    def _disk_get(self, key, now):
+        if self._db is None:
+            return None
+        with self._db_lock:
+            row = self._db.execute("SELECT text, expires_at FROM interpretations WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                self._db.execute("DELETE FROM interpretations WHERE key = ?", (key,))
+                return None
+            self._db.execute("UPDATE interpretations SET last_access = ? WHERE key = ?", (now, key))
+            return row
+
+    def _disk_put(self, key, model_name, text, expires_at, now):
+        if self._db is None:
+            return
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO interpretations (key, model, text, expires_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, model_name, text, expires_at, now),
+            )
+            self._db.execute("DELETE FROM interpretations WHERE expires_at <= ?", (now,))
+            (count,) = self._db.execute("SELECT COUNT(*) FROM interpretations").fetchone()
+            if count > self.disk_max_entries:
+                self._db.execute(
+                    "DELETE FROM interpretations WHERE key IN"
+                    " (SELECT key FROM interpretations ORDER BY last_access LIMIT ?)",
+                    (count - self.disk_max_entries,),
+                )
+
+    def get(self, model_name, prompt):
+        """Cached text or None, without computing anything."""
+        key = cache_key(model_name, prompt)
+        now = self._clock()
+        with self._lock:
+            text = self._memory_get(key, now)
+        if text is not None:
+            return text
+        row = self._disk_get(key, now)
+        if row is None:
+            return None
+        with self._lock:
+            self._memory_put(key, row[0], row[1])
+        return row[0]
+
+    def get_or_compute(self, model_name, prompt, compute, wait_timeout=None):
+        key = cache_key(model_name, prompt)
+        now = self._clock()
+        with self._lock:
+            text = self._memory_get(key, now)
+            if text is not None:
+                self.stats["memory_hits"] += 1
+                return text
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._in_flight[key] = future
+            else:
+                self.stats["collapsed"] += 1
+        if not leader:
+            return future.result(timeout=wait_timeout)
+
+        try:
+            row = self._disk_get(key, now)
+            if row is not None:
+                text, expires_at = row
+                self.stats["disk_hits"] += 1
+            else:
+                self.stats["misses"] += 1
+                text = compute()
+                expires_at = self._clock() + self.ttl_seconds
+                self._disk_put(key, model_name, text, expires_at, self._clock())
+            with self._lock:
+                self._memory_put(key, text, expires_at)
+            future.set_result(text)
+            return text
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM interpretations")
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_interpretation_cache():
+    """Returns the process-wide InterpretationCache, creating it on first call."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = InterpretationCache()
+    return _cache
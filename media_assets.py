@@ -0,0 +1,161 @@
+# Static media helpers: files under ./static are served by Streamlit at app/static/
+# (server.enableStaticServing in .streamlit/config.toml), with ETag/Range support,
+# so the browser downloads them once instead of receiving them inline on every rerun.
+import hashlib
+import html
+import io
+import os
+import shutil
+import subprocess
+import threading
+
+from PIL import Image
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+STATIC_URL_PREFIX = "app/static/"
+
+OPUS_BITRATE = "64k"
+
+# Pre-resized image variants are written here and served like any other static file
+GENERATED_DIR = "generated"
+IMAGE_FORMATS = (("WEBP", "webp", "image/webp"), ("PNG", "png", "image/png"))
+IMAGE_SCALES = (1, 2) # 1x plus a 2x variant for high-DPI screens
+
+# Process-wide cache: (path, mtime_ns, size, width) -> {"variants": {(format, scale): bytes}, "urls": {...}}
+_image_cache = {}
+_image_cache_lock = threading.Lock()
+
+
+def _file_version(stat):
+    return hashlib.sha1(f"{stat.st_size}:{stat.st_mtime_ns}".encode()).hexdigest()[:10]
+
+
+def static_path(filename):
+    """Absolute path of a file in the static folder."""
+    return os.path.join(STATIC_DIR, filename)
+
+
+def static_url(filename):
+    """
+    URL of a static file, versioned by its size and mtime so a changed file gets a
+    new URL while an unchanged one stays cached (ETag revalidation costs a 304).
+    """
+    return f"{STATIC_URL_PREFIX}{filename}?v={_file_version(os.stat(static_path(filename)))}"
+
+
+def build_compressed_audio(wav_filename):
+    """
+    Encodes static/<name>.wav to static/<name>.ogg (Opus) with ffmpeg, if available.
+    Skips the work when the .ogg is already newer than the .wav.
+    Returns the .ogg filename, or None when no compressed variant could be made.
+    """
+    wav_path = static_path(wav_filename)
+    ogg_filename = os.path.splitext(wav_filename)[0] + ".ogg"
+    ogg_path = static_path(ogg_filename)
+    if os.path.exists(ogg_path) and os.path.getmtime(ogg_path) >= os.path.getmtime(wav_path):
+        return ogg_filename
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        return None
+    tmp_path = ogg_path + ".tmp"
+    try:
+        subprocess.run(
+            [ffmpeg, "-y", "-loglevel", "error", "-i", wav_path,
+             "-c:a", "libopus", "-b:a", OPUS_BITRATE, "-f", "ogg", tmp_path],
+            check=True, timeout=120,
+        )
+        os.replace(tmp_path, ogg_path) # Atomic, so concurrent sessions never see a partial file
+    except (OSError, subprocess.SubprocessError):
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return None
+    return ogg_filename
+
+
+def get_audio_sources(wav_filename, compress=True):
+    """
+    Returns [(url, mime_type), ...] for an <audio> element, best format first.
+    Raises FileNotFoundError if the .wav is missing from the static folder.
+    """
+    if not os.path.exists(static_path(wav_filename)):
+        raise FileNotFoundError(static_path(wav_filename))
+    sources = []
+    if compress:
+        ogg_filename = build_compressed_audio(wav_filename)
+        if ogg_filename:
+            sources.append((static_url(ogg_filename), "audio/ogg; codecs=opus"))
+    sources.append((static_url(wav_filename), "audio/wav"))
+    return sources
+
+
+def _encode_image(image, width, image_format):
+    height = max(1, round(image.height * width / image.width))
+    resized = image.resize((width, height), resample=Image.LANCZOS)
+    buffer = io.BytesIO()
+    if image_format == "WEBP":
+        resized.save(buffer, format="WEBP", quality=85, method=6)
+    else:
+        resized.save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
+
+
+def _build_image_entry(path, width, version):
+    """Encodes every format/scale variant and publishes them under static/generated/."""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    os.makedirs(static_path(GENERATED_DIR), exist_ok=True)
+    variants = {}
+    urls = {}
+    with Image.open(path) as source:
+        source = source.convert("RGBA")
+        for image_format, extension, _ in IMAGE_FORMATS:
+            for scale in IMAGE_SCALES:
+                # Never upscale: a small source just yields identical 1x/2x files
+                data = _encode_image(source, min(width * scale, source.width), image_format)
+                # The version is part of the name, so a changed source gets new URLs
+                filename = f"{GENERATED_DIR}/{stem}-{width}w-{version}@{scale}x.{extension}"
+                target = static_path(filename)
+                if not os.path.exists(target):
+                    tmp_path = f"{target}.{os.getpid()}.tmp"
+                    with open(tmp_path, "wb") as f:
+                        f.write(data)
+                    os.replace(tmp_path, target)
+                variants[(image_format, scale)] = data
+                urls[(image_format, scale)] = STATIC_URL_PREFIX + filename
+    return {"variants": variants, "urls": urls}
+
+
+def _get_image_entry(path, width):
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size, width)
+    entry = _image_cache.get(key)
+    if entry is None:
+        with _image_cache_lock:
+            entry = _image_cache.get(key)
+            if entry is None:
+                entry = _build_image_entry(path, width, _file_version(stat))
+                _image_cache[key] = entry
+    return entry
+
+
+def get_image_variant(path, width, image_format="WEBP", scale=1):
+    """Cached bytes of `path` resized to `width` * `scale` pixels in WEBP or PNG."""
+    return _get_image_entry(path, width)["variants"][(image_format.upper(), scale)]
+
+
+def get_image_html(path, width, alt=""):
+    """
+    <picture> markup (WebP with PNG fallback, 1x/2x srcset) for showing `path` at
+    `width` CSS pixels. The variants are built once per process and reused by
+    every caller until the source file changes.
+    """
+    urls = _get_image_entry(path, width)["urls"]
+
+    def srcset(image_format):
+        return ", ".join(f"{urls[(image_format, scale)]} {scale}x" for scale in IMAGE_SCALES)
+
+    return (
+        "<picture>"
+        f'<source type="image/webp" srcset="{srcset("WEBP")}">'
+        f'<img src="{urls[("PNG", 1)]}" srcset="{srcset("PNG")}" width="{width}" alt="{html.escape(alt)}">'
+        "</picture>"
+    )
@@ -1,211 +1,171 @@
 import streamlit as st
 import datetime
-import base64
-import pyrebase # Make sure you have installed: pip install pyrebase4
-
-# --- Initialize Firebase ---
-try:
-    # Load Firebase configuration from st.secrets
-    firebaseConfig = {
-        "apiKey": st.secrets.firebase.apiKey,
-        "authDomain": st.secrets.firebase.authDomain,
-        "projectId": st.secrets.firebase.projectId,
-        "storageBucket": st.secrets.firebase.storageBucket,
-        "messagingSenderId": st.secrets.firebase.messagingSenderId,
-        "appId": st.secrets.firebase.appId,
-        "databaseURL": st.secrets.firebase.databaseURL # Make sure this is in your secrets.toml
-    }
-    firebase = pyrebase.initialize_app(firebaseConfig)
-    auth = firebase.auth()
-    db = firebase.database() # Initialize Realtime Database
-except AttributeError as e:
-    st.error(f"Missing Firebase configuration in .streamlit/secrets.toml. Please ensure all keys are present: {e}")
-    st.stop() # Stop the app if Firebase config is missing
-except Exception as e:
-    st.error(f"Firebase initialization error: {e}")
-    st.stop() # Stop the app if Firebase can't be initialized
-
-
-# --- GLOBAL DATE DEFINITIONS ---
-today = datetime.date.today()
-min_allowed_dob = today.replace(year=today.year - 100)
-# --- END GLOBAL DATE DEFINITIONS ---
-
-# --- Session State Management ---
-if 'logged_in' not in st.session_state:
-    st.session_state['logged_in'] = False
-if 'user_info' not in st.session_state:
-    st.session_state['user_info'] = None # Stores Firebase user object
-if 'user_profile' not in st.session_state:
-    st.session_state['user_profile'] = {'name': '', 'dob': None, 'is_profile_loaded': False} # Added flag
-if 'display_error_message' not in st.session_state:
-    st.session_state['display_error_message'] = None
-if 'current_screen' not in st.session_state:
-    st.session_state['current_screen'] = 'login' # 'login', 'register', or 'app'
-
-# --- Helper functions ---
-def set_error_message(message):
-    st.session_state['display_error_message'] = message
-
-def clear_error_message():
-    st.session_state['display_error_message'] = None
-
-# Register function remains the same (simplified)
-def register_user(email, password):
-    clear_error_message()
+
+import tracing
+
+# Times this whole script run and exports the spans (to NAMASKAR_TRACING_EXPORT, if set)
+# when it ends, also when it ends early in st.rerun() or st.stop()
+with tracing.script_run("script.total"):
+    from auth_session import AuthSession
+    from chat import get_chat_broker
+    from compatibility import INDEX_PATH, get_compatibility_index
+    from firebase_client import get_firebase_client # pyrebase (pip install pyrebase4) is imported lazily in here
+    from media_assets import get_audio_sources, get_image_html
+    from profile_repository import get_profile_repository
+    from sections import SECTIONS, SectionContext, render_section
+    from sections.chat import render as render_chat
+    from write_queue import get_write_queue
+
+    # --- Initialize Firebase ---
     try:
-        auth.create_user_with_email_and_password(email, password)
-        st.success("Registration successful! Please log in with your new account.")
-        st.session_state['current_screen'] = 'login' # Redirect to login
-        st.rerun()
+        # Load Firebase configuration from st.secrets
+        firebaseConfig = {
+            "apiKey": st.secrets.firebase.apiKey,
+            "authDomain": st.secrets.firebase.authDomain,
+            "projectId": st.secrets.firebase.projectId,
+            "storageBucket": st.secrets.firebase.storageBucket,
+            "messagingSenderId": st.secrets.firebase.messagingSenderId,
+            "appId": st.secrets.firebase.appId,
+            "databaseURL": st.secrets.firebase.databaseURL # Make sure this is in your secrets.toml
+        }
+        # Created once per process and initialized on first use; reruns only get cheap
+        # handles on the shared, pooled session
+        firebase = get_firebase_client(firebaseConfig)
+        auth = firebase.auth()
+        # Profile and matching-index writes are queued, merged per user and top-level path and sent off the render thread
+        writes = get_write_queue(firebase.database)
+        profiles = get_profile_repository(firebase.database, writes) # Profile cache shared by all sessions
+        compatibility = get_compatibility_index(firebase.database, writes) # Matching index shared by all sessions
+        chat_broker = get_chat_broker(firebase.database) # Live chat fan-out and batched message writes
+    except AttributeError as e:
+        st.error(f"Missing Firebase configuration in .streamlit/secrets.toml. Please ensure all keys are present: {e}")
+        st.stop() # Stop the app if Firebase config is missing
     except Exception as e:
-        error_message = str(e)
-        if "EMAIL_EXISTS" in error_message:
-            set_error_message("This email is already registered.")
-        elif "WEAK_PASSWORD" in error_message:
-            set_error_message("Password should be at least 6 characters.")
-        elif "INVALID_EMAIL" in error_message:
-            set_error_message("Invalid email format.")
-        else:
-            set_error_message(f"Registration failed: {error_message}")
-        st.rerun()
+        st.error(f"Firebase initialization error: {e}")
+        st.stop() # Stop the app if Firebase can't be initialized
+
+
+    # --- GLOBAL DATE DEFINITIONS ---
+    today = datetime.date.today()
+    min_allowed_dob = today.replace(year=today.year - 100)
+    # --- END GLOBAL DATE DEFINITIONS ---
+
+    # --- Session State Management ---
+    if 'logged_in' not in st.session_state:
+        st.session_state['logged_in'] = False
+    if 'user_info' not in st.session_state:
+        st.session_state['user_info'] = None # Stores Firebase user object
+    if 'user_profile' not in st.session_state:
+        st.session_state['user_profile'] = {'name': '', 'dob': None, 'is_profile_loaded': False} # Added flag
+    if 'display_error_message' not in st.session_state:
+        st.session_state['display_error_message'] = None
+    if 'current_screen' not in st.session_state:
+        st.session_state['current_screen'] = 'login' # 'login', 'register', or 'app'
+
+    # --- Helper functions ---
+    def set_error_message(message):
+        st.session_state['display_error_message'] = message
+
+    def clear_error_message():
+        st.session_state['display_error_message'] = None
+
+    # Register function remains the same (simplified)
+    def register_user(email, password):
+        clear_error_message()
+        try:
+            with tracing.span("firebase.create_user"):
+                auth.create_user_with_email_and_password(email, password)
+            st.success("Registration successful! Please log in with your new account.")
+            st.session_state['current_screen'] = 'login' # Redirect to login
+            st.rerun()
+        except Exception as e:
+            error_message = str(e)
+            if "EMAIL_EXISTS" in error_message:
+                set_error_message("This email is already registered.")
+            elif "WEAK_PASSWORD" in error_message:
+                set_error_message("Password should be at least 6 characters.")
+            elif "INVALID_EMAIL" in error_message:
+                set_error_message("Invalid email format.")
+            else:
+                set_error_message(f"Registration failed: {error_message}")
+            st.rerun()
+
+    def load_user_profile(user):
+        """Reads the saved profile once (through the shared cache) into session state shape."""
+        try:
+            with tracing.span("firebase.profile_read"):
+                profile = profiles.get(user['localId'], user['idToken'])
+        except Exception:
+            profile = None # Don't block login on a profile read error; the user can re-save it
+        if not profile:
+            return {'name': '', 'dob': None, 'is_profile_loaded': False}
+        return {'name': profile['name'], 'dob': profile['dob'], 'numerology_system': profile['numerology_system'],
+                'birth_time': profile['birth_time'], 'birth_place': profile['birth_place'], 'is_profile_loaded': True}
+
+    # Top-level path -> what a queued write there that was given up on didn't do
+    WRITE_FAILURE_MESSAGES = {
+        "users": "Your profile changes could not be saved",
+        INDEX_PATH: "Your compatibility listing could not be updated",
+    }
 
-# MODIFIED: login_user now ONLY authenticates and redirects to app screen
-def login_user(email, password):
-    clear_error_message()
-    try:
-        user = auth.sign_in_with_email_and_password(email, password)
-        st.session_state['user_info'] = user
-        st.session_state['logged_in'] = True
-        # NEW: Initialize user_profile to empty and set flag to false,
-        # indicating it needs to be loaded when the profile tab is visited.
+    def report_write_failures():
+        """Shows this user's queued writes that were given up on; runs inside the section fragment."""
+        auth_session = st.session_state.get('auth_session')
+        if auth_session is None:
+            return
+        for root, message in WRITE_FAILURE_MESSAGES.items():
+            write_failure = writes.failure(auth_session.uid, root)
+            if write_failure:
+                if root == "users": # The profile shown was updated before the write was sent; show what is stored
+                    st.session_state['user_profile'] = load_user_profile(auth_session.user)
+                st.error(f"{message}: {write_failure}. Please try again.")
+
+    # login_user authenticates, loads the saved profile and redirects to app screen
+    def login_user(email, password):
+        clear_error_message()
+        try:
+            with tracing.span("firebase.sign_in"):
+                user = auth.sign_in_with_email_and_password(email, password)
+            st.session_state['user_info'] = user
+            # Keeps user['idToken'] fresh past its one-hour lifetime
+            st.session_state['auth_session'] = AuthSession(auth, user)
+            st.session_state['logged_in'] = True
+            # One read-through fetch of users/<localId>; repeat logins are served from the cache
+            st.session_state['user_profile'] = load_user_profile(user)
+            st.session_state['current_screen'] = 'app'
+            st.success("Login successful!")
+            st.rerun()
+        except Exception as e:
+            error_message = str(e)
+            if "INVALID_LOGIN_CREDENTIALS" in error_message or "EMAIL_NOT_FOUND" in error_message or "WRONG_PASSWORD" in error_message:
+                 set_error_message("Invalid email or password.")
+            else:
+                 set_error_message(f"Login failed: {error_message}")
+            st.rerun()
+
+    def logout_user(message=None):
+        clear_error_message()
+        if message:
+            set_error_message(message) # Shown on the login screen
+        st.session_state['logged_in'] = False
+        st.session_state['user_info'] = None
+        st.session_state.pop('auth_session', None) # Queued writes keep their own reference until sent
+        # Reset profile state completely on logout
         st.session_state['user_profile'] = {'name': '', 'dob': None, 'is_profile_loaded': False}
-        st.session_state['current_screen'] = 'app'
-        st.success("Login successful!")
-        st.rerun()
-    except Exception as e:
-        error_message = str(e)
-        if "INVALID_LOGIN_CREDENTIALS" in error_message or "EMAIL_NOT_FOUND" in error_message or "WRONG_PASSWORD" in error_message:
-             set_error_message("Invalid email or password.")
-        else:
-             set_error_message(f"Login failed: {error_message}")
+        chat_state = st.session_state.pop('chat', None)
+        if chat_state:
+            chat_state['subscription'].close()
+        st.session_state.pop('chat_inbox', None)
+        st.session_state['current_screen'] = 'login'
+        st.success("Logged out successfully.")
         st.rerun()
 
-def logout_user():
-    clear_error_message()
-    st.session_state['logged_in'] = False
-    st.session_state['user_info'] = None
-    # Reset profile state completely on logout
-    st.session_state['user_profile'] = {'name': '', 'dob': None, 'is_profile_loaded': False}
-    st.session_state['current_screen'] = 'login'
-    st.success("Logged out successfully.")
-    st.rerun()
-
-
-# --- Numerology Calculation Logic ---
-
-# Standard Pythagorean Numerology mapping
-NUMEROLOGY_MAP = {
-    'A': 1, 'J': 1, 'S': 1,
-    'B': 2, 'K': 2, 'T': 2,
-    'C': 3, 'L': 3, 'U': 3,
-    'D': 4, 'M': 4, 'V': 4,
-    'E': 5, 'N': 5, 'W': 5,
-    'F': 6, 'O': 6, 'X': 6,
-    'G': 7, 'P': 7, 'Y': 7,
-    'H': 8, 'Q': 8, 'Z': 8,
-    'I': 9, 'R': 9
-}
-
-VOWELS = "AEIOU"
-CONSONANTS = "BCDFGHJKLMNPQRSTVWXYZ"
-
-def sum_digits(number):
-    """Sums the digits of a number."""
-    return sum(int(digit) for digit in str(number))
-
-def reduce_number(num):
-    """
-    Reduces a number to a single digit or a master number (11, 22, 33).
-    Master numbers are typically not reduced further in primary numerology calculations.
-    """
-    if not isinstance(num, int): # Ensure input is an integer
-        return None
-    while num > 9 and num not in [11, 22, 33]:
-        num = sum_digits(num)
-    return num
-
-def get_numerology_value(char):
-    """Returns the numerological value for a letter."""
-    return NUMEROLOGY_MAP.get(char.upper(), 0) # Returns 0 for non-alphabetic chars
-
-def calculate_life_path(dob_date):
-    """Calculates the Life Path Number from a birth date."""
-    if not isinstance(dob_date, datetime.date):
-        return None
-    month = reduce_number(dob_date.month)
-    day = reduce_number(dob_date.day)
-    year = reduce_number(dob_date.year)
-
-    if None in [month, day, year]: # Check for valid reduction
-        return None
-
-    life_path_sum = month + day + year
-    return reduce_number(life_path_sum)
-
-def calculate_expression_number(full_name):
-    """Calculates the Expression (Destiny) Number from a full name."""
-    total = 0
-    for char in full_name:
-        total += get_numerology_value(char)
-    return reduce_number(total)
-
-def calculate_soul_urge_number(full_name):
-    """Calculates the Soul Urge (Heart's Desire) Number from vowels in a full name."""
-    total = 0
-    for char in full_name:
-        if char.upper() in VOWELS:
-            total += get_numerology_value(char)
-    return reduce_number(total)
-
-def calculate_personality_number(full_name):
-    """Calculates the Personality Number from consonants in a full name."""
-    total = 0
-    for char in full_name:
-        if char.upper() in CONSONANTS:
-            total += get_numerology_value(char)
-    return reduce_number(total)
-
-def calculate_birth_day_number(dob_date):
-    """Calculates the Birth Day Number from the day of the month."""
-    if not isinstance(dob_date, datetime.date):
-        return None
-    return reduce_number(dob_date.day)
-
-# Simplified Numerology Interpretations
-NUMEROLOGY_INTERPRETATIONS = {
-    1: "The Leader: Independent, ambitious, original, and pioneering. Can be self-centered or aggressive.",
-    2: "The Peacemaker: Diplomatic, cooperative, sensitive, and intuitive. Can be shy or indecisive.",
-    3: "The Communicator: Creative, expressive, optimistic, and social. Can be superficial or scattered.",
-    4: "The Builder: Practical, disciplined, stable, and hardworking. Can be rigid or stubborn.",
-    5: "The Adventurer: Versatile, freedom-loving, adaptable, and restless. Can be irresponsible or impulsive.",
-    6: "The Nurturer: Responsible, loving, compassionate, and family-oriented. Can be self-righteous or meddling.",
-    7: "The Seeker: Analytical, spiritual, introspective, and wise. Can be reclusive or cynical.",
-    8: "The Executive: Ambitious, powerful, organized, and successful. Can be materialistic or controlling.",
-    9: "The Humanitarian: Compassionate, generous, idealistic, and wise. Can be self-sacrificing or emotionally detached.",
-    11: "The Master Intuitor: Highly intuitive, inspiring, and charismatic. Can be overly sensitive or impractical.",
-    22: "The Master Builder: Visionary, practical, powerful, and capable of grand achievements. Can be overwhelming or self-destructive.",
-    33: "The Master Teacher/Healer: Highly compassionate, spiritual, and dedicated to service. Can be overly responsible or martyrdom-prone."
-}
-
-# --- End Numerology Calculation Logic ---
-
-
-
-# --- UI Layout and Styling ---
-st.set_page_config(layout="wide", page_title="Namaskar")
-
-st.markdown("""
+
+
+    # --- UI Layout and Styling ---
+    st.set_page_config(layout="wide", page_title="Namaskar")
+
+    st.markdown("""
 <style>
     /* Overall app styling */
     .main {
@@ -247,247 +207,143 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# --- Add Logo, Title, and Astrologer Photo ---
-col_left_img, col_title, col_right_img = st.columns([1, 4, 1])
-
-with col_left_img:
-    st.image("logo.png", width=100) # Placeholder: Replace "logo.png" with your actual logo file
-
-with col_title:
-    st.markdown("<h1 style='text-align: center;font-size:60px; font-family:Harlow Solid Italic;'>Namaskar</h1>", unsafe_allow_html=True)
-    st.markdown("<h1 style='text-align: center;font-size:30px; font-family:Harlow Solid Italic;'>Spirituality Unlimited!!</h1>",unsafe_allow_html=True)
-with col_right_img:
-    st.image("logo.png", width=100) # Placeholder: Replace "astrologer_photo.png" with your actual photo file
-# --- End Logo, Title, and Astrologer Photo ---
-
-# --- Persistent Error Display ---
-if st.session_state['display_error_message']:
-    st.error(st.session_state['display_error_message'])
-# --- End Persistent Error Display ---
-
-# --- User Authentication Screens ---
-if st.session_state['current_screen'] == 'login':
-    st.subheader("Login to Namaskar")
-    with st.form("login_form"):
-        email = st.text_input("Email", key="login_email")
-        password = st.text_input("Password", type="password", key="login_password")
-        login_button = st.form_submit_button("Login")
-
-        if login_button:
-            if email and password:
-                login_user(email, password)
-            else:
-                set_error_message("Please enter both email and password.")
-
-    st.markdown("---")
-    st.subheader("Don't have an account?")
-    if st.button("Register Here", key="go_to_register"):
-        st.session_state['current_screen'] = 'register'
-        clear_error_message()
-        st.rerun()
-
-elif st.session_state['current_screen'] == 'register':
-    st.subheader("Register for Namaskar")
-    with st.form("register_form"):
-        email = st.text_input("Email", key="register_email")
-        password = st.text_input("Password (min 6 characters)", type="password", key="register_password")
-        confirm_password = st.text_input("Confirm Password", type="password", key="confirm_password")
-        register_button = st.form_submit_button("Register")
-
-        if register_button:
-            if not email:
-                set_error_message("Please enter your email.")
-            elif not password:
-                set_error_message("Please enter a password.")
-            elif password != confirm_password:
-                set_error_message("Passwords do not match.")
-            else:
-                register_user(email, password)
-
-    st.markdown("---")
-    st.subheader("Already have an account?")
-    if st.button("Login Here", key="go_to_login"):
-        st.session_state['current_screen'] = 'login'
-        clear_error_message()
-        st.rerun()
-
-elif st.session_state['current_screen'] == 'app' and st.session_state['logged_in']:
-    # Main app logic - Display content only if logged in
-    # Use a generic welcome until profile is loaded
-    welcome_name = st.session_state['user_profile'].get('name', 'User') if st.session_state['user_profile']['is_profile_loaded'] else 'User'
-    st.sidebar.markdown(f"**Welcome, {welcome_name}!**")
-
-    if st.sidebar.button("Logout"):
-        logout_user()
-
-    st.subheader("Explore Cosmic Word!")
-
-    tab_names = ["Numerology", "Astrology", "Tarot Cards", "Vastu Shastra", "Palmistry", "Aura Reading", "My Profile"]
-    selected_tab_names = st.tabs(tab_names)
-
-    for i, tab in enumerate(selected_tab_names):
-        with tab:
-            if tab_names[i] == "Numerology":
-                st.header("Numerology: Uncover Your Life's Blueprint")
-                st.write("Unlock insights into your personality, destiny, and life's purpose by exploring your core numerology numbers.")
-
-                # Conditional display based on profile completeness
-                if not st.session_state['user_profile']['is_profile_loaded'] or \
-                        not st.session_state['user_profile'].get('name') or \
-                        not st.session_state['user_profile'].get('dob'):
-                        st.warning("Please update your Full Name and Date of Birth in the 'My Profile' tab to use Numerology features.")
+    # --- Add Logo, Title, and Astrologer Photo ---
+    # Pre-resized WebP/PNG variants served from ./static; built once per process and shared by both columns
+    with tracing.span("assets.logo"):
+        logo_html = get_image_html("logo.png", 100, alt="Namaskar")
+
+    col_left_img, col_title, col_right_img = st.columns([1, 4, 1])
+
+    with col_left_img:
+        st.markdown(logo_html, unsafe_allow_html=True) # Placeholder: Replace "logo.png" with your actual logo file
+
+    with col_title:
+        st.markdown("<h1 style='text-align: center;font-size:60px; font-family:Harlow Solid Italic;'>Namaskar</h1>", unsafe_allow_html=True)
+        st.markdown("<h1 style='text-align: center;font-size:30px; font-family:Harlow Solid Italic;'>Spirituality Unlimited!!</h1>",unsafe_allow_html=True)
+    with col_right_img:
+        st.markdown(logo_html, unsafe_allow_html=True) # Placeholder: Replace "logo.png" with your actual photo file
+    # --- End Logo, Title, and Astrologer Photo ---
+
+    # --- Persistent Error Display ---
+    if st.session_state['display_error_message']:
+        st.error(st.session_state['display_error_message'])
+    # --- End Persistent Error Display ---
+
+    # --- User Authentication Screens ---
+    if st.session_state['current_screen'] == 'login':
+        st.subheader("Login to Namaskar")
+        with st.form("login_form"):
+            email = st.text_input("Email", key="login_email")
+            password = st.text_input("Password", type="password", key="login_password")
+            login_button = st.form_submit_button("Login")
+
+            if login_button:
+                if email and password:
+                    login_user(email, password)
                 else:
-                    name_for_numerology = st.session_state['user_profile']['name']
-                    dob_for_numerology = st.session_state['user_profile']['dob']
-
-                    # Display the pre-filled, disabled inputs
-                    st.text_input("Your Full Name", value=name_for_numerology, disabled=True,
-                                  key="numerology_display_name")
-                    st.date_input("Your Birth Date", value=dob_for_numerology, disabled=True,
-                                  key="numerology_display_dob")
-                    st.info("To change Name or Date of Birth, please go to the 'My Profile' tab.")
-
-                    if st.button("Calculate My Numbers", key="calculate_all_numerology"):
-                        st.subheader(f"Numerology Report for {name_for_numerology}, born on {dob_for_numerology}:")
-
-                        # --- Calculate and Display Life Path Number ---
-                        life_path = calculate_life_path(dob_for_numerology)
-                        if life_path is not None:
-                            st.markdown(f"**Life Path Number:** `{life_path}`")
-                            with st.expander(f"Meaning of Life Path Number {life_path}"):
-                                st.write(NUMEROLOGY_INTERPRETATIONS.get(life_path,
-                                                                        "No interpretation found for this number."))
-                        else:
-                            st.error("Could not calculate Life Path Number. Please check your Date of Birth.")
-
-                        # --- Calculate and Display Expression Number ---
-                        expression_number = calculate_expression_number(name_for_numerology)
-                        if expression_number is not None:
-                            st.markdown(f"**Expression/Destiny Number:** `{expression_number}`")
-                            with st.expander(f"Meaning of Expression Number {expression_number}"):
-                                st.write(NUMEROLOGY_INTERPRETATIONS.get(expression_number,
-                                                                        "No interpretation found for this number."))
-                        else:
-                            st.error(
-                                "Could not calculate Expression Number. Please ensure your name is entered correctly.")
-
-                        # --- Calculate and Display Soul Urge Number ---
-                        soul_urge_number = calculate_soul_urge_number(name_for_numerology)
-                        if soul_urge_number is not None:
-                            st.markdown(f"**Soul Urge/Heart's Desire Number:** `{soul_urge_number}`")
-                            with st.expander(f"Meaning of Soul Urge Number {soul_urge_number}"):
-                                st.write(NUMEROLOGY_INTERPRETATIONS.get(soul_urge_number,
-                                                                        "No interpretation found for this number."))
-                        else:
-                            st.error(
-                                "Could not calculate Soul Urge Number. Please ensure your name is entered correctly.")
-
-                        # --- Calculate and Display Personality Number ---
-                        personality_number = calculate_personality_number(name_for_numerology)
-                        if personality_number is not None:
-                            st.markdown(f"**Personality Number:** `{personality_number}`")
-                            with st.expander(f"Meaning of Personality Number {personality_number}"):
-                                st.write(NUMEROLOGY_INTERPRETATIONS.get(personality_number,
-                                                                        "No interpretation found for this number."))
-                        else:
-                            st.error(
-                                "Could not calculate Personality Number. Please ensure your name is entered correctly.")
-
-                        # --- Calculate and Display Birth Day Number ---
-                        birth_day_number = calculate_birth_day_number(dob_for_numerology)
-                        if birth_day_number is not None:
-                            st.markdown(f"**Birth Day Number:** `{birth_day_number}`")
-                            with st.expander(f"Meaning of Birth Day Number {birth_day_number}"):
-                                st.write(NUMEROLOGY_INTERPRETATIONS.get(birth_day_number,"No interpretation found for this number."))
-                        else:
-                            st.error("Could not calculate Birth Day Number. Please check your Date of Birth.")
-
-            elif tab_names[i] == "Astrology":
-                st.header("Astrology: Cosmic Guidance")
-                st.write("Details about Astrology, Natal Charts, Horoscopes, etc.")
-            elif tab_names[i] == "Tarot Cards":
-                st.header("Tarot Cards: Intuitive Insights")
-                st.write("Virtual Tarot readings and interpretations.")
-            elif tab_names[i] == "Vastu Shastra":
-                st.header("Vastu Shastra: Harmonize Your Space")
-                st.write("Principles for architectural harmony.")
-            elif tab_names[i] == "Palmistry":
-                st.header("Palmistry: The Map in Your Hand")
-                st.write("Insights from palm lines and shapes.")
-            elif tab_names[i] == "Aura Reading":
-                st.header("Aura Reading: Vibrational Energy")
-                st.write("Understanding your energy field.")
-
-            # NEW TAB: My Profile - Now loads/updates profile data
-            elif tab_names[i] == "My Profile":
-                st.header("My Profile")
-                st.write("Update your personal information.")
-
-
-                with st.form("profile_update_form"):
-                    current_name = st.session_state['user_profile'].get('name', '')
-                    current_dob = st.session_state['user_profile'].get('dob') or today
-
-                    new_name = st.text_input("Full Name (as on birth certificate)", value=current_name, key="profile_name_input")
-                    new_dob = st.date_input("Date of Birth", value=current_dob, max_value=today,
-                                            min_value=min_allowed_dob, key="profile_dob_input")
-
-                    update_profile_button = st.form_submit_button("Update Profile")
-
-                    if update_profile_button:
-                        if new_name and new_dob:
-                            if st.session_state.get('user_info') and 'localId' in st.session_state['user_info'] and 'idToken' in st.session_state['user_info']:
-                                user_uid = st.session_state['user_info']['localId']
-                                id_token = st.session_state['user_info']['idToken']
-                                try:
-                                    db.child("users").child(user_uid).update({
-                                        "name": new_name,
-                                        "dob": new_dob.isoformat() # Store as ISO format string
-                                    },
-                                    id_token
-                                    )
-                                    st.session_state['user_profile']['name'] = new_name
-                                    st.session_state['user_profile']['dob'] = new_dob
-                                    st.session_state['user_profile']['is_profile_loaded'] = True # Ensure flag is true
-                                    st.success("Your profile information has been updated!")
-                                    st.rerun() # Rerun to refresh welcome message and other pre-filled fields
-                                except Exception as e:
-                                    set_error_message(f"Failed to update profile: {e}. Check database rules.")
-                                    st.rerun()
-                            else:
-                                set_error_message("User information not found. Please log in again.")
-                                st.rerun()
-                        else:
-                            st.warning("Please enter both your full name and birth date.")
-
-
-    st.markdown("---")
-    st.header("Connect with an Expert (Chat)")
-    st.write("This will be our dedicated chat module to connect users with astrologers/practitioners.")
-    st.button("Start a Chat")
-
-# --- Audio Autoplay (Hidden and Muted) ---
-def get_base64_audio(audio_path):
-    try:
-        with open(audio_path, "rb") as f:
-            audio_bytes = f.read()
-        encoded = base64.b64encode(audio_bytes).decode("utf-8")
-        return f"data:audio/wav;base64,{encoded}"
-    except FileNotFoundError:
-        st.warning(f"Audio file not found: {audio_path}")
-        return None
-
-audio_path = "bgm.wav"
-audio_data_url = get_base64_audio(audio_path)
-
-if audio_data_url:
-    st.markdown(
-        f"""
-        <audio autoplay loop style="display:none;">
-            <source src="{audio_data_url}" type="audio/wav">
-            Your browser does not support the audio element.
-        </audio>
-        """,
-        unsafe_allow_html=True
-    )
-# --- End Audio Autoplay ---
\ No newline at end of file
+                    set_error_message("Please enter both email and password.")
+
+        st.markdown("---")
+        st.subheader("Don't have an account?")
+        if st.button("Register Here", key="go_to_register"):
+            st.session_state['current_screen'] = 'register'
+            clear_error_message()
+            st.rerun()
+
+    elif st.session_state['current_screen'] == 'register':
+        st.subheader("Register for Namaskar")
+        with st.form("register_form"):
+            email = st.text_input("Email", key="register_email")
+            password = st.text_input("Password (min 6 characters)", type="password", key="register_password")
+            confirm_password = st.text_input("Confirm Password", type="password", key="confirm_password")
+            register_button = st.form_submit_button("Register")
+
+            if register_button:
+                if not email:
+                    set_error_message("Please enter your email.")
+                elif not password:
+                    set_error_message("Please enter a password.")
+                elif password != confirm_password:
+                    set_error_message("Passwords do not match.")
+                else:
+                    register_user(email, password)
+
+        st.markdown("---")
+        st.subheader("Already have an account?")
+        if st.button("Login Here", key="go_to_login"):
+            st.session_state['current_screen'] = 'login'
+            clear_error_message()
+            st.rerun()
+
+    elif st.session_state['current_screen'] == 'app' and st.session_state['logged_in']:
+        # Main app logic - Display content only if logged in
+        # Use a generic welcome until profile is loaded
+        welcome_name = st.session_state['user_profile'].get('name', 'User') if st.session_state['user_profile']['is_profile_loaded'] else 'User'
+        st.sidebar.markdown(f"**Welcome, {welcome_name}!**")
+
+        if st.sidebar.button("Logout"):
+            logout_user()
+
+        # E.g. a session restored without its token state: send the user back to log in
+        auth_session = st.session_state.get('auth_session')
+        if auth_session is None:
+            logout_user("Please log in again.")
+        # Refreshes the ID token ahead of expiry (in the background until it is nearly due)
+        try:
+            auth_session.token()
+        except Exception:
+            logout_user("Your session has expired. Please log in again.")
+
+        # Admin-only timing panel (emails listed under admin_emails in secrets; tracing must be on)
+        if tracing.is_enabled() and (st.session_state['user_info'] or {}).get('email') in st.secrets.get("admin_emails", []):
+            with st.sidebar.expander("Performance (recent spans)"):
+                st.table([
+                    {"span": name, "count": stats["count"], "p50 ms": round(stats["p50"] * 1000, 2),
+                     "p95 ms": round(stats["p95"] * 1000, 2)}
+                    for name, stats in tracing.summarize().items()
+                ])
+
+        st.subheader("Explore Cosmic Word!")
+
+        # Only the selected section's code (and imports) runs on each rerun
+        section_title = st.radio("Section", list(SECTIONS), horizontal=True, key="active_section",
+                                 label_visibility="collapsed")
+        section_context = SectionContext(profiles=profiles, compatibility=compatibility, chat=chat_broker,
+                                         set_error_message=set_error_message,
+                                         report_write_failures=report_write_failures,
+                                         today=today, min_allowed_dob=min_allowed_dob)
+        render_section(section_title, section_context)
+
+        st.markdown("---")
+        # Not a tab: the chat stays open whichever section is selected
+        render_chat(section_context)
+
+    # --- Audio Autoplay (Hidden and Muted) ---
+    # The audio is served from ./static (see media_assets.py), so each rerun only sends
+    # a few hundred bytes of HTML; the browser fetches and caches the file itself.
+    @st.cache_resource(show_spinner=False)
+    def get_background_audio_sources(audio_filename):
+        # Runs once per process: also builds the compressed Opus variant if ffmpeg is available
+        try:
+            return get_audio_sources(audio_filename)
+        except FileNotFoundError:
+            return None
+
+    audio_filename = "bgm.wav"
+    with tracing.span("assets.audio"):
+        audio_sources = get_background_audio_sources(audio_filename)
+
+    if audio_sources:
+        source_tags = "\n".join(f'<source src="{url}" type="{mime_type}">' for url, mime_type in audio_sources)
+        st.markdown(
+            f"""
+            <audio autoplay loop style="display:none;">
+                {source_tags}
+                Your browser does not support the audio element.
+            </audio>
+            """,
+            unsafe_allow_html=True
+        )
+    else:
+        st.warning(f"Audio file not found: static/{audio_filename}")
+    # --- End Audio Autoplay ---
@@ -0,0 +1,225 @@
+# Offline natal chart engine for the Astrology section: Sun, Moon and planet
+# longitudes, Lagna (ascendant) and whole-sign houses in the Vedic sidereal zodiac.
+#
+# Planets use the JPL Keplerian elements for 1800-2050 (Standish, "Approximate
+# Positions of the Planets"), the Moon the main terms of Meeus' lunar series and
+# Rahu/Ketu the mean lunar node; everything is vectorized across planets and dates
+# with NumPy, so a chart is a few small array operations and needs no network.
+# Accuracy is a few arcminutes, plenty for signs, houses and nakshatras.
+import datetime
+from collections import namedtuple
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+J2000 = 2451545.0
+NATAL_CHART_CACHE_SIZE = 4096
+
+GRAHAS = ("Sun", "Moon", "Mars", "Mercury", "Jupiter", "Venus", "Saturn", "Rahu", "Ketu")
+
+RASHIS = (
+    ("Mesha", "Aries"), ("Vrishabha", "Taurus"), ("Mithuna", "Gemini"), ("Karka", "Cancer"),
+    ("Simha", "Leo"), ("Kanya", "Virgo"), ("Tula", "Libra"), ("Vrishchika", "Scorpio"),
+    ("Dhanu", "Sagittarius"), ("Makara", "Capricorn"), ("Kumbha", "Aquarius"), ("Meena", "Pisces"),
+)
+
+NAKSHATRAS = (
+    "Ashwini", "Bharani", "Krittika", "Rohini", "Mrigashira", "Ardra", "Punarvasu", "Pushya", "Ashlesha",
+    "Magha", "Purva Phalguni", "Uttara Phalguni", "Hasta", "Chitra", "Swati", "Vishakha", "Anuradha", "Jyeshtha",
+    "Mula", "Purva Ashadha", "Uttara Ashadha", "Shravana", "Dhanishta", "Shatabhisha", "Purva Bhadrapada",
+    "Uttara Bhadrapada", "Revati",
+)
+
+# Birth places offered in the profile: name -> (latitude, east longitude, IANA time zone).
+# The zone, not a fixed offset, so summer time and historical offsets (e.g. India's
+# +6:30 war time in 1942-45) are applied for the birth date.
+BIRTH_PLACES = {
+    "Mumbai, India": (19.0760, 72.8777, "Asia/Kolkata"),
+    "Delhi, India": (28.6139, 77.2090, "Asia/Kolkata"),
+    "Bengaluru, India": (12.9716, 77.5946, "Asia/Kolkata"),
+    "Chennai, India": (13.0827, 80.2707, "Asia/Kolkata"),
+    "Kolkata, India": (22.5726, 88.3639, "Asia/Kolkata"),
+    "Hyderabad, India": (17.3850, 78.4867, "Asia/Kolkata"),
+    "Pune, India": (18.5204, 73.8567, "Asia/Kolkata"),
+    "Ahmedabad, India": (23.0225, 72.5714, "Asia/Kolkata"),
+    "Jaipur, India": (26.9124, 75.7873, "Asia/Kolkata"),
+    "Lucknow, India": (26.8467, 80.9462, "Asia/Kolkata"),
+    "Nagpur, India": (21.1458, 79.0882, "Asia/Kolkata"),
+    "Varanasi, India": (25.3176, 82.9739, "Asia/Kolkata"),
+    "Patna, India": (25.5941, 85.1376, "Asia/Kolkata"),
+    "Bhopal, India": (23.2599, 77.4126, "Asia/Kolkata"),
+    "Kochi, India": (9.9312, 76.2673, "Asia/Kolkata"),
+    "Guwahati, India": (26.1445, 91.7362, "Asia/Kolkata"),
+    "Chandigarh, India": (30.7333, 76.7794, "Asia/Kolkata"),
+    "Kathmandu, Nepal": (27.7172, 85.3240, "Asia/Kathmandu"),
+    "Colombo, Sri Lanka": (6.9271, 79.8612, "Asia/Colombo"),
+    "Dhaka, Bangladesh": (23.8103, 90.4125, "Asia/Dhaka"),
+    "Dubai, UAE": (25.2048, 55.2708, "Asia/Dubai"),
+    "Singapore": (1.3521, 103.8198, "Asia/Singapore"),
+    "London, UK": (51.5074, -0.1278, "Europe/London"),
+    "New York, USA": (40.7128, -74.0060, "America/New_York"),
+    "San Francisco, USA": (37.7749, -122.4194, "America/Los_Angeles"),
+    "Toronto, Canada": (43.6532, -79.3832, "America/Toronto"),
+    "Sydney, Australia": (-33.8688, 151.2093, "Australia/Sydney"),
+}
+DEFAULT_BIRTH_PLACE = "Delhi, India"
+DEFAULT_BIRTH_TIME = datetime.time(12, 0)
+
+# JPL Keplerian elements at J2000 and their rates per Julian century:
+# a (AU), e, I, L, longitude of perihelion, longitude of ascending node (degrees)
+_PLANET_NAMES = ("Earth", "Mercury", "Venus", "Mars", "Jupiter", "Saturn")
+_ELEMENTS = np.array([
+    [1.00000261, 0.01671123, -0.00001531, 100.46457166, 102.93768193, 0.0],
+    [0.38709927, 0.20563593, 7.00497902, 252.25032350, 77.45779628, 48.33076593],
+    [0.72333566, 0.00677672, 3.39467605, 181.97909950, 131.60246718, 76.67984255],
+    [1.52371034, 0.09339410, 1.84969142, -4.55343205, -23.94362959, 49.55953891],
+    [5.20288700, 0.04838624, 1.30439695, 34.39644051, 14.72847983, 100.47390909],
+    [9.53667594, 0.05386179, 2.48599187, 49.95424423, 92.59887831, 113.66242448],
+])
+_RATES = np.array([
+    [0.00000562, -0.00004392, -0.01294668, 35999.37244981, 0.32327364, 0.0],
+    [0.00000037, 0.00001906, -0.00594749, 149472.67411175, 0.16047689, -0.12534081],
+    [0.00000390, -0.00004107, -0.00078890, 58517.81538729, 0.00268329, -0.27769418],
+    [0.00001847, 0.00007882, -0.00813131, 19140.30268499, 0.44441088, -0.29257343],
+    [-0.00011607, -0.00013253, -0.00183714, 3034.74612775, 0.21252668, 0.20469106],
+    [-0.00125060, -0.00050991, 0.00193609, 1222.49362201, -0.41897216, -0.28867794],
+])
+
+# Meeus ch. 47 lunar longitude terms: (D, M, M', F multipliers, amplitude in degrees)
+_MOON_TERMS = np.array([
+    [0, 0, 1, 0, 6.288774], [2, 0, -1, 0, 1.274027], [2, 0, 0, 0, 0.658314], [0, 0, 2, 0, 0.213618],
+    [0, 1, 0, 0, -0.185116], [0, 0, 0, 2, -0.114332], [2, 0, -2, 0, 0.058793], [2, -1, -1, 0, 0.057066],
+    [2, 0, 1, 0, 0.053322], [2, -1, 0, 0, 0.045758], [0, 1, -1, 0, -0.040923], [1, 0, 0, 0, -0.034720],
+    [0, 1, 1, 0, -0.030383], [2, 0, 0, -2, 0.015327], [0, 0, 1, 2, -0.012528], [0, 0, 1, -2, 0.010980],
+    [4, 0, -1, 0, 0.010675], [0, 0, 3, 0, 0.010034], [4, 0, -2, 0, 0.008548], [2, 1, -1, 0, -0.007888],
+    [2, 1, 0, 0, -0.006766], [1, 0, -1, 0, -0.005163], [1, 1, 0, 0, 0.004987], [2, -1, 1, 0, 0.004036],
+])
+
+# General precession in longitude, degrees per Julian century (J2000 ecliptic -> ecliptic of date)
+_PRECESSION_PER_CENTURY = 5028.796195 / 3600
+
+
+def birth_moment_utc(dob, birth_time, birth_place):
+    """Naive UTC datetime of a local birth time at a BIRTH_PLACES key (an hour repeated by a clock change counts as the first)."""
+    local = datetime.datetime.combine(dob, birth_time, tzinfo=ZoneInfo(BIRTH_PLACES[birth_place][2]))
+    return local.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+
+
+def julian_day(moment_utc):
+    """Julian Day for a naive UTC datetime."""
+    return J2000 + (moment_utc - datetime.datetime(2000, 1, 1, 12)).total_seconds() / 86400
+
+
+def lahiri_ayanamsa(jd):
+    """Lahiri (Chitrapaksha) ayanamsa in degrees: 23°51'11" at J2000 plus precession."""
+    return 23.853 + _PRECESSION_PER_CENTURY * (np.asarray(jd) - J2000) / 36525
+
+
+def _solve_kepler(mean_anomaly, eccentricity):
+    """Eccentric anomaly (radians) for arrays of mean anomalies (radians), by Newton's method."""
+    eccentric = mean_anomaly + eccentricity * np.sin(mean_anomaly)
+    for _ in range(6):
+        eccentric -= (eccentric - eccentricity * np.sin(eccentric) - mean_anomaly) / (1 - eccentricity * np.cos(eccentric))
+    return eccentric
+
+
+def _heliocentric(jd):
+    """(dates, planets, xyz) heliocentric J2000 ecliptic coordinates in AU, planets as _PLANET_NAMES."""
+    t = ((np.asarray(jd, dtype=float) - J2000) / 36525)[:, None, None]
+    a, e, inclination, mean_longitude, perihelion, node = np.moveaxis(_ELEMENTS + _RATES * t, -1, 0)
+    inclination, node = np.radians(inclination), np.radians(node)
+    argument = np.radians(perihelion) - node
+    mean_anomaly = np.radians((mean_longitude - perihelion + 180) % 360 - 180)
+    eccentric = _solve_kepler(mean_anomaly, e)
+    x_orbit = a * (np.cos(eccentric) - e)
+    y_orbit = a * np.sqrt(1 - e * e) * np.sin(eccentric)
+    cos_w, sin_w = np.cos(argument), np.sin(argument)
+    cos_n, sin_n = np.cos(node), np.sin(node)
+    cos_i, sin_i = np.cos(inclination), np.sin(inclination)
+    x = (cos_w * cos_n - sin_w * sin_n * cos_i) * x_orbit + (-sin_w * cos_n - cos_w * sin_n * cos_i) * y_orbit
+    y = (cos_w * sin_n + sin_w * cos_n * cos_i) * x_orbit + (-sin_w * sin_n + cos_w * cos_n * cos_i) * y_orbit
+    z = (sin_w * sin_i) * x_orbit + (cos_w * sin_i) * y_orbit
+    return np.stack([x, y, z], axis=-1)
+
+
+def _moon_longitude(t):
+    """Geocentric lunar longitude (degrees, ecliptic of date) for an array of Julian centuries."""
+    mean_longitude = 218.3164477 + 481267.88123421 * t
+    arguments = np.radians(np.stack([
+        297.8501921 + 445267.1114034 * t, # D, mean elongation
+        357.5291092 + 35999.0502909 * t, # M, solar mean anomaly
+        134.9633964 + 477198.8675055 * t, # M', lunar mean anomaly
+        93.2720950 + 483202.0175233 * t, # F, argument of latitude
+    ], axis=-1))
+    return mean_longitude + np.sin(arguments @ _MOON_TERMS[:, :4].T) @ _MOON_TERMS[:, 4]
+
+
+def tropical_longitudes(jd):
+    """(dates, len(GRAHAS)) geocentric tropical longitudes in degrees, for an array of Julian Days."""
+    jd = np.atleast_1d(np.asarray(jd, dtype=float))
+    t = (jd - J2000) / 36525
+    heliocentric = _heliocentric(jd)
+    geocentric = heliocentric[:, 1:] - heliocentric[:, :1] # Planets as seen from Earth
+    planets = np.degrees(np.arctan2(geocentric[..., 1], geocentric[..., 0]))
+    sun = np.degrees(np.arctan2(-heliocentric[:, 0, 1], -heliocentric[:, 0, 0]))
+    precession = _PRECESSION_PER_CENTURY * t
+    node = 125.0445479 - 1934.1362891 * t
+    mercury, venus, mars, jupiter, saturn = (planets + precession[:, None]).T
+    longitudes = np.stack([sun + precession, _moon_longitude(t), mars, mercury, jupiter, venus, saturn,
+                           node, node + 180], axis=-1)
+    return longitudes % 360
+
+
+def local_sidereal_angles(jd, latitude, longitude):
+    """(ascendant, midheaven) tropical longitudes in degrees for a place (east longitude)."""
+    jd = np.asarray(jd, dtype=float)
+    t = (jd - J2000) / 36525
+    sidereal_time = np.radians((280.46061837 + 360.98564736629 * (jd - J2000) + 0.000387933 * t * t + longitude) % 360)
+    obliquity = np.radians(23.439291 - 0.0130042 * t)
+    phi = np.radians(latitude)
+    ascendant = np.arctan2(np.cos(sidereal_time),
+                           -(np.sin(sidereal_time) * np.cos(obliquity) + np.tan(phi) * np.sin(obliquity)))
+    midheaven = np.arctan2(np.sin(sidereal_time), np.cos(sidereal_time) * np.cos(obliquity))
+    return np.degrees(ascendant) % 360, np.degrees(midheaven) % 360
+
+
+GrahaPosition = namedtuple("GrahaPosition", ["graha", "longitude", "rashi", "degree", "nakshatra", "pada",
+                                             "house", "retrograde"])
+NatalChart = namedtuple("NatalChart", ["julian_day", "ayanamsa", "lagna", "lagna_rashi", "midheaven", "positions"])
+
+
+def _split_longitude(sidereal):
+    """Rashi index, degree within the rashi, nakshatra index and pada (1-4) for sidereal longitudes."""
+    rashi = (sidereal // 30).astype(int)
+    nakshatra_span = 360 / 27
+    nakshatra = (sidereal // nakshatra_span).astype(int)
+    pada = ((sidereal % nakshatra_span) // (nakshatra_span / 4)).astype(int) + 1
+    return rashi, sidereal % 30, nakshatra, pada
+
+
+@lru_cache(maxsize=NATAL_CHART_CACHE_SIZE)
+def natal_chart(dob, birth_time=DEFAULT_BIRTH_TIME, birth_place=DEFAULT_BIRTH_PLACE):
+    """
+    Sidereal (Lahiri) natal chart with whole-sign houses counted from the Lagna,
+    cached per (DOB, time, place). `birth_place` is a BIRTH_PLACES key.
+    """
+    latitude, longitude, _ = BIRTH_PLACES[birth_place]
+    jd = julian_day(birth_moment_utc(dob, birth_time, birth_place))
+    # Positions half a day either side give each graha's direction of motion
+    tropical = tropical_longitudes([jd - 0.5, jd, jd + 0.5])
+    ayanamsa = float(lahiri_ayanamsa(jd))
+    sidereal = (tropical[1] - ayanamsa) % 360
+    motion = (tropical[2] - tropical[0] + 180) % 360 - 180
+    ascendant, midheaven = local_sidereal_angles(jd, latitude, longitude)
+    lagna = (float(ascendant) - ayanamsa) % 360
+    lagna_rashi = int(lagna // 30)
+
+    rashi, degree, nakshatra, pada = _split_longitude(sidereal)
+    house = (rashi - lagna_rashi) % 12 + 1
+    positions = tuple(
+        GrahaPosition(graha, float(sidereal[i]), int(rashi[i]), float(degree[i]), int(nakshatra[i]), int(pada[i]),
+                      int(house[i]), bool(motion[i] < 0))
+        for i, graha in enumerate(GRAHAS)
+    )
+    return NatalChart(jd, ayanamsa, lagna, lagna_rashi, (float(midheaven) - ayanamsa) % 360, positions)
@@ -0,0 +1,143 @@
+# Vectorized batch versions of the numerology helpers in numerology_core.py
+import datetime
+
+import numpy as np
+
+from numerology_systems import CONSONANT_CODES, DEFAULT_SYSTEM, VOWEL_CODES, get_system
+
+MASTER_NUMBERS = (11, 22, 33)
+
+CORE_NUMBER_KEYS = ("life_path", "expression", "soul_urge", "personality", "birth_day")
+
+_EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+
+def sum_digits_array(numbers):
+    """Sums the digits of every number in an integer array, arithmetically."""
+    numbers = np.asarray(numbers, dtype=np.int64).copy()
+    total = np.zeros_like(numbers)
+    while numbers.any():
+        total += numbers % 10
+        numbers //= 10
+    return total
+
+
+def reduce_number_array(numbers):
+    """
+    Array version of reduce_number: reduces every value to a single digit or a
+    master number (11, 22, 33).
+    """
+    numbers = np.asarray(numbers, dtype=np.int64).copy()
+    pending = (numbers > 9) & ~np.isin(numbers, MASTER_NUMBERS)
+    while pending.any():
+        numbers[pending] = sum_digits_array(numbers[pending])
+        pending = (numbers > 9) & ~np.isin(numbers, MASTER_NUMBERS)
+    return numbers
+
+
+def _name_codepoints(names):
+    """Returns a (rows, max_len) uint32 array of codepoints, zero-padded."""
+    names = np.asarray(names, dtype=str)
+    if names.ndim != 1:
+        names = names.reshape(-1)
+    width = max(names.dtype.itemsize // 4, 1)
+    names = names.astype(f"<U{width}")
+    return names.view(np.uint32).reshape(len(names), width)
+
+
+def _code_tables():
+    """Lookup tables over the encoded-letter alphabet: (value, is_vowel) per codepoint."""
+    values = np.zeros(128, dtype=np.uint8)
+    is_vowel = np.zeros(128, dtype=bool)
+    for value, (vowel, consonant) in enumerate(zip(VOWEL_CODES, CONSONANT_CODES), 1):
+        values[ord(vowel)] = values[ord(consonant)] = value
+        is_vowel[ord(vowel)] = True
+    return values, is_vowel
+
+
+_CODE_VALUES, _CODE_IS_VOWEL = _code_tables()
+
+
+def _as_day_array(dobs):
+    """Coerces dates to a datetime64[D] array; missing values become NaT."""
+    if isinstance(dobs, np.ndarray) and np.issubdtype(dobs.dtype, np.datetime64):
+        return dobs.astype("datetime64[D]").reshape(-1)
+    dobs = list(dobs)
+    if all(isinstance(dob, datetime.date) for dob in dobs):
+        # Going through ordinals is much faster than letting NumPy parse date objects
+        ordinals = np.fromiter((dob.toordinal() for dob in dobs), dtype=np.int64, count=len(dobs))
+        return (ordinals - _EPOCH_ORDINAL).astype("datetime64[D]")
+    return np.array(dobs, dtype="datetime64[D]").reshape(-1)
+
+
+def _date_parts(dobs):
+    """Splits dates into (year, month, day, valid) integer arrays."""
+    days = _as_day_array(dobs)
+    valid = ~np.isnat(days)
+    days = np.where(valid, days, np.datetime64("1970-01-01", "D"))
+    months = days.astype("datetime64[M]")
+    year = months.astype("datetime64[Y]").astype(np.int64) + 1970
+    month = months.astype(np.int64) % 12 + 1
+    day = (days - months.astype("datetime64[D]")).astype(np.int64) + 1
+    return year, month, day, valid
+
+
+def calculate_name_numbers_batch(names, system=DEFAULT_SYSTEM):
+    """
+    Returns (expression, soul_urge, personality) arrays for a sequence of names.
+
+    Names are encoded by the system's compiled table in one pass (see
+    NumerologySystem.encode_many), so only the nine vowel and nine consonant
+    codes reach NumPy.
+    """
+    codepoints = _name_codepoints(get_system(system).encode_many(names))
+    values = _CODE_VALUES[codepoints]
+    vowel_total = np.where(_CODE_IS_VOWEL[codepoints], values, 0).sum(axis=1, dtype=np.int64)
+    total = values.sum(axis=1, dtype=np.int64)
+    expression = reduce_number_array(total)
+    soul_urge = reduce_number_array(vowel_total)
+    personality = reduce_number_array(total - vowel_total)
+    return expression, soul_urge, personality
+
+
+def calculate_date_numbers_batch(dobs):
+    """
+    Returns (life_path, birth_day) arrays for a sequence of dates.
+    Missing dates (None / NaT) come back as 0, where the scalar helpers return None.
+    """
+    year, month, day, valid = _date_parts(dobs)
+    life_path = reduce_number_array(
+        reduce_number_array(month) + reduce_number_array(day) + reduce_number_array(year)
+    )
+    birth_day = reduce_number_array(day)
+    return np.where(valid, life_path, 0), np.where(valid, birth_day, 0)
+
+
+def calculate_core_numbers_batch(names, dobs, system=DEFAULT_SYSTEM):
+    """
+    Calculates all five core numbers for parallel sequences of names and dates.
+
+    `names` is any sequence/array of strings and `dobs` any sequence/array of
+    datetime.date, ISO strings or datetime64 values; `system` is a numerology
+    system key (see numerology_systems.py). Returns a dict of int arrays
+    keyed by CORE_NUMBER_KEYS, row-aligned with the input.
+    """
+    expression, soul_urge, personality = calculate_name_numbers_batch(names, system)
+    life_path, birth_day = calculate_date_numbers_batch(dobs)
+    if len(expression) != len(life_path):
+        raise ValueError("names and dobs must have the same length")
+    return {
+        "life_path": life_path,
+        "expression": expression,
+        "soul_urge": soul_urge,
+        "personality": personality,
+        "birth_day": birth_day,
+    }
+
+
+def calculate_core_numbers_for_records(records, system=DEFAULT_SYSTEM):
+    """Batch variant for a list of profile-shaped records ({'name': ..., 'dob': ...})."""
+    records = list(records)
+    names = [record.get("name") or "" for record in records]
+    dobs = [record.get("dob") for record in records]
+    return calculate_core_numbers_batch(names, dobs, system)
@@ -0,0 +1,191 @@
+# Pure numerology helpers shared by the Streamlit app and offline tools (no Streamlit/Firebase imports)
+import datetime
+from collections import namedtuple
+from functools import lru_cache
+from operator import itemgetter
+
+from numerology_systems import (
+    CONSONANT_CODES,
+    DEFAULT_SYSTEM,
+    PYTHAGOREAN_VALUES,
+    VOWEL_CODES,
+    get_system,
+)
+from tracing import traced
+
+
+# --- Numerology Calculation Logic ---
+
+# Standard Pythagorean Numerology mapping (other systems live in numerology_systems.py)
+NUMEROLOGY_MAP = PYTHAGOREAN_VALUES
+
+# Optional precomputed DOB lookup backend (see numerology_index.py).
+# None means the date helpers below do the plain digit reduction on every call.
+_get_dob_index = None
+
+def use_dob_index(enabled=True):
+    """
+    Switches Life Path / Personal Year to (or away from) the precomputed DOB index.
+    Every lookup goes through get_dob_index(), whose cached next-midnight check
+    extends the index when the date rolls over; dates it doesn't cover take the
+    plain reduction path.
+    """
+    global _get_dob_index
+    if enabled:
+        from numerology_index import get_dob_index # Imported lazily: it pulls in NumPy
+        get_dob_index() # Build it now rather than on the first lookup
+        _get_dob_index = get_dob_index
+    else:
+        _get_dob_index = None
+
+def sum_digits(number):
+    """Sums the digits of a number."""
+    return sum(int(digit) for digit in str(number))
+
+def reduce_number(num):
+    """
+    Reduces a number to a single digit or a master number (11, 22, 33).
+    Master numbers are typically not reduced further in primary numerology calculations.
+    """
+    if not isinstance(num, int): # Ensure input is an integer
+        return None
+    if 0 <= num < _REDUCED_SIZE:
+        return _REDUCED[num]
+    while num > 9 and num not in [11, 22, 33]:
+        num = sum_digits(num)
+    return num
+
+# reduce_number() for 0.._REDUCED_SIZE-1, so name and date totals reduce in one lookup.
+# A digit sum is always smaller than its number, so each entry reuses an earlier one.
+_REDUCED_SIZE = 10000
+_REDUCED = []
+for _num in range(_REDUCED_SIZE):
+    _REDUCED.append(_num if _num <= 9 or _num in (11, 22, 33) else _REDUCED[sum_digits(_num)])
+del _num
+
+def get_numerology_value(char, system=DEFAULT_SYSTEM):
+    """Returns the numerological value for a letter."""
+    return get_system(system).letter_value(char) # Returns 0 for non-alphabetic chars
+
+@traced("numerology.calculate_life_path")
+def calculate_life_path(dob_date):
+    """Calculates the Life Path Number from a birth date."""
+    if not isinstance(dob_date, datetime.date):
+        return None
+    if _get_dob_index is not None:
+        indexed = _get_dob_index().life_path(dob_date)
+        if indexed is not None:
+            return indexed
+    month = reduce_number(dob_date.month)
+    day = reduce_number(dob_date.day)
+    year = reduce_number(dob_date.year)
+
+    if None in [month, day, year]: # Check for valid reduction
+        return None
+
+    life_path_sum = month + day + year
+    return reduce_number(life_path_sum)
+
+@traced("numerology.calculate_expression_number")
+def calculate_expression_number(full_name, system=DEFAULT_SYSTEM):
+    """Calculates the Expression (Destiny) Number from a full name."""
+    return analyze_name(full_name, system).expression
+
+@traced("numerology.calculate_soul_urge_number")
+def calculate_soul_urge_number(full_name, system=DEFAULT_SYSTEM):
+    """Calculates the Soul Urge (Heart's Desire) Number from vowels in a full name."""
+    return analyze_name(full_name, system).soul_urge
+
+@traced("numerology.calculate_personality_number")
+def calculate_personality_number(full_name, system=DEFAULT_SYSTEM):
+    """Calculates the Personality Number from consonants in a full name."""
+    return analyze_name(full_name, system).personality
+
+@traced("numerology.calculate_birth_day_number")
+def calculate_birth_day_number(dob_date):
+    """Calculates the Birth Day Number from the day of the month."""
+    if not isinstance(dob_date, datetime.date):
+        return None
+    return _REDUCED[dob_date.day]
+
+@traced("numerology.calculate_personal_year_number")
+def calculate_personal_year_number(dob_date, year=None):
+    """Calculates the Personal Year Number for a birth date in the given (default: current) year."""
+    if not isinstance(dob_date, datetime.date):
+        return None
+    if year is None:
+        year = datetime.date.today().year
+    if _get_dob_index is not None:
+        indexed = _get_dob_index().personal_year(dob_date, year)
+        if indexed is not None:
+            return indexed
+    return reduce_number(reduce_number(dob_date.month) + reduce_number(dob_date.day) + reduce_number(year))
+
+# --- Name Analysis ---
+
+NAME_ANALYSIS_CACHE_SIZE = 4096
+
+class NameAnalysis(namedtuple("NameAnalysis", [
+        "expression", "soul_urge", "personality", "digit_counts", "karmic_lessons", "hidden_passion"])):
+    """
+    Everything derived from the letters of a name in one pass.
+
+    digit_counts[d] is how many letters are worth d (index 0 is unused), karmic
+    lessons are the digits 1-9 no letter is worth, and hidden passion is the most
+    frequent digit(s).
+    """
+    __slots__ = ()
+
+    def maturity_number(self, life_path):
+        """Maturity Number: Life Path + Expression, reduced."""
+        if life_path is None:
+            return None
+        return reduce_number(life_path + self.expression)
+
+# Keyed on the raw name rather than its encoded letters: encoding is most of the
+# cost of a miss, and repeat visitors send the same spelling anyway
+@lru_cache(maxsize=NAME_ANALYSIS_CACHE_SIZE)
+def analyze_name(full_name, system=DEFAULT_SYSTEM):
+    """Calculates every name-based number for a full name (cached per name and system, before encoding)."""
+    return _analyze_letters(get_system(system).encode(full_name))
+
+_LETTER_CODES = VOWEL_CODES + CONSONANT_CODES
+_letter_code_counts = itemgetter(*_LETTER_CODES)
+
+def _analyze_letters(letters):
+    counts = dict.fromkeys(_LETTER_CODES, 0)
+    for code in letters: # One pass: encoded letters hold nothing but codes
+        counts[code] += 1
+    counts = _letter_code_counts(counts)
+    vowel_counts = counts[:len(VOWEL_CODES)]
+    consonant_counts = counts[len(VOWEL_CODES):]
+    soul_urge = sum(digit * count for digit, count in enumerate(vowel_counts, 1))
+    personality = sum(digit * count for digit, count in enumerate(consonant_counts, 1))
+    digit_counts = (0,) + tuple(v + c for v, c in zip(vowel_counts, consonant_counts))
+    most_frequent = max(digit_counts)
+    return NameAnalysis(
+        reduce_number(soul_urge + personality),
+        reduce_number(soul_urge),
+        reduce_number(personality),
+        digit_counts,
+        tuple(digit for digit in range(1, 10) if not digit_counts[digit]),
+        tuple(digit for digit in range(1, 10) if most_frequent and digit_counts[digit] == most_frequent),
+    )
+
+# Simplified Numerology Interpretations
+NUMEROLOGY_INTERPRETATIONS = {
+    1: "The Leader: Independent, ambitious, original, and pioneering. Can be self-centered or aggressive.",
+    2: "The Peacemaker: Diplomatic, cooperative, sensitive, and intuitive. Can be shy or indecisive.",
+    3: "The Communicator: Creative, expressive, optimistic, and social. Can be superficial or scattered.",
+    4: "The Builder: Practical, disciplined, stable, and hardworking. Can be rigid or stubborn.",
+    5: "The Adventurer: Versatile, freedom-loving, adaptable, and restless. Can be irresponsible or impulsive.",
+    6: "The Nurturer: Responsible, loving, compassionate, and family-oriented. Can be self-righteous or meddling.",
+    7: "The Seeker: Analytical, spiritual, introspective, and wise. Can be reclusive or cynical.",
+    8: "The Executive: Ambitious, powerful, organized, and successful. Can be materialistic or controlling.",
+    9: "The Humanitarian: Compassionate, generous, idealistic, and wise. Can be self-sacrificing or emotionally detached.",
+    11: "The Master Intuitor: Highly intuitive, inspiring, and charismatic. Can be overly sensitive or impractical.",
+    22: "The Master Builder: Visionary, practical, powerful, and capable of grand achievements. Can be overwhelming or self-destructive.",
+    33: "The Master Teacher/Healer: Highly compassionate, spiritual, and dedicated to service. Can be overly responsible or martyrdom-prone."
+}
+
+# --- End Numerology Calculation Logic ---
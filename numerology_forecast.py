@@ -0,0 +1,54 @@
+# Personal Year / Month / Day forecasts for whole date ranges, computed in one
+# vectorized pass over day ordinals (no Streamlit/Firebase imports)
+import datetime
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+from numerology_batch import _date_parts, reduce_number_array
+from numerology_core import reduce_number
+
+FORECAST_CACHE_SIZE = 2048 # (DOB, year) pairs; a year is ~5 KB
+
+# Row-aligned arrays: one entry per day in the range
+Forecast = namedtuple("Forecast", ["dates", "personal_year", "personal_month", "personal_day"])
+
+
+def forecast_range(dob_date, start, end):
+    """
+    Personal Year, Month and Day numbers for every day from `start` to `end`
+    (inclusive), for someone born on `dob_date`:
+
+      Personal Year  = reduce(month of birth) + reduce(day of birth) + reduce(year)
+      Personal Month = Personal Year + reduce(calendar month)
+      Personal Day   = Personal Month + reduce(calendar day)
+
+    each reduced (keeping master numbers), as in calculate_personal_year_number.
+    """
+    if not isinstance(dob_date, datetime.date):
+        return None
+    dates = np.arange(np.datetime64(start, "D"), np.datetime64(end, "D") + 1)
+    year, month, day, _ = _date_parts(dates)
+    birth = reduce_number(dob_date.month) + reduce_number(dob_date.day)
+    personal_year = reduce_number_array(birth + reduce_number_array(year))
+    personal_month = reduce_number_array(personal_year + reduce_number_array(month))
+    personal_day = reduce_number_array(personal_month + reduce_number_array(day))
+    return Forecast(dates, personal_year.astype(np.uint8), personal_month.astype(np.uint8),
+                    personal_day.astype(np.uint8))
+
+
+@lru_cache(maxsize=FORECAST_CACHE_SIZE)
+def forecast_year(dob_date, year):
+    """forecast_range for a whole calendar year, cached per (DOB, year); the arrays are read-only."""
+    forecast = forecast_range(dob_date, datetime.date(year, 1, 1), datetime.date(year, 12, 31))
+    if forecast is not None:
+        for array in forecast:
+            array.flags.writeable = False
+    return forecast
+
+
+def calendar_grid(dates):
+    """(month row, day-of-month column) per date, for a months x days calendar heatmap."""
+    _, month, day, _ = _date_parts(dates)
+    return month, day
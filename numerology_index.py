@@ -0,0 +1,96 @@
+# Precomputed Life Path / Personal Year lookup index over the allowed DOB range
+import datetime
+import threading
+import time
+from array import array
+
+import numpy as np
+
+from numerology_batch import _date_parts, reduce_number_array
+
+# Same window the profile form allows: 100 years back from today
+DOB_INDEX_YEARS = 100
+
+# reduce_number() for every integer 0..9999, used for years and for small sums
+_REDUCED = array("B", reduce_number_array(np.arange(10000)).astype(np.uint8).tobytes())
+
+
+def _build_tables(first_ordinal, last_ordinal):
+    """Computes the per-day tables for ordinals first_ordinal..last_ordinal (inclusive)."""
+    ordinals = np.arange(first_ordinal, last_ordinal + 1, dtype=np.int64)
+    days = (ordinals - datetime.date(1970, 1, 1).toordinal()).astype("datetime64[D]")
+    year, month, day, _ = _date_parts(days)
+    reduced_day = reduce_number_array(day)
+    month_day = reduce_number_array(month) + reduced_day
+    life_path = reduce_number_array(month_day + reduce_number_array(year))
+    return (
+        array("B", life_path.astype(np.uint8).tobytes()),
+        array("B", month_day.astype(np.uint8).tobytes()),
+    )
+
+
+class DobIndex:
+    """
+    Compact uint8 tables keyed by day ordinal (offset from `start`).
+
+    `month_day` holds reduce(month) + reduce(day), so the Personal Year for any
+    year is two table lookups away. There is no Birth Day table: reduce(day) is
+    already a single lookup in numerology_core, and beat the index in
+    benchmarks/bench_numerology.py.
+    """
+
+    def __init__(self, start, end):
+        self.start = start
+        self.end = start - datetime.timedelta(days=1)
+        self._offset = start.toordinal()
+        self._life_path = array("B")
+        self._month_day = array("B")
+        self.extend_to(end)
+
+    def extend_to(self, end):
+        """Appends tables for the days after the current end, up to and including `end`."""
+        if end <= self.end:
+            return
+        life_path, month_day = _build_tables(self.end.toordinal() + 1, end.toordinal())
+        self._life_path.extend(life_path)
+        self._month_day.extend(month_day)
+        self.end = end
+
+    # The lookups inline the range check: they sit on the per-call hot path
+    def life_path(self, dob_date):
+        """Life Path Number for a date, or None if it falls outside the index."""
+        position = dob_date.toordinal() - self._offset
+        if 0 <= position < len(self._life_path):
+            return self._life_path[position]
+        return None
+
+    def personal_year(self, dob_date, year):
+        """Personal Year Number for a date in `year`, or None if it can't be looked up."""
+        position = dob_date.toordinal() - self._offset
+        if 0 <= position < len(self._month_day) and 0 <= year < len(_REDUCED):
+            return _REDUCED[self._month_day[position] + _REDUCED[year]]
+        return None
+
+
+_dob_index = None
+_dob_index_lock = threading.Lock()
+_next_rollover = 0.0 # time.time() of the next local midnight; cheaper to compare than date.today()
+
+
+def get_dob_index():
+    """
+    Returns the process-wide DobIndex, building it on first use and extending it
+    when the date rolls over.
+    """
+    global _dob_index, _next_rollover
+    if time.time() < _next_rollover:
+        return _dob_index
+    with _dob_index_lock:
+        today = datetime.date.today()
+        if _dob_index is None:
+            _dob_index = DobIndex(datetime.date(today.year - DOB_INDEX_YEARS, 1, 1), today)
+        else:
+            _dob_index.extend_to(today)
+        tomorrow = today + datetime.timedelta(days=1)
+        _next_rollover = datetime.datetime.combine(tomorrow, datetime.time()).timestamp()
+        return _dob_index
@@ -1,23 +1,188 @@
 # Part of your numerology_page.py or a separate utility function
-import google.generativeai as genai
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
 import streamlit as st
 
-# Configure Gemini API
-genai.configure(api_key=st.secrets["GOOGLE_API_KEY"])
+from interpretation_cache import get_interpretation_cache
+from numerology_core import NUMEROLOGY_INTERPRETATIONS
+from tracing import span
+
+GEMINI_MODEL_NAME = 'gemini-1.5-flash'  # Choose a suitable model
+
+# Name-agnostic mode leaves the user's name out of the prompt, so there are only
+# 12 distinct prompts (one per number) and they can all be prewarmed at startup.
+try:
+    NAME_AGNOSTIC_INTERPRETATIONS = bool(st.secrets.get("GEMINI_NAME_AGNOSTIC", False))
+except FileNotFoundError: # No secrets.toml, e.g. offline runs with a fake model
+    NAME_AGNOSTIC_INTERPRETATIONS = False
+
+_models = {}
+_models_lock = threading.Lock()
+
+
+def _default_model_factory(model_name):
+    import google.generativeai as genai # Imported lazily, so a fake model factory needs no SDK or API key
+
+    # Configure Gemini API
+    genai.configure(api_key=st.secrets["GOOGLE_API_KEY"])
+    return genai.GenerativeModel(model_name)
+
+
+_model_factory = _default_model_factory
+
+
+def set_model_factory(factory):
+    """
+    Replaces how models are built (factory(model_name) -> object with
+    generate_content(prompt).text), e.g. with a local fake model for tests.
+    """
+    global _model_factory
+    with _models_lock:
+        _model_factory = factory
+        _models.clear()
+
+
+def get_model(model_name=GEMINI_MODEL_NAME):
+    """One model object per name for the whole process, instead of one per call."""
+    model = _models.get(model_name)
+    if model is None:
+        with _models_lock:
+            model = _models.get(model_name)
+            if model is None:
+                model = _model_factory(model_name)
+                _models[model_name] = model
+    return model
+
+
+def build_numerology_prompt(number, user_name=None, number_label="Life Path"):
+    prompt = f"As a highly experienced numerologist, provide a concise and inspiring interpretation for a person with {number_label} Number {number}. Incorporate common traits and potential challenges associated with this number. Tailor the language to sound encouraging and insightful."
+    if user_name and not NAME_AGNOSTIC_INTERPRETATIONS:
+        prompt += f" For {user_name}."
+    return prompt
+
+
+def _cached_interpretation(number, user_name, number_label, model_name, wait_timeout=None, on_call_start=None):
+    """
+    Cached or freshly generated interpretation; raises if the model call fails, or
+    if it can't start (or join an identical call) within `wait_timeout` seconds.
+    """
+    prompt = build_numerology_prompt(number, user_name, number_label)
 
+    def generate():
+        if not _model_call_slots.acquire(timeout=wait_timeout):
+            raise TimeoutError("No free model call slot")
+        try:
+            if on_call_start is not None:
+                on_call_start()
+            with span("gemini.generate_content"):
+                return get_model(model_name).generate_content(prompt).text
+        finally:
+            _model_call_slots.release()
 
-def get_gemini_numerology_interpretation(life_path_number, user_name):
-    model = genai.GenerativeModel('gemini-1.5-flash')  # Choose a suitable model
+    # Served from memory/SQLite when possible; identical concurrent requests share one call
+    return get_interpretation_cache().get_or_compute(model_name, prompt, generate, wait_timeout)
 
-    prompt = f"As a highly experienced numerologist, provide a concise and inspiring interpretation for a person with Life Path Number {life_path_number}. Incorporate common traits and potential challenges associated with this number. Tailor the language to sound encouraging and insightful. For {user_name}."
 
+def get_gemini_numerology_interpretation(life_path_number, user_name, model_name=GEMINI_MODEL_NAME, number_label="Life Path"):
     try:
-        response = model.generate_content(prompt)
-        return response.text
+        return _cached_interpretation(life_path_number, user_name, number_label, model_name)
     except Exception as e:
         return f"Error getting interpretation: {e}"
 
-# Then call this in your Numerology tab after calculation:
-# ... inside the numerology_submit block
-# llm_interpretation = get_gemini_numerology_interpretation(life_path_num, name)
-# st.info(llm_interpretation)
\ No newline at end of file
+
+# --- Concurrent interpretations for all core numbers ---
+CORE_NUMBER_LABELS = ("Life Path", "Expression", "Soul Urge", "Personality", "Birth Day")
+INTERPRETATION_TIMEOUT_SECONDS = 20 # Per request, from when its model call starts
+INTERPRETATION_DEADLINE_SECONDS = 30 # Per batch, including time spent waiting for a model call slot
+INTERPRETATION_QUEUE_POLL_SECONDS = 0.1 # How often to check whether waiting requests have started
+MAX_MODEL_CALLS = 16 # Model calls in flight across all sessions; calls are I/O bound
+
+# Hung calls hold a slot, not a shared worker: once all slots are taken, later
+# requests fall back at their deadline instead of queueing behind them forever
+_model_call_slots = threading.BoundedSemaphore(MAX_MODEL_CALLS)
+
+
+def fallback_interpretation(number):
+    return NUMEROLOGY_INTERPRETATIONS.get(number, "No interpretation found for this number.")
+
+
+def iter_numerology_interpretations(numbers, user_name, timeout=INTERPRETATION_TIMEOUT_SECONDS,
+                                    deadline=INTERPRETATION_DEADLINE_SECONDS, model_name=GEMINI_MODEL_NAME):
+    """
+    Requests interpretations for every {label: number} at once and yields
+    (label, number, text, from_model) in completion order, so callers can show
+    each one as soon as it arrives. A request that fails, is still running
+    `timeout` seconds after its model call started, or hasn't finished
+    `deadline` seconds after this call (waiting for a model call slot included)
+    yields the static NUMEROLOGY_INTERPRETATIONS text.
+    """
+    started = {} # label -> time.monotonic() when its model call started
+    give_up_at = time.monotonic() + deadline
+
+    def interpret(label, number):
+        def call_started():
+            started[label] = time.monotonic()
+
+        return _cached_interpretation(number, user_name, label, model_name,
+                                      wait_timeout=max(0.0, give_up_at - time.monotonic()), on_call_start=call_started)
+
+    # Threads of this call only: a straggler keeps its own thread (and warms the cache), not a shared one
+    executor = ThreadPoolExecutor(max_workers=len(numbers) or 1, thread_name_prefix="interpretation")
+    try:
+        futures = {executor.submit(interpret, label, number): (label, number) for label, number in numbers.items()}
+        pending = set(futures)
+        while pending:
+            running = [started[futures[future][0]] + timeout for future in pending if futures[future][0] in started]
+            wait_seconds = min([give_up_at] + running) - time.monotonic()
+            if len(running) < len(pending): # Some haven't started: look again once they may have
+                wait_seconds = min(wait_seconds, INTERPRETATION_QUEUE_POLL_SECONDS)
+            done, pending = wait(pending, timeout=max(0.0, wait_seconds), return_when=FIRST_COMPLETED)
+            for future in done:
+                label, number = futures[future]
+                if future.exception() is None:
+                    yield label, number, future.result(), True
+                else:
+                    yield label, number, fallback_interpretation(number), False
+            now = time.monotonic()
+            timed_out = [future for future in pending if now >= give_up_at
+                         or (futures[future][0] in started and started[futures[future][0]] + timeout <= now)]
+            for future in timed_out:
+                pending.discard(future)
+                label, number = futures[future]
+                yield label, number, fallback_interpretation(number), False
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def prewarm_numerology_interpretations(model_name=GEMINI_MODEL_NAME):
+    """
+    Fills the cache with the name-agnostic interpretation of every core number
+    type and value (1-9, 11, 22, 33). Only useful in name-agnostic mode; returns
+    how many were cached.
+    """
+    cached = 0
+    for label in CORE_NUMBER_LABELS:
+        for number in NUMEROLOGY_INTERPRETATIONS:
+            try:
+                _cached_interpretation(number, None, label, model_name)
+                cached += 1
+            except Exception:
+                pass
+    return cached
+
+
+_prewarm_started = False
+
+
+def start_prewarm_in_background(model_name=GEMINI_MODEL_NAME):
+    """Starts prewarming once per process, in name-agnostic mode only."""
+    global _prewarm_started
+    with _models_lock:
+        if _prewarm_started or not NAME_AGNOSTIC_INTERPRETATIONS:
+            return
+        _prewarm_started = True
+    threading.Thread(target=prewarm_numerology_interpretations, args=(model_name,), name="interpretation-prewarm",
+                     daemon=True).start()
+# --- End Concurrent interpretations ---
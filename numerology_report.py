@@ -0,0 +1,214 @@
+# Offline batch numerology reports for large customer lists (no Streamlit/Firebase needed).
+#
+#   python numerology_report.py customers.csv -o reports.jsonl --workers 8
+#
+# Records are streamed from CSV/JSONL through a generator pipeline in fixed-size
+# chunks, each chunk is scored with the vectorized engine in numerology_batch.py,
+# and results are written as they are produced, so memory stays constant however
+# large the input is. With --workers > 1 chunks are sharded across a process pool.
+import argparse
+import contextlib
+import csv
+import datetime
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from numerology_batch import CORE_NUMBER_KEYS, calculate_core_numbers_batch
+from numerology_core import NUMEROLOGY_INTERPRETATIONS
+from numerology_systems import DEFAULT_SYSTEM, NUMEROLOGY_SYSTEMS
+
+CHUNK_SIZE = 20000
+PROGRESS_EVERY_SECONDS = 5
+
+
+def detect_format(path, explicit=None):
+    if explicit:
+        return explicit
+    return "jsonl" if path.lower().endswith((".jsonl", ".ndjson", ".json")) else "csv"
+
+
+def _open_text(path, mode):
+    if path == "-":
+        return sys.stdin if "r" in mode else sys.stdout
+    return open(path, mode, encoding="utf-8", newline="")
+
+
+def read_records(path, input_format):
+    """Yields one dict per input row."""
+    f = _open_text(path, "r")
+    try:
+        if input_format == "csv":
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def chunked(records, size):
+    """Groups an iterable into lists of at most `size` items."""
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _parse_dob(value):
+    if isinstance(value, datetime.date):
+        return value
+    if not value:
+        return None
+    try:
+        return datetime.date.fromisoformat(str(value).strip()[:10])
+    except ValueError:
+        return None
+
+
+def score_chunk(records, name_column="name", dob_column="dob", with_meanings=True, system=DEFAULT_SYSTEM):
+    """
+    Adds the five core numbers (and their NUMEROLOGY_INTERPRETATIONS text) to each
+    record. Numbers that can't be calculated (missing/invalid DOB) are left empty.
+    """
+    names = [str(record.get(name_column) or "") for record in records]
+    dobs = [_parse_dob(record.get(dob_column)) for record in records]
+    numbers = calculate_core_numbers_batch(names, dobs, system)
+    columns = {key: numbers[key].tolist() for key in CORE_NUMBER_KEYS}
+    scored = []
+    for i, record in enumerate(records):
+        row = dict(record)
+        for key in CORE_NUMBER_KEYS:
+            value = columns[key][i]
+            if dobs[i] is None and key in ("life_path", "birth_day"):
+                value = None
+            row[key] = value
+            if with_meanings:
+                row[f"{key}_meaning"] = NUMEROLOGY_INTERPRETATIONS.get(value, "")
+        scored.append(row)
+    return scored
+
+
+def _score_chunk_job(args):
+    return score_chunk(*args)
+
+
+def _bounded_map(pool, func, iterable, window):
+    """Like pool.map, in order, but with at most `window` chunks in flight."""
+    in_flight = deque()
+    for item in iterable:
+        in_flight.append(pool.submit(func, item))
+        if len(in_flight) >= window:
+            yield in_flight.popleft().result()
+    while in_flight:
+        yield in_flight.popleft().result()
+
+
+class ReportWriter:
+    """
+    Writes scored rows incrementally as CSV or JSONL. The CSV header comes from
+    the first row; a later row with a column the header doesn't have raises
+    ValueError rather than losing that column.
+    """
+
+    def __init__(self, path, output_format):
+        self.output_format = output_format
+        self._file = _open_text(path, "w")
+        self._csv = None
+        self._rows = 0
+
+    def write_rows(self, rows):
+        if self.output_format == "jsonl":
+            self._file.writelines(json.dumps(row, ensure_ascii=False) + "\n" for row in rows)
+            return
+        if self._csv is None and rows:
+            self._csv = csv.DictWriter(self._file, fieldnames=list(rows[0]))
+            self._csv.writeheader()
+        fieldnames = self._csv.fieldnames if self._csv else ()
+        for i, row in enumerate(rows):
+            extra = row.keys() - fieldnames
+            if extra:
+                raise ValueError(
+                    f"Input row {self._rows + i + 1} has columns the CSV header (taken from the first row) lacks: "
+                    f"{', '.join(sorted(map(str, extra)))}. Give every record the same keys, or write JSONL.")
+        self._csv.writerows(rows)
+        self._rows += len(rows)
+
+    def close(self):
+        if self._file is sys.stdout:
+            self._file.flush()
+        else:
+            self._file.close()
+
+
+def generate_report(input_path, output_path, input_format=None, output_format=None, name_column="name",
+                    dob_column="dob", with_meanings=True, workers=1, chunk_size=CHUNK_SIZE, progress=None,
+                    system=DEFAULT_SYSTEM):
+    """Streams input_path -> output_path; returns (rows, seconds)."""
+    input_format = detect_format(input_path, input_format)
+    output_format = detect_format(output_path, output_format)
+    jobs = ((chunk, name_column, dob_column, with_meanings, system)
+            for chunk in chunked(read_records(input_path, input_format), chunk_size))
+
+    writer = ReportWriter(output_path, output_format)
+    started = last_progress = time.perf_counter()
+    rows = 0
+    try:
+        pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else contextlib.nullcontext()
+        with pool:
+            if workers > 1:
+                scored_chunks = _bounded_map(pool, _score_chunk_job, jobs, window=workers * 2)
+            else:
+                scored_chunks = map(_score_chunk_job, jobs)
+            for scored in scored_chunks:
+                writer.write_rows(scored)
+                rows += len(scored)
+                if progress and time.perf_counter() - last_progress >= PROGRESS_EVERY_SECONDS:
+                    last_progress = time.perf_counter()
+                    progress(rows, last_progress - started)
+    finally:
+        writer.close()
+    return rows, time.perf_counter() - started
+
+
+def _print_progress(rows, seconds):
+    print(f"{rows:,} rows in {seconds:.1f}s ({rows / seconds if seconds else 0:,.0f} rows/sec)", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch numerology reports from CSV/JSONL customer lists")
+    parser.add_argument("input", help="input CSV/JSONL file ('-' for stdin)")
+    parser.add_argument("-o", "--output", default="-", help="output CSV/JSONL file (default: stdout)")
+    parser.add_argument("--input-format", choices=("csv", "jsonl"), help="default: from the file extension")
+    parser.add_argument("--output-format", choices=("csv", "jsonl"), help="default: from the file extension")
+    parser.add_argument("--name-column", default="name")
+    parser.add_argument("--dob-column", default="dob", help="ISO dates (YYYY-MM-DD)")
+    parser.add_argument("--system", choices=list(NUMEROLOGY_SYSTEMS), default=DEFAULT_SYSTEM,
+                        help="numerology system used for the name numbers")
+    parser.add_argument("--no-meanings", action="store_true", help="omit the interpretation text columns")
+    parser.add_argument("--workers", type=int, default=1, help=f"worker processes (this machine has {os.cpu_count()} cores)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="rows scored per vectorized batch")
+    args = parser.parse_args(argv)
+
+    try:
+        rows, seconds = generate_report(
+            args.input, args.output, args.input_format, args.output_format, args.name_column, args.dob_column,
+            not args.no_meanings, args.workers, args.chunk_size, progress=_print_progress, system=args.system,
+        )
+    except ValueError as e:
+        parser.exit(1, f"{parser.prog}: error: {e}\n")
+    _print_progress(rows, seconds)
+
+
+if __name__ == "__main__":
+    main()
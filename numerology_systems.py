@@ -0,0 +1,223 @@
+# Letter-to-number systems (Pythagorean, Chaldean, Indic-script transliteration).
+# Each system is compiled once into a codepoint table that str.translate() uses
+# to encode a whole name in one C-level pass (no Streamlit/Firebase imports).
+import unicodedata
+from functools import lru_cache
+
+VOWELS = "AEIOU"
+
+# Standard Pythagorean Numerology mapping
+PYTHAGOREAN_VALUES = {
+    'A': 1, 'J': 1, 'S': 1,
+    'B': 2, 'K': 2, 'T': 2,
+    'C': 3, 'L': 3, 'U': 3,
+    'D': 4, 'M': 4, 'V': 4,
+    'E': 5, 'N': 5, 'W': 5,
+    'F': 6, 'O': 6, 'X': 6,
+    'G': 7, 'P': 7, 'Y': 7,
+    'H': 8, 'Q': 8, 'Z': 8,
+    'I': 9, 'R': 9
+}
+
+# Chaldean mapping (by sound; 9 is never assigned to a letter)
+CHALDEAN_VALUES = {
+    'A': 1, 'I': 1, 'J': 1, 'Q': 1, 'Y': 1,
+    'B': 2, 'K': 2, 'R': 2,
+    'C': 3, 'G': 3, 'L': 3, 'S': 3,
+    'D': 4, 'M': 4, 'T': 4,
+    'E': 5, 'H': 5, 'N': 5, 'X': 5,
+    'U': 6, 'V': 6, 'W': 6,
+    'O': 7, 'Z': 7,
+    'F': 8, 'P': 8
+}
+
+# Encoded letters: "1".."9" is a vowel worth 1..9 and "a".."i" a consonant worth
+# 1..9. Anything else is dropped, so an encoded name is also its normalized form
+# (case, spacing, punctuation and diacritics don't matter).
+VOWEL_CODES = "123456789"
+CONSONANT_CODES = "abcdefghi"
+
+# Kept by the tables so encode_many() can split a joined batch back into names
+_SEPARATOR = "\x1f"
+
+# Codepoints compiled up front (ASCII plus the Latin blocks that survive NFKD,
+# e.g. dotless i); anything else is classified on first sight
+_PRECOMPILED_CODEPOINTS = 0x250
+
+
+class _LetterTable(dict):
+    """str.translate() table for one system: codepoint -> code character or None."""
+
+    def __init__(self, letter_values):
+        super().__init__()
+        self._letter_values = letter_values
+        for code in range(_PRECOMPILED_CODEPOINTS):
+            self[code] # Fills the entry through __missing__
+        self[ord(_SEPARATOR)] = _SEPARATOR
+
+    def __missing__(self, code):
+        letter = chr(code).upper()
+        value = self._letter_values.get(letter, 0)
+        if not value:
+            encoded = None # Deleted by translate()
+        elif letter in VOWELS:
+            encoded = VOWEL_CODES[value - 1]
+        else:
+            encoded = CONSONANT_CODES[value - 1]
+        self[code] = encoded
+        return encoded
+
+
+# --- Indic transliteration ---
+
+# Devanagari, Bengali, Gurmukhi, Gujarati, Oriya, Tamil, Telugu, Kannada and
+# Malayalam share the ISCII layout: the same offset in each 0x80 block is the same letter.
+INDIC_BLOCKS = range(0x0900, 0x0D80)
+
+# Block offset -> Latin spelling, following common Indian-English name spelling
+_INDIC_VOWELS = {
+    0x05: "a", 0x06: "a", 0x07: "i", 0x08: "ee", 0x09: "u", 0x0A: "oo", 0x0B: "ri", 0x0C: "li",
+    0x0D: "e", 0x0E: "e", 0x0F: "e", 0x10: "ai", 0x11: "o", 0x12: "o", 0x13: "o", 0x14: "au",
+    0x60: "ri", 0x61: "li",
+}
+_INDIC_VOWEL_SIGNS = {
+    0x3E: "a", 0x3F: "i", 0x40: "ee", 0x41: "u", 0x42: "oo", 0x43: "ri", 0x44: "ri", 0x45: "e",
+    0x46: "e", 0x47: "e", 0x48: "ai", 0x49: "o", 0x4A: "o", 0x4B: "o", 0x4C: "au", 0x62: "li", 0x63: "li",
+}
+_INDIC_CONSONANTS = {
+    0x15: "k", 0x16: "kh", 0x17: "g", 0x18: "gh", 0x19: "n",
+    0x1A: "ch", 0x1B: "chh", 0x1C: "j", 0x1D: "jh", 0x1E: "n",
+    0x1F: "t", 0x20: "th", 0x21: "d", 0x22: "dh", 0x23: "n",
+    0x24: "t", 0x25: "th", 0x26: "d", 0x27: "dh", 0x28: "n", 0x29: "n",
+    0x2A: "p", 0x2B: "ph", 0x2C: "b", 0x2D: "bh", 0x2E: "m",
+    0x2F: "y", 0x30: "r", 0x31: "r", 0x32: "l", 0x33: "l", 0x34: "l", 0x35: "v",
+    0x36: "sh", 0x37: "sh", 0x38: "s", 0x39: "h",
+    0x58: "q", 0x59: "kh", 0x5A: "gh", 0x5B: "z", 0x5C: "r", 0x5D: "rh", 0x5E: "f", 0x5F: "y",
+}
+_INDIC_SIGNS = {0x01: "n", 0x02: "n", 0x03: "h"} # Candrabindu, anusvara, visarga
+# Long vowels are spelled short at the end of a word (लक्ष्मी -> lakshmi, not lakshmee)
+_WORD_FINAL_SPELLINGS = {"ee": "i", "oo": "u"}
+_INDIC_NUKTA = 0x3C
+_INDIC_VIRAMA = 0x4D
+
+
+def _indic_offset(char):
+    code = ord(char)
+    return code & 0x7F if code in INDIC_BLOCKS else None
+
+
+@lru_cache(maxsize=4096)
+def transliterate_indic(text):
+    """
+    Romanizes Indic-script runs in `text`; everything else is passed through.
+
+    Consonants carry the inherent "a" unless a vowel sign or virama follows. A
+    word-final inherent "a" is dropped (राम -> ram) unless the consonant ends a
+    conjunct (कृष्ण -> krishna), and a word-final ee/oo is spelled i/u.
+    """
+    out = []
+    length = len(text)
+    for i, char in enumerate(text):
+        offset = _indic_offset(char)
+        if offset is None:
+            out.append(char)
+        elif offset in _INDIC_CONSONANTS:
+            out.append(_INDIC_CONSONANTS[offset])
+            j = i + 1
+            while j < length and _indic_offset(text[j]) == _INDIC_NUKTA:
+                j += 1
+            following = _indic_offset(text[j]) if j < length else None
+            if following == _INDIC_VIRAMA or following in _INDIC_VOWEL_SIGNS:
+                continue
+            word_final = following is None
+            in_conjunct = i > 0 and _indic_offset(text[i - 1]) == _INDIC_VIRAMA
+            if not word_final or in_conjunct:
+                out.append("a")
+        else:
+            spelling = _INDIC_VOWELS.get(offset) or _INDIC_VOWEL_SIGNS.get(offset) or _INDIC_SIGNS.get(offset, "")
+            if spelling in _WORD_FINAL_SPELLINGS and (i + 1 == length or _indic_offset(text[i + 1]) is None):
+                spelling = _WORD_FINAL_SPELLINGS[spelling]
+            out.append(spelling)
+    return "".join(out)
+
+
+def _transliterate_if_indic(text):
+    if text and max(text) >= "\u0900":
+        return transliterate_indic(text)
+    return text
+
+
+# --- Registry ---
+
+class NumerologySystem:
+    """A named letter mapping, plus an optional pre-pass (e.g. transliteration)."""
+
+    __slots__ = ("key", "label", "description", "letter_values", "_prepare", "_table")
+
+    def __init__(self, key, label, letter_values, description="", prepare=None):
+        self.key = key
+        self.label = label
+        self.description = description
+        self.letter_values = letter_values
+        self._prepare = prepare
+        self._table = _LetterTable(letter_values)
+
+    def __repr__(self):
+        return f"NumerologySystem({self.key!r})"
+
+    def encode(self, full_name):
+        """Returns the encoded letters of a name (see VOWEL_CODES / CONSONANT_CODES)."""
+        text = unicodedata.normalize("NFKD", full_name)
+        if self._prepare is not None:
+            text = self._prepare(text)
+        return text.translate(self._table)
+
+    def encode_many(self, names):
+        """encode() for a sequence of names, normalizing and translating them as one string."""
+        names = [str(name).replace(_SEPARATOR, "") for name in names]
+        encoded = self.encode(_SEPARATOR.join(names)).split(_SEPARATOR)
+        if len(encoded) != len(names): # NFKD produced a separator; not expected, but stay row-aligned
+            encoded = [self.encode(name) for name in names]
+        return encoded
+
+    def letter_value(self, char):
+        """Numerological value of a single character (0 for anything that isn't a letter)."""
+        return sum(_CODE_VALUES[code] for code in self.encode(char))
+
+
+_CODE_VALUES = {code: value for codes in (VOWEL_CODES, CONSONANT_CODES) for value, code in enumerate(codes, 1)}
+
+DEFAULT_SYSTEM = "pythagorean"
+
+NUMEROLOGY_SYSTEMS = {}
+
+
+def register_system(system):
+    """Adds (or replaces) a system in the registry; returns it."""
+    NUMEROLOGY_SYSTEMS[system.key] = system
+    return system
+
+
+def get_system(system=DEFAULT_SYSTEM):
+    """Resolves a registry key (or an already-resolved NumerologySystem)."""
+    if isinstance(system, NumerologySystem):
+        return system
+    try:
+        return NUMEROLOGY_SYSTEMS[system or DEFAULT_SYSTEM]
+    except KeyError:
+        raise ValueError(f"Unknown numerology system: {system!r}") from None
+
+
+register_system(NumerologySystem(
+    "pythagorean", "Pythagorean", PYTHAGOREAN_VALUES,
+    "Western system: A-Z numbered 1-9 in order.",
+))
+register_system(NumerologySystem(
+    "chaldean", "Chaldean", CHALDEAN_VALUES,
+    "Letters numbered 1-8 by sound; 9 is considered sacred and never assigned.",
+))
+register_system(NumerologySystem(
+    "indic", "Indic (Devanagari & other Indian scripts)", PYTHAGOREAN_VALUES,
+    "Names in Devanagari or other Indian scripts are romanized first, then scored the Pythagorean way.",
+    prepare=_transliterate_if_indic,
+))
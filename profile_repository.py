@@ -0,0 +1,148 @@
+# Read-through cache for user profiles stored under users/<localId> in Realtime Database
+import datetime
+import threading
+import time
+from collections import OrderedDict
+
+from numerology_systems import DEFAULT_SYSTEM, NUMEROLOGY_SYSTEMS
+
+PROFILE_CACHE_MAX_ENTRIES = 10000
+PROFILE_CACHE_TTL_SECONDS = 600
+
+_MISSING = object()
+
+
+def _parse_profile(data):
+    """
+    Turns the stored {'name': str, 'dob': 'YYYY-MM-DD', 'numerology_system': str,
+    'birth_time': 'HH:MM', 'birth_place': str} record into app shape, or None.
+    """
+    if not data:
+        return None
+    dob = data.get("dob")
+    if isinstance(dob, str):
+        try:
+            dob = datetime.date.fromisoformat(dob)
+        except ValueError:
+            dob = None
+    numerology_system = data.get("numerology_system")
+    if numerology_system not in NUMEROLOGY_SYSTEMS:
+        numerology_system = DEFAULT_SYSTEM # Profiles saved before systems were selectable
+    birth_time = data.get("birth_time")
+    if isinstance(birth_time, str):
+        try:
+            birth_time = datetime.time.fromisoformat(birth_time)
+        except ValueError:
+            birth_time = None
+    return {"name": data.get("name") or "", "dob": dob, "numerology_system": numerology_system,
+            "birth_time": birth_time, "birth_place": data.get("birth_place")}
+
+
+class ProfileRepository:
+    """
+    Loads and saves profiles through a bounded LRU cache shared by all sessions.
+
+    `database_factory` returns a fresh pyrebase Database handle (see
+    FirebaseClient.database). Entries expire after `ttl_seconds` and are dropped
+    whenever the profile is written, so a reader never sees a stale profile for
+    longer than the TTL, and never after a save from this process.
+    Users without a stored profile are cached too (as None).
+
+    With a `write_queue` (see write_queue.WriteQueue), save() returns before the
+    write is sent: the cache is updated at once (write-through) and the entry is
+    dropped again if the queue finally gives up on the write.
+    """
+
+    def __init__(self, database_factory, max_entries=PROFILE_CACHE_MAX_ENTRIES,
+                 ttl_seconds=PROFILE_CACHE_TTL_SECONDS, clock=time.monotonic, write_queue=None):
+        self._database_factory = database_factory
+        self._write_queue = write_queue
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries = OrderedDict() # localId -> (expires_at, profile or None)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _cached(self, uid):
+        with self._lock:
+            entry = self._entries.get(uid)
+            if entry is None:
+                return _MISSING
+            expires_at, profile = entry
+            if expires_at <= self._clock():
+                del self._entries[uid]
+                return _MISSING
+            self._entries.move_to_end(uid)
+            return profile
+
+    def _store(self, uid, profile):
+        with self._lock:
+            self._entries[uid] = (self._clock() + self.ttl_seconds, profile)
+            self._entries.move_to_end(uid)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, uid, id_token):
+        """
+        Returns the user's profile ({'name': str, 'dob': date or None,
+        'numerology_system': str, 'birth_time': time or None, 'birth_place': str
+        or None}) or None if
+        they haven't saved one yet. Only the first call within the TTL hits the database.
+        """
+        profile = self._cached(uid)
+        if profile is not _MISSING:
+            self.hits += 1
+            return dict(profile) if profile else None
+        self.misses += 1
+        data = self._database_factory().child("users").child(uid).get(id_token).val()
+        profile = _parse_profile(data)
+        self._store(uid, profile)
+        return dict(profile) if profile else None
+
+    def save(self, uid, id_token, name, dob, numerology_system=DEFAULT_SYSTEM, birth_time=None, birth_place=None):
+        """
+        Writes the profile: through the write queue if there is one (`id_token` may
+        then be a token provider), otherwise synchronously, invalidating its cache entry.
+        """
+        fields = {
+            "name": name,
+            "dob": dob.isoformat(), # Store as ISO format string
+            "numerology_system": numerology_system,
+            "birth_time": birth_time.strftime("%H:%M") if birth_time else None, # None removes the field
+            "birth_place": birth_place,
+        }
+        if self._write_queue is not None:
+            self._store(uid, _parse_profile(fields))
+            self._write_queue.enqueue(uid, id_token, {f"users/{uid}/{key}": value for key, value in fields.items()},
+                                      on_failure=lambda uid, error: self.invalidate(uid))
+            return
+        try:
+            self._database_factory().child("users").child(uid).update(fields, id_token)
+        finally:
+            # Also on failure: a partial write may have landed
+            self.invalidate(uid)
+
+    def invalidate(self, uid):
+        """Drops the cached profile for `uid`, if any."""
+        with self._lock:
+            self._entries.pop(uid, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_repository = None
+_repository_lock = threading.Lock()
+
+
+def get_profile_repository(database_factory, write_queue=None):
+    """Returns the process-wide ProfileRepository, creating it on first call."""
+    global _repository
+    if _repository is None:
+        with _repository_lock:
+            if _repository is None:
+                _repository = ProfileRepository(database_factory, write_queue=write_queue)
+    return _repository
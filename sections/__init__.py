@@ -0,0 +1,43 @@
+# Section registry: every app tab is a module in this package with a render(context)
+# function. Only the selected section's module is imported and rendered per rerun.
+import functools
+import importlib
+from collections import namedtuple
+
+import streamlit as st
+
+import tracing
+
+# What sections may need from the main script
+SectionContext = namedtuple("SectionContext", ["profiles", "compatibility", "chat", "set_error_message",
+                                               "report_write_failures", "today", "min_allowed_dob"])
+
+# Tab title -> module, in display order
+SECTIONS = {
+    "Numerology": "sections.numerology",
+    "Compatibility": "sections.compatibility",
+    "Astrology": "sections.astrology",
+    "Tarot Cards": "sections.tarot",
+    "Vastu Shastra": "sections.vastu",
+    "Palmistry": "sections.palmistry",
+    "Aura Reading": "sections.aura",
+    "My Profile": "sections.profile",
+}
+
+def render_section(title, context):
+    """
+    Imports (on first use) and renders one section as a Streamlit fragment, so
+    widgets inside it rerun only that section rather than the whole page.
+    """
+    module = importlib.import_module(SECTIONS[title]) # Cached in sys.modules after the first visit
+
+    # Fragment reruns skip the main script, so they are timed (and exported) on their own, and
+    # report failed background saves here, in the section that queued them.
+    # wraps() keeps module.render's name, which Streamlit uses to identify the fragment.
+    @functools.wraps(module.render)
+    def render(context):
+        with tracing.script_run(f"fragment.{SECTIONS[title]}"):
+            context.report_write_failures()
+            module.render(context)
+
+    st.fragment(render)(context)
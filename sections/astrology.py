@@ -0,0 +1,54 @@
+# Astrology section: Vedic (sidereal) natal chart computed locally from the profile
+import streamlit as st
+
+from natal_chart import (
+    BIRTH_PLACES,
+    DEFAULT_BIRTH_PLACE,
+    DEFAULT_BIRTH_TIME,
+    NAKSHATRAS,
+    RASHIS,
+    natal_chart,
+)
+
+
+def _format_degree(degree):
+    whole = int(degree)
+    return f"{whole}°{int((degree - whole) * 60):02d}'"
+
+
+def render(context):
+    st.header("Astrology: Cosmic Guidance")
+    st.write("Your Vedic birth chart (Lahiri ayanamsa, whole-sign houses), calculated from your profile.")
+
+    profile = st.session_state['user_profile']
+    if not profile['is_profile_loaded'] or not profile.get('dob'):
+        st.warning("Please update your Date of Birth in the 'My Profile' tab to see your birth chart.")
+        return
+
+    birth_time = profile.get('birth_time')
+    birth_place = profile.get('birth_place')
+    if birth_time is None or birth_place not in BIRTH_PLACES:
+        st.info("Add your time and place of birth in the 'My Profile' tab for an accurate Lagna and houses. "
+                f"Until then the chart assumes {DEFAULT_BIRTH_TIME:%H:%M} in {DEFAULT_BIRTH_PLACE}.")
+        birth_time = birth_time or DEFAULT_BIRTH_TIME
+        birth_place = birth_place if birth_place in BIRTH_PLACES else DEFAULT_BIRTH_PLACE
+
+    # Computed offline in well under a millisecond and cached per (DOB, time, place)
+    chart = natal_chart(profile['dob'], birth_time, birth_place)
+
+    rashi, english = RASHIS[chart.lagna_rashi]
+    st.subheader(f"Lagna (Ascendant): {rashi} ({english}) {_format_degree(chart.lagna % 30)}")
+    moon = chart.positions[1]
+    st.markdown(f"**Moon sign (Rashi):** {RASHIS[moon.rashi][0]} ({RASHIS[moon.rashi][1]}) · "
+                f"**Janma Nakshatra:** {NAKSHATRAS[moon.nakshatra]}, pada {moon.pada}")
+
+    st.table([
+        {"Graha": position.graha + (" (R)" if position.retrograde and position.graha not in ("Rahu", "Ketu") else ""),
+         "Rashi": f"{RASHIS[position.rashi][0]} ({RASHIS[position.rashi][1]})",
+         "Degree": _format_degree(position.degree),
+         "Nakshatra": f"{NAKSHATRAS[position.nakshatra]} ({position.pada})",
+         "House": position.house}
+        for position in chart.positions
+    ])
+    st.caption(f"Born {profile['dob']:%d %b %Y} at {birth_time:%H:%M}, {birth_place}. "
+               f"Ayanamsa {_format_degree(chart.ayanamsa)}. (R) = retrograde.")
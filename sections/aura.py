@@ -0,0 +1,7 @@
+# Aura Reading section
+import streamlit as st
+
+
+def render(context):
+    st.header("Aura Reading: Vibrational Energy")
+    st.write("Understanding your energy field.")
@@ -0,0 +1,117 @@
+# Expert chat (shown under every section): new messages come from the in-process
+# broker, older ones are loaded from the database a page at a time
+import streamlit as st
+
+from chat import EXPERT, MAX_MESSAGE_LENGTH, USER
+from tracing import script_run, span
+
+REFRESH_SECONDS = 2 # How often an open chat drains its subscription (memory only, no database reads)
+
+
+def _experts():
+    """{uid: display name} of the practitioners users can chat with (chat_experts in secrets)."""
+    return dict(st.secrets.get("chat_experts", {}))
+
+
+def _open_chat(context, chat_id, role, other_name, id_token):
+    """Subscribes first, then loads the newest page, so no message falls in between."""
+    previous = st.session_state.get('chat')
+    if previous:
+        previous['subscription'].close()
+    subscription = context.chat.subscribe(chat_id)
+    with span("firebase.chat_history"):
+        messages, cursor = context.chat.history(chat_id, id_token)
+    st.session_state['chat'] = {
+        'id': chat_id, 'role': role, 'with': other_name, 'subscription': subscription,
+        'messages': {message.key: message for message in messages}, 'cursor': cursor,
+    }
+
+
+def _load_earlier(context):
+    # A button callback, so the button is already gone when the first page is reached
+    state = st.session_state['chat']
+    try:
+        with span("firebase.chat_history"):
+            messages, state['cursor'] = context.chat.history(state['id'], st.session_state['auth_session'].token(),
+                                                              before=state['cursor'])
+    except Exception as e:
+        context.set_error_message(f"Could not load earlier messages: {e}")
+        return
+    state['messages'].update((message.key, message) for message in messages)
+
+
+@st.fragment(run_every=REFRESH_SECONDS)
+def _conversation(context):
+    # Reruns every REFRESH_SECONDS without the main script, so it is timed on its own
+    state = st.session_state.get('chat')
+    if not state: # Closed since the last full run (e.g. by logging out)
+        return
+    with script_run("fragment.sections.chat"):
+        id_token = st.session_state['auth_session'].token()
+        for message in state['subscription'].drain():
+            state['messages'][message.key] = message
+
+        st.caption(f"Chatting with {state['with']}")
+        if state['cursor']:
+            st.button("Load earlier messages", key="chat_load_earlier", on_click=_load_earlier, args=(context,))
+
+        text = st.chat_input("Type your message", key="chat_message_input", max_chars=MAX_MESSAGE_LENGTH)
+        if text:
+            try:
+                # Delivered to the other side at once; written to the database in the next batch
+                message = context.chat.publish(state['id'], state['role'], text, id_token)
+                state['messages'][message.key] = message
+            except ValueError as e:
+                st.warning(str(e))
+
+        for key in sorted(state['messages']):
+            message = state['messages'][key]
+            with st.chat_message("user" if message.role == state['role'] else "assistant"):
+                st.write(message.text)
+
+
+def render(context):
+    st.header("Connect with an Expert (Chat)")
+    user_uid = st.session_state['auth_session'].uid
+    id_token = st.session_state['auth_session'].token()
+    experts = _experts()
+
+    if user_uid in experts:
+        st.write("Conversations with people who reached out to you.")
+        if 'chat_inbox' not in st.session_state or st.button("Refresh conversations", key="chat_refresh_inbox"):
+            try:
+                with span("firebase.chat_inbox"):
+                    st.session_state['chat_inbox'] = context.chat.store.conversations(user_uid, id_token)
+            except Exception as e:
+                st.error(f"Could not load your conversations: {e}")
+                return
+        inbox = st.session_state['chat_inbox']
+        if not inbox:
+            st.info("No one has started a chat with you yet.")
+            return
+        chat_id = st.selectbox("Conversation", list(inbox), format_func=lambda key: inbox[key].get("with") or "User",
+                               key="chat_inbox_conversation")
+        if st.button("Open Chat", key="open_chat"):
+            try:
+                _open_chat(context, chat_id, EXPERT, inbox[chat_id].get("with") or "User", id_token)
+            except Exception as e:
+                st.error(f"Could not open the chat: {e}")
+    else:
+        st.write("Chat one-on-one with our astrologers and practitioners.")
+        if not experts:
+            st.info("No experts are available for chat yet. Please check back soon!")
+            return
+        expert_uid = st.selectbox("Choose an expert", list(experts), format_func=experts.get, key="chat_expert")
+        if st.button("Start a Chat", key="start_chat"):
+            first_names = st.session_state['user_profile'].get('name', '').split()
+            try:
+                with span("firebase.chat_start"):
+                    chat_id = context.chat.store.start_conversation(
+                        user_uid, first_names[0] if first_names else "User", expert_uid, experts[expert_uid], id_token)
+                _open_chat(context, chat_id, USER, experts[expert_uid], id_token)
+            except Exception as e:
+                st.error(f"Could not start the chat: {e}")
+
+    # Only an open conversation polls: without one the fragment (and its timer) isn't created
+    if st.session_state.get('chat'):
+        _conversation(context)
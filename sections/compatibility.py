@@ -0,0 +1,66 @@
+# Compatibility section: opt-in matching of users by core numbers
+import streamlit as st
+
+from compatibility import profile_bucket
+from numerology_systems import DEFAULT_SYSTEM
+from tracing import span
+
+MATCHES_SHOWN = 10
+
+
+def _update_listing(context, auth_session, profile, system):
+    # Checkbox callback: runs before the rerun it triggers, so any error shows in that same run
+    try:
+        with span("firebase.compatibility_update"):
+            context.compatibility.update_profile(auth_session.uid, auth_session, profile['name'], profile['dob'],
+                                                 system, st.session_state['compatibility_listed'])
+    except Exception as e:
+        st.session_state['compatibility_listing_error'] = f"Failed to update your listing: {e}. Check database rules."
+
+
+def render(context):
+    st.header("Compatibility: Find Your Cosmic Connections")
+    st.write("Discover people whose Life Path, Expression and Soul Urge numbers resonate with yours.")
+
+    profile = st.session_state['user_profile']
+    if not profile['is_profile_loaded'] or not profile.get('name') or not profile.get('dob'):
+        st.warning("Please update your Full Name and Date of Birth in the 'My Profile' tab to find compatible people.")
+        return
+
+    auth_session = st.session_state['auth_session']
+    user_uid = auth_session.uid
+    system = profile.get('numerology_system', DEFAULT_SYSTEM)
+    index = context.compatibility
+    try:
+        with span("firebase.compatibility_load"):
+            index.ensure_loaded(auth_session.token()) # Loads once, then refreshes in the background
+    except Exception as e:
+        st.error(f"Could not load compatibility matches: {e}")
+        return
+
+    listing_error = st.session_state.pop('compatibility_listing_error', None)
+    if listing_error:
+        st.error(listing_error)
+    # Follows the index, so a queued write that was rolled back unticks the box again
+    st.session_state['compatibility_listed'] = index.is_listed(user_uid)
+    st.checkbox("List me in compatibility matches", key="compatibility_listed",
+                on_change=_update_listing, args=(context, auth_session, profile, system),
+                help="Other users will see your first name and core numbers. Uncheck to be removed.")
+
+    bucket = profile_bucket(profile['name'], profile['dob'], system)
+    if bucket is None:
+        st.error("Could not calculate your core numbers. Please check your name and Date of Birth.")
+        return
+
+    if st.button("Find Compatible People", key="find_compatible_people"):
+        with span("compatibility.top_matches"):
+            matches = index.top_matches(bucket, k=MATCHES_SHOWN, exclude=user_uid)
+        if not matches:
+            st.info("No one else is listed yet. Check back soon!")
+        else:
+            st.table([
+                {"Name": match.display_name or "Anonymous", "Life Path": match.life_path,
+                 "Expression": match.expression, "Soul Urge": match.soul_urge,
+                 "Compatibility": f"{match.score:.0%}"}
+                for match in matches
+            ])
@@ -0,0 +1,129 @@
+# Numerology section: core numbers with concurrently fetched interpretations
+import altair as alt
+import pandas as pd
+import streamlit as st
+
+from numerology_core import (
+    analyze_name,
+    calculate_birth_day_number,
+    calculate_expression_number,
+    calculate_life_path,
+    calculate_personality_number,
+    calculate_soul_urge_number,
+    use_dob_index,
+)
+from numerology_forecast import calendar_grid, forecast_year
+from numerology_page import iter_numerology_interpretations, start_prewarm_in_background
+from numerology_systems import DEFAULT_SYSTEM, get_system
+
+# This module is imported (and the lines below run) once per process, on the first
+# visit to the section.
+# Serve date-based numbers from the precomputed DOB index (built once per process, extended at midnight)
+use_dob_index()
+
+# Name-agnostic mode only: fill the interpretation cache in the background, once per process
+start_prewarm_in_background()
+
+
+def render(context):
+    st.header("Numerology: Uncover Your Life's Blueprint")
+    st.write("Unlock insights into your personality, destiny, and life's purpose by exploring your core numerology numbers.")
+
+    # Conditional display based on profile completeness
+    if not st.session_state['user_profile']['is_profile_loaded'] or \
+            not st.session_state['user_profile'].get('name') or \
+            not st.session_state['user_profile'].get('dob'):
+            st.warning("Please update your Full Name and Date of Birth in the 'My Profile' tab to use Numerology features.")
+    else:
+        name_for_numerology = st.session_state['user_profile']['name']
+        dob_for_numerology = st.session_state['user_profile']['dob']
+        system = get_system(st.session_state['user_profile'].get('numerology_system', DEFAULT_SYSTEM))
+
+        # Display the pre-filled, disabled inputs
+        st.text_input("Your Full Name", value=name_for_numerology, disabled=True,
+                      key="numerology_display_name")
+        st.date_input("Your Birth Date", value=dob_for_numerology, disabled=True,
+                      key="numerology_display_dob")
+        st.caption(f"Numerology system: {system.label}. {system.description}")
+        st.info("To change Name, Date of Birth or numerology system, please go to the 'My Profile' tab.")
+
+        if st.button("Calculate My Numbers", key="calculate_all_numerology"):
+            st.subheader(f"Numerology Report for {name_for_numerology}, born on {dob_for_numerology}:")
+
+            # (interpretation label, display title, number, error if it can't be calculated)
+            core_numbers = [
+                ("Life Path", "Life Path Number", calculate_life_path(dob_for_numerology),
+                 "Could not calculate Life Path Number. Please check your Date of Birth."),
+                ("Expression", "Expression/Destiny Number", calculate_expression_number(name_for_numerology, system),
+                 "Could not calculate Expression Number. Please ensure your name is entered correctly."),
+                ("Soul Urge", "Soul Urge/Heart's Desire Number", calculate_soul_urge_number(name_for_numerology, system),
+                 "Could not calculate Soul Urge Number. Please ensure your name is entered correctly."),
+                ("Personality", "Personality Number", calculate_personality_number(name_for_numerology, system),
+                 "Could not calculate Personality Number. Please ensure your name is entered correctly."),
+                ("Birth Day", "Birth Day Number", calculate_birth_day_number(dob_for_numerology),
+                 "Could not calculate Birth Day Number. Please check your Date of Birth."),
+            ]
+
+            # Lay out every number first, with an empty slot in its expander for the meaning
+            meaning_slots = {}
+            for label, title, number, error in core_numbers:
+                if number is not None:
+                    st.markdown(f"**{title}:** `{number}`")
+                    with st.expander(f"Meaning of {label} Number {number}"):
+                        meaning_slots[label] = st.empty()
+                        meaning_slots[label].caption("Consulting the numerologist...")
+                else:
+                    st.error(error)
+
+            # Extended name numbers, from the same (cached) pass over the name
+            name_analysis = analyze_name(name_for_numerology, system)
+            maturity_number = name_analysis.maturity_number(core_numbers[0][2])
+            if maturity_number is not None:
+                st.markdown(f"**Maturity Number:** `{maturity_number}`")
+            st.markdown(f"**Hidden Passion:** `{', '.join(map(str, name_analysis.hidden_passion)) or 'None'}`")
+            st.markdown(f"**Karmic Lessons (missing numbers):** `{', '.join(map(str, name_analysis.karmic_lessons)) or 'None'}`")
+
+            # All interpretations are requested concurrently; each slot fills in as soon as
+            # its text arrives (falling back to the built-in meaning on error or timeout)
+            numbers_to_interpret = {label: number for label, _, number, _ in core_numbers if number is not None}
+            for label, number, text, _ in iter_numerology_interpretations(numbers_to_interpret, name_for_numerology):
+                meaning_slots[label].write(text)
+
+        render_forecast(dob_for_numerology, context.today)
+
+
+MONTH_NAMES = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+
+def render_forecast(dob, today):
+    st.subheader("Your Numerology Forecast")
+    st.write("Your Personal Day number for every day of the year. Hover over a day to see its Personal Month too.")
+    year = st.selectbox("Forecast year", list(range(today.year - 1, today.year + 3)), index=1, key="forecast_year")
+
+    # Computed for the whole year at once and cached per (DOB, year)
+    current = forecast_year(dob, today.year)
+    day_of_year = today.timetuple().tm_yday - 1
+    year_column, month_column, day_column = st.columns(3)
+    year_column.metric("Personal Year (today)", int(current.personal_year[day_of_year]))
+    month_column.metric("Personal Month (today)", int(current.personal_month[day_of_year]))
+    day_column.metric("Personal Day (today)", int(current.personal_day[day_of_year]))
+
+    forecast = forecast_year(dob, year)
+    month, day = calendar_grid(forecast.dates)
+    frame = pd.DataFrame({
+        "date": forecast.dates,
+        "month": pd.Categorical.from_codes(month - 1, MONTH_NAMES),
+        "day": day,
+        "personal_day": forecast.personal_day,
+        "personal_month": forecast.personal_month,
+    })
+    heatmap = alt.Chart(frame).mark_rect(cornerRadius=2).encode(
+        x=alt.X("day:O", title="Day of month"),
+        y=alt.Y("month:O", sort=MONTH_NAMES, title=None),
+        color=alt.Color("personal_day:O", title="Personal Day", scale=alt.Scale(scheme="tableau20")),
+        tooltip=[alt.Tooltip("date:T", title="Date", format="%a %d %b %Y"),
+                 alt.Tooltip("personal_day:O", title="Personal Day"),
+                 alt.Tooltip("personal_month:O", title="Personal Month")],
+    )
+    st.altair_chart(heatmap, width="stretch")
+    st.caption(f"Personal Year {year}: {int(forecast.personal_year[0])}")
@@ -0,0 +1,7 @@
+# Palmistry section
+import streamlit as st
+
+
+def render(context):
+    st.header("Palmistry: The Map in Your Hand")
+    st.write("Insights from palm lines and shapes.")
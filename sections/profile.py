@@ -0,0 +1,70 @@
+# My Profile section: loads/updates profile data
+import streamlit as st
+
+from natal_chart import BIRTH_PLACES
+from numerology_systems import DEFAULT_SYSTEM, NUMEROLOGY_SYSTEMS
+from tracing import span
+
+
+def render(context):
+    st.header("My Profile")
+    st.write("Update your personal information.")
+
+    with st.form("profile_update_form"):
+        current_name = st.session_state['user_profile'].get('name', '')
+        current_dob = st.session_state['user_profile'].get('dob') or context.today
+        current_system = st.session_state['user_profile'].get('numerology_system', DEFAULT_SYSTEM)
+        current_birth_time = st.session_state['user_profile'].get('birth_time')
+        current_birth_place = st.session_state['user_profile'].get('birth_place')
+
+        new_name = st.text_input("Full Name (as on birth certificate)", value=current_name, key="profile_name_input")
+        new_dob = st.date_input("Date of Birth", value=current_dob, max_value=context.today,
+                                min_value=context.min_allowed_dob, key="profile_dob_input")
+        system_keys = list(NUMEROLOGY_SYSTEMS)
+        new_system = st.selectbox("Numerology System", system_keys, index=system_keys.index(current_system),
+                                  format_func=lambda key: NUMEROLOGY_SYSTEMS[key].label, key="profile_numerology_system",
+                                  help="How the letters of your name are turned into numbers. Choose Indic if your name is written in Devanagari or another Indian script.")
+        new_birth_time = st.time_input("Time of Birth (optional)", value=current_birth_time, step=60,
+                                       key="profile_birth_time_input",
+                                       help="Local time on your birth certificate. Needed for an accurate Lagna (ascendant).")
+        place_names = list(BIRTH_PLACES)
+        new_birth_place = st.selectbox("Place of Birth (optional)", place_names,
+                                       index=place_names.index(current_birth_place) if current_birth_place in BIRTH_PLACES else None,
+                                       placeholder="Choose the nearest city", key="profile_birth_place_input")
+
+        update_profile_button = st.form_submit_button("Update Profile")
+
+        if update_profile_button:
+            if new_name and new_dob:
+                auth_session = st.session_state.get('auth_session')
+                if auth_session is not None:
+                    user_uid = auth_session.uid
+                    try:
+                        # Queued (merged with this user's other pending changes) and written in the
+                        # background with a fresh token; the cached profile is updated at once
+                        with span("firebase.profile_update"):
+                            context.profiles.save(user_uid, auth_session, new_name, new_dob, new_system,
+                                                  new_birth_time, new_birth_place)
+                        # New name/DOB/system may move a listed user to another match bucket
+                        saved_dob = st.session_state['user_profile'].get('dob')
+                        if (new_name, new_dob, new_system) != (current_name, saved_dob, current_system):
+                            with span("firebase.compatibility_update"):
+                                context.compatibility.ensure_loaded(auth_session.token())
+                                if context.compatibility.is_listed(user_uid):
+                                    context.compatibility.update_profile(user_uid, auth_session, new_name, new_dob, new_system)
+                        st.session_state['user_profile']['name'] = new_name
+                        st.session_state['user_profile']['dob'] = new_dob
+                        st.session_state['user_profile']['numerology_system'] = new_system
+                        st.session_state['user_profile']['birth_time'] = new_birth_time
+                        st.session_state['user_profile']['birth_place'] = new_birth_place
+                        st.session_state['user_profile']['is_profile_loaded'] = True # Ensure flag is true
+                        st.success("Your profile information has been updated!")
+                        st.rerun() # Rerun to refresh welcome message and other pre-filled fields
+                    except Exception as e:
+                        context.set_error_message(f"Failed to update profile: {e}. Check database rules.")
+                        st.rerun()
+                else:
+                    context.set_error_message("User information not found. Please log in again.")
+                    st.rerun()
+            else:
+                st.warning("Please enter both your full name and birth date.")
@@ -0,0 +1,40 @@
+# Tarot Cards section: a daily reading per user and spread, drawn from the seeded deck
+import html
+
+import streamlit as st
+
+from tarot import SPREADS, daily_reading, get_atlas, sprite_style
+from tracing import span
+
+
+def _card_html(atlas, drawn):
+    card = drawn.card
+    meaning = card.reversed if drawn.reversed else card.upright
+    title = card.name + (" (Reversed)" if drawn.reversed else "")
+    return (
+        '<div style="width:150px;text-align:center;">'
+        f'<div style="font-weight:600;margin-bottom:6px;">{html.escape(drawn.position)}</div>'
+        f'<div role="img" aria-label="{html.escape(title)}" style="margin:0 auto;{sprite_style(atlas, card, drawn.reversed)}"></div>'
+        f'<div style="font-weight:600;margin-top:8px;">{html.escape(title)}</div>'
+        f'<div style="font-size:0.85em;">{html.escape(meaning)}</div>'
+        '</div>'
+    )
+
+
+def render(context):
+    st.header("Tarot Cards: Intuitive Insights")
+    st.write("Draw a spread and reflect on the cards. Your reading stays the same for the rest of the day.")
+
+    spread = st.selectbox("Choose a spread", list(SPREADS), key="tarot_spread")
+    if not st.button("Draw Cards", key="draw_tarot_cards") and st.session_state.get('tarot_reading_spread') != spread:
+        return
+    st.session_state['tarot_reading_spread'] = spread
+
+    user_uid = st.session_state['user_info']['localId']
+    with span("tarot.draw"):
+        reading = daily_reading(user_uid, context.today, spread)
+    atlas = get_atlas() # Built once per process; every card is a CSS offset into it
+
+    cards = "".join(_card_html(atlas, drawn) for drawn in reading)
+    st.markdown(f'<div style="display:flex;flex-wrap:wrap;gap:16px;">{cards}</div>', unsafe_allow_html=True)
+    st.caption(f"{spread} reading for {context.today:%d %b %Y}.")
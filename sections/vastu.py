@@ -0,0 +1,7 @@
+# Vastu Shastra section
+import streamlit as st
+
+
+def render(context):
+    st.header("Vastu Shastra: Harmonize Your Space")
+    st.write("Principles for architectural harmony.")
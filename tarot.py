@@ -0,0 +1,261 @@
+# Tarot engine: an immutable 78-card deck with frozen meanings, reproducible
+# (seeded) spreads with reversals, and a single sprite atlas of card art.
+import hashlib
+import io
+import os
+import random
+import threading
+from collections import namedtuple
+from functools import lru_cache
+from types import MappingProxyType
+
+from PIL import Image, ImageDraw, ImageFont
+
+from media_assets import GENERATED_DIR, STATIC_URL_PREFIX, static_path
+
+# --- Deck ---
+
+Card = namedtuple("Card", ["index", "name", "arcana", "suit", "rank", "upright", "reversed"])
+
+MAJOR_ARCANA = (
+    ("The Fool", "New beginnings, spontaneity, a leap of faith.", "Recklessness, hesitation, naivety."),
+    ("The Magician", "Willpower, skill, manifesting your goals.", "Manipulation, untapped talent, poor planning."),
+    ("The High Priestess", "Intuition, inner wisdom, the subconscious.", "Secrets, disconnection from intuition."),
+    ("The Empress", "Abundance, nurturing, creativity, fertility.", "Dependence, creative block, smothering."),
+    ("The Emperor", "Authority, structure, stability, leadership.", "Rigidity, domination, lack of discipline."),
+    ("The Hierophant", "Tradition, guidance, spiritual teaching.", "Rebellion, unconventional paths, dogma."),
+    ("The Lovers", "Love, harmony, meaningful choices.", "Disharmony, imbalance, misaligned values."),
+    ("The Chariot", "Determination, control, victory through will.", "Lack of direction, scattered energy."),
+    ("Strength", "Courage, patience, gentle inner strength.", "Self-doubt, low energy, raw emotion."),
+    ("The Hermit", "Soul-searching, solitude, inner guidance.", "Isolation, loneliness, withdrawal."),
+    ("Wheel of Fortune", "Cycles, destiny, a turning point.", "Bad luck, resistance to change."),
+    ("Justice", "Fairness, truth, cause and effect.", "Unfairness, dishonesty, avoiding accountability."),
+    ("The Hanged Man", "Surrender, new perspectives, pause.", "Stalling, needless sacrifice, indecision."),
+    ("Death", "Endings, transformation, transition.", "Resistance to change, stagnation."),
+    ("Temperance", "Balance, moderation, patience, purpose.", "Imbalance, excess, lack of harmony."),
+    ("The Devil", "Attachment, temptation, shadow self.", "Release, breaking free, reclaiming power."),
+    ("The Tower", "Sudden upheaval, revelation, awakening.", "Averting disaster, fear of change."),
+    ("The Star", "Hope, renewal, inspiration, serenity.", "Despair, lost faith, disconnection."),
+    ("The Moon", "Illusion, intuition, the unknown.", "Confusion lifting, released fear."),
+    ("The Sun", "Joy, success, vitality, positivity.", "Temporary setbacks, dimmed enthusiasm."),
+    ("Judgement", "Reflection, reckoning, inner calling.", "Self-doubt, ignoring the call."),
+    ("The World", "Completion, fulfilment, wholeness.", "Loose ends, seeking closure."),
+)
+
+SUITS = (
+    ("Wands", "ambition, passion and creative drive"),
+    ("Cups", "emotions, love and relationships"),
+    ("Swords", "thoughts, truth and conflict"),
+    ("Pentacles", "work, money and the material world"),
+)
+
+RANKS = (
+    ("Ace", "A fresh start", "A delayed start"),
+    ("Two", "Balance and decisions", "Indecision"),
+    ("Three", "Growth and collaboration", "Setbacks in growth"),
+    ("Four", "Stability and rest", "Restlessness"),
+    ("Five", "Challenge and change", "Recovery from conflict"),
+    ("Six", "Harmony and generosity", "Imbalance"),
+    ("Seven", "Perseverance and assessment", "Giving up too soon"),
+    ("Eight", "Movement and mastery", "Stagnation"),
+    ("Nine", "Nearing fulfilment", "Anxiety about the outcome"),
+    ("Ten", "Completion of a cycle", "Burden of an ending"),
+    ("Page", "Curiosity and a new message", "Immaturity"),
+    ("Knight", "Action and pursuit", "Haste"),
+    ("Queen", "Nurturing mastery", "Insecurity"),
+    ("King", "Confident authority", "Misused control"),
+)
+
+
+def _build_deck():
+    cards = [Card(i, name, "Major", None, i, upright, reversed_meaning)
+             for i, (name, upright, reversed_meaning) in enumerate(MAJOR_ARCANA)]
+    for suit, domain in SUITS:
+        for rank, (rank_name, upright, reversed_meaning) in enumerate(RANKS, 1):
+            cards.append(Card(len(cards), f"{rank_name} of {suit}", "Minor", suit, rank,
+                              f"{upright} in {domain}.", f"{reversed_meaning} in {domain}."))
+    return tuple(cards)
+
+
+DECK = _build_deck()
+CARDS_BY_NAME = MappingProxyType({card.name: card for card in DECK})
+
+# --- Spreads ---
+
+SPREADS = MappingProxyType({
+    "Three Card": ("Past", "Present", "Future"),
+    "Celtic Cross": ("Present", "Challenge", "Foundation", "Recent Past", "Crown", "Near Future",
+                     "Self", "Environment", "Hopes and Fears", "Outcome"),
+})
+
+REVERSAL_PROBABILITY = 0.5
+
+DrawnCard = namedtuple("DrawnCard", ["position", "card", "reversed"])
+
+
+def reading_seed(*parts):
+    """Stable 64-bit seed from e.g. (uid, date, spread): the same inputs give the same reading in any process."""
+    return int.from_bytes(hashlib.sha256("\0".join(map(str, parts)).encode("utf-8")).digest()[:8], "big")
+
+
+@lru_cache(maxsize=4096)
+def draw_spread(spread, seed):
+    """Draws the cards of a spread (a SPREADS key) without replacement; reproducible for a seed."""
+    positions = SPREADS[spread]
+    rng = random.Random(seed)
+    indices = rng.sample(range(len(DECK)), len(positions))
+    return tuple(DrawnCard(position, DECK[index], rng.random() < REVERSAL_PROBABILITY)
+                 for position, index in zip(positions, indices))
+
+
+def daily_reading(uid, day, spread):
+    """The user's reading for a spread on a given day (one per user, day and spread)."""
+    return draw_spread(spread, reading_seed(uid, day.isoformat(), spread))
+
+# --- Sprite atlas ---
+
+# Card art: static/tarot/<index>.png (any size, scaled to fit) overrides the generated face
+ART_DIR = "tarot"
+ATLAS_COLUMNS = 13
+CARD_WIDTH = 120 # CSS pixels
+CARD_HEIGHT = 200
+ATLAS_SCALE = 2 # The atlas is drawn at 2x, so cards stay sharp on high-DPI screens
+
+_SUIT_COLOURS = {None: (74, 35, 110), "Wands": (176, 72, 28), "Cups": (32, 86, 160),
+                 "Swords": (84, 96, 112), "Pentacles": (40, 120, 64)}
+_GOLD = (236, 196, 92)
+_ROMAN = ("0", "I", "II", "III", "IV", "V", "VI", "VII", "VIII", "IX", "X", "XI", "XII", "XIII", "XIV",
+          "XV", "XVI", "XVII", "XVIII", "XIX", "XX", "XXI")
+
+Atlas = namedtuple("Atlas", ["urls", "columns", "card_width", "card_height"]) # urls: {"webp": ..., "png": ...}
+
+_atlas = None
+_atlas_lock = threading.Lock()
+
+
+def _wrap(draw, text, font, width):
+    lines = [""]
+    for word in text.split():
+        candidate = f"{lines[-1]} {word}".strip()
+        if draw.textlength(candidate, font=font) <= width or not lines[-1]:
+            lines[-1] = candidate
+        else:
+            lines.append(word)
+    return lines
+
+
+def _draw_symbol(draw, card, cx, cy, size):
+    if card.suit is None: # Major arcana: a sun
+        draw.ellipse((cx - size, cy - size, cx + size, cy + size), outline=_GOLD, width=size // 8)
+        draw.ellipse((cx - size // 3, cy - size // 3, cx + size // 3, cy + size // 3), fill=_GOLD)
+    elif card.suit == "Wands":
+        draw.rounded_rectangle((cx - size // 8, cy - size, cx + size // 8, cy + size), radius=size // 8, fill=_GOLD)
+    elif card.suit == "Cups":
+        draw.polygon([(cx - size, cy - size), (cx + size, cy - size), (cx, cy + size // 3)], fill=_GOLD)
+        draw.rectangle((cx - size // 10, cy, cx + size // 10, cy + size), fill=_GOLD)
+    elif card.suit == "Swords":
+        draw.polygon([(cx, cy - size), (cx + size // 8, cy + size // 2), (cx - size // 8, cy + size // 2)], fill=_GOLD)
+        draw.rectangle((cx - size // 2, cy + size // 2, cx + size // 2, cy + size // 2 + size // 8), fill=_GOLD)
+    else: # Pentacles
+        draw.ellipse((cx - size, cy - size, cx + size, cy + size), outline=_GOLD, width=size // 8)
+        draw.regular_polygon((cx, cy, size * 3 // 4), 5, outline=_GOLD)
+
+
+def _generated_face(card, width, height):
+    """A simple card face (suit colour, numeral, symbol and name) for cards without art."""
+    face = Image.new("RGB", (width, height), _SUIT_COLOURS[card.suit])
+    draw = ImageDraw.Draw(face)
+    margin = width // 20
+    draw.rounded_rectangle((margin, margin, width - margin, height - margin), radius=margin * 2,
+                           outline=_GOLD, width=max(1, margin // 3))
+    title = _ROMAN[card.rank] if card.suit is None else RANKS[card.rank - 1][0]
+    title_font = ImageFont.load_default(size=height // 11)
+    draw.text((width // 2, margin * 3), title, font=title_font, fill=_GOLD, anchor="mt")
+    _draw_symbol(draw, card, width // 2, height * 9 // 20, width // 4)
+    name_font = ImageFont.load_default(size=height // 16)
+    lines = _wrap(draw, card.name, name_font, width - margin * 4)
+    line_height = height // 14
+    top = height - margin * 3 - line_height * len(lines)
+    for i, line in enumerate(lines):
+        draw.text((width // 2, top + i * line_height), line, font=name_font, fill="white", anchor="mt")
+    return face
+
+
+def _art_sources():
+    """[(card, path or None)] plus a version string covering every art file."""
+    sources = []
+    fingerprint = hashlib.sha1(f"{CARD_WIDTH}x{CARD_HEIGHT}@{ATLAS_SCALE}:{ATLAS_COLUMNS}".encode())
+    for card in DECK:
+        path = static_path(os.path.join(ART_DIR, f"{card.index}.png"))
+        if os.path.exists(path):
+            stat = os.stat(path)
+            fingerprint.update(f"{card.index}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+        else:
+            path = None
+        sources.append((card, path))
+    return sources, fingerprint.hexdigest()[:10]
+
+
+def build_atlas():
+    """
+    Packs every card face into one image (ATLAS_COLUMNS per row) and publishes it
+    as WebP and PNG under static/generated/, named by a version that changes with
+    the art. Returns the Atlas; existing files for the same version are reused.
+    """
+    sources, version = _art_sources()
+    urls = {}
+    missing = [extension for extension in ("webp", "png")
+               if not os.path.exists(static_path(f"{GENERATED_DIR}/tarot-atlas-{version}.{extension}"))]
+    if missing:
+        width, height = CARD_WIDTH * ATLAS_SCALE, CARD_HEIGHT * ATLAS_SCALE
+        rows = -(-len(DECK) // ATLAS_COLUMNS)
+        atlas = Image.new("RGB", (width * ATLAS_COLUMNS, height * rows), "white")
+        for card, path in sources:
+            if path is None:
+                face = _generated_face(card, width, height)
+            else:
+                with Image.open(path) as art:
+                    face = art.convert("RGB").resize((width, height), resample=Image.LANCZOS)
+            atlas.paste(face, ((card.index % ATLAS_COLUMNS) * width, (card.index // ATLAS_COLUMNS) * height))
+        os.makedirs(static_path(GENERATED_DIR), exist_ok=True)
+        for extension in missing:
+            buffer = io.BytesIO()
+            if extension == "webp":
+                atlas.save(buffer, format="WEBP", quality=82, method=6)
+            else:
+                atlas.save(buffer, format="PNG", optimize=True)
+            target = static_path(f"{GENERATED_DIR}/tarot-atlas-{version}.{extension}")
+            tmp_path = f"{target}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(buffer.getvalue())
+            os.replace(tmp_path, target) # Atomic, so concurrent sessions never see a partial file
+    for extension in ("webp", "png"):
+        urls[extension] = f"{STATIC_URL_PREFIX}{GENERATED_DIR}/tarot-atlas-{version}.{extension}"
+    return Atlas(urls, ATLAS_COLUMNS, CARD_WIDTH, CARD_HEIGHT)
+
+
+def get_atlas():
+    """Returns the process-wide Atlas, building it on first call."""
+    global _atlas
+    if _atlas is None:
+        with _atlas_lock:
+            if _atlas is None:
+                _atlas = build_atlas()
+    return _atlas
+
+
+def sprite_style(atlas, card, reversed_card=False):
+    """Inline CSS showing one card from the atlas (rotated when reversed)."""
+    column, row = card.index % atlas.columns, card.index // atlas.columns
+    rows = -(-len(DECK) // atlas.columns)
+    style = (
+        f"width:{atlas.card_width}px;height:{atlas.card_height}px;"
+        f"background-image:url({atlas.urls['png']});"
+        f"background-image:image-set(url({atlas.urls['webp']}) type('image/webp'),url({atlas.urls['png']}) type('image/png'));"
+        f"background-size:{atlas.card_width * atlas.columns}px {atlas.card_height * rows}px;"
+        f"background-position:-{column * atlas.card_width}px -{row * atlas.card_height}px;"
+        "border-radius:8px;box-shadow:0 2px 6px rgba(0,0,0,0.3);"
+    )
+    if reversed_card:
+        style += "transform:rotate(180deg);"
+    return style
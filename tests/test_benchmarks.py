@@ -0,0 +1,36 @@
+# Each benchmark's run() checks its own results (brute-force top-k, persisted and
+# paged chat messages, lost writes, backend agreement) and raises AssertionError on a
+# mismatch; run them small here so those checks can't silently regress.
+import pytest
+
+from benchmarks import bench_chat, bench_compatibility, bench_numerology, bench_writes, load_test
+
+
+def test_numerology_backends_agree():
+    report = bench_numerology.run(rows=2000, repeat=1)
+    assert report["benchmarks"]["calculate_life_path[index]"]["calls_per_second"] > 0
+
+
+def test_compatibility_index_matches_brute_force():
+    report = bench_compatibility.run(users=5000, queries=50)
+    assert report["listed_users"] > 0
+    assert report["top_matches"]["count"] == 50
+
+
+def test_chat_persists_and_pages_every_message():
+    report = bench_chat.run(conversations=50, messages=6, think=0.0, firebase_latency=0.0, page_size=4, sample=50)
+    assert report["messages"] == 300
+    assert report["failed"] == 0
+
+
+def test_queued_writes_lose_nothing_across_token_refreshes():
+    report = bench_writes.run(users=20, token_lifetime=1.0, lifetimes=2, failure_rate=0.2, firebase_latency=0.02)
+    assert report["token_refreshes"] > 0
+    assert report["retries"] > 0
+    assert report["database_writes"] < report["saves"]
+
+
+@pytest.mark.slow
+def test_app_load_test_session_completes():
+    report = load_test.run(sessions=1, timeout=60)
+    assert set(report["latency"]) >= {"login", "profile_update", "calculate_numbers"}
@@ -0,0 +1,59 @@
+import datetime
+import time
+
+from benchmarks.fakes import FakeClock, FakeFirebaseClient
+from compatibility import INDEX_PATH, CompatibilityIndex, bucket_path, profile_bucket
+from write_queue import WriteQueue
+
+DOB = datetime.date(1990, 5, 17)
+
+
+def _index(client, **kwargs):
+    queue = WriteQueue(client.database, debounce=0.0, backoff=0.0, max_attempts=2)
+    return CompatibilityIndex(client.database, queue, **kwargs), queue
+
+
+def test_failed_write_rolls_back_to_stored_listing():
+    client = FakeFirebaseClient(seed=1)
+    index, queue = _index(client)
+    index.update_profile("u1", None, "Asha Rao", DOB)
+    assert queue.flush(timeout=5)
+    stored = index.bucket_of("u1")
+
+    client.write_failure_rate = 1.0
+    index.update_profile("u1", None, "Asha Rao Iyer", DOB)
+    index.update_profile("u1", None, "Asha Rao Iyer", DOB, listed=False)
+    assert not index.is_listed("u1")
+    assert queue.flush(timeout=5)
+
+    assert queue.failure("u1", INDEX_PATH) is not None
+    assert index.bucket_of("u1") == stored
+    assert client.data[INDEX_PATH] == {bucket_path(stored): {"u1": "Asha"}}
+
+
+def test_reload_keeps_queued_changes():
+    client = FakeFirebaseClient()
+    index, queue = _index(client)
+    queue.debounce = 3600 # Keep the write queued
+    index.update_profile("u1", None, "Asha Rao", DOB)
+    index.reload(None)
+    assert index.bucket_of("u1") == profile_bucket("Asha Rao", DOB)
+
+
+def test_stale_index_reloads_in_background():
+    client = FakeFirebaseClient()
+    clock = FakeClock()
+    index, _ = _index(client, reload_seconds=60, clock=clock)
+    index.ensure_loaded(None)
+    other = profile_bucket("Ravi Das", DOB)
+    client.database().child(INDEX_PATH).update({f"{bucket_path(other)}/u2": "Ravi"})
+
+    clock.now += 59
+    index.ensure_loaded(None)
+    assert not index.is_listed("u2")
+    clock.now += 1
+    index.ensure_loaded(None)
+    deadline = time.monotonic() + 5
+    while not index.is_listed("u2") and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert index.bucket_of("u2") == other
@@ -0,0 +1,88 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from benchmarks.fakes import FakeClock, FakeModel
+from interpretation_cache import InterpretationCache
+
+MODEL_NAME = "fake-model"
+
+
+def _interpret(cache, model, prompt):
+    return cache.get_or_compute(model.model_name, prompt, lambda: model.generate_content(prompt).text)
+
+
+def test_entries_expire_after_ttl(tmp_path):
+    clock = FakeClock()
+    cache = InterpretationCache(db_path=tmp_path / "cache.sqlite3", ttl_seconds=60, clock=clock)
+    model = FakeModel(MODEL_NAME)
+
+    text = _interpret(cache, model, "Life Path 7")
+    clock.now += 59
+    assert _interpret(cache, model, "Life Path 7") == text
+    assert model.calls == 1
+
+    clock.now += 2 # Past the TTL in both tiers
+    assert cache.get(MODEL_NAME, "Life Path 7") is None
+    assert _interpret(cache, model, "Life Path 7") == text
+    assert model.calls == 2
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = InterpretationCache(db_path=None, memory_max_entries=2)
+    model = FakeModel(MODEL_NAME)
+
+    _interpret(cache, model, "Life Path 1")
+    _interpret(cache, model, "Life Path 2")
+    _interpret(cache, model, "Life Path 1") # Now the most recently used
+    _interpret(cache, model, "Life Path 3")
+
+    assert cache.get(MODEL_NAME, "Life Path 2") is None
+    assert cache.get(MODEL_NAME, "Life Path 1") is not None
+    assert cache.get(MODEL_NAME, "Life Path 3") is not None
+    assert model.calls == 3
+
+
+def test_sqlite_tier_survives_a_new_instance(tmp_path):
+    db_path = tmp_path / "cache.sqlite3"
+    model = FakeModel(MODEL_NAME)
+    text = _interpret(InterpretationCache(db_path=db_path), model, "Expression 22")
+
+    reopened = InterpretationCache(db_path=db_path)
+    assert _interpret(reopened, model, "  Expression   22 ") == text # Same normalized prompt
+    assert model.calls == 1
+    assert reopened.stats["disk_hits"] == 1
+
+
+def test_concurrent_callers_share_one_model_call(tmp_path):
+    cache = InterpretationCache(db_path=tmp_path / "cache.sqlite3")
+    model = FakeModel(MODEL_NAME, latency=0.2)
+    callers = 8
+    barrier = threading.Barrier(callers)
+
+    def interpret():
+        barrier.wait()
+        return _interpret(cache, model, "Soul Urge 5")
+
+    with ThreadPoolExecutor(max_workers=callers) as executor:
+        results = list(executor.map(lambda _: interpret(), range(callers)))
+
+    assert model.calls == 1
+    assert len(set(results)) == 1
+    assert cache.stats["misses"] == 1
+    assert cache.stats["collapsed"] + cache.stats["memory_hits"] == callers - 1
+
+
+def test_failed_calls_are_not_cached(tmp_path):
+    cache = InterpretationCache(db_path=tmp_path / "cache.sqlite3")
+    model = FakeModel(MODEL_NAME, failure_rate=1.0)
+
+    with pytest.raises(RuntimeError, match="fake model failure"):
+        _interpret(cache, model, "Personality 4")
+    assert cache.get(MODEL_NAME, "Personality 4") is None
+
+    model.failure_rate = 0.0
+    text = _interpret(cache, model, "Personality 4")
+    assert cache.get(MODEL_NAME, "Personality 4") == text
+    assert model.calls == 2
@@ -0,0 +1,28 @@
+import datetime
+
+from natal_chart import BIRTH_PLACES, birth_moment_utc, julian_day, natal_chart
+
+NOON = datetime.time(12, 0)
+
+
+def test_every_birth_place_has_a_known_zone():
+    for place in BIRTH_PLACES:
+        birth_moment_utc(datetime.date(2000, 1, 1), NOON, place)
+
+
+def test_summer_time_is_applied():
+    assert birth_moment_utc(datetime.date(1990, 1, 15), NOON, "New York, USA") == datetime.datetime(1990, 1, 15, 17)
+    assert birth_moment_utc(datetime.date(1990, 7, 15), NOON, "New York, USA") == datetime.datetime(1990, 7, 15, 16)
+    assert birth_moment_utc(datetime.date(1990, 7, 15), NOON, "London, UK") == datetime.datetime(1990, 7, 15, 11)
+
+
+def test_historical_offsets_are_applied():
+    # India kept war time (+6:30) in 1942-45; Nepal used +5:30 until 1986
+    assert birth_moment_utc(datetime.date(1943, 6, 1), NOON, "Delhi, India") == datetime.datetime(1943, 6, 1, 5, 30)
+    assert birth_moment_utc(datetime.date(1990, 6, 1), NOON, "Delhi, India") == datetime.datetime(1990, 6, 1, 6, 30)
+    assert birth_moment_utc(datetime.date(1980, 1, 1), NOON, "Kathmandu, Nepal") == datetime.datetime(1980, 1, 1, 6, 30)
+
+
+def test_chart_uses_the_local_offset():
+    chart = natal_chart(datetime.date(1990, 7, 15), NOON, "New York, USA")
+    assert chart.julian_day == julian_day(datetime.datetime(1990, 7, 15, 16))
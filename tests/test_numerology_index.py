@@ -0,0 +1,21 @@
+import datetime
+
+import numerology_core
+import numerology_index
+from numerology_core import reduce_number
+
+
+def test_index_extends_itself_when_the_date_rolls_over(monkeypatch):
+    today = datetime.date.today()
+    yesterday = today - datetime.timedelta(days=1)
+    # As if the index was built yesterday and midnight has just passed
+    stale = numerology_index.DobIndex(yesterday - datetime.timedelta(days=30), yesterday)
+    monkeypatch.setattr(numerology_index, "_dob_index", stale)
+    monkeypatch.setattr(numerology_index, "_next_rollover", 0.0)
+    monkeypatch.setattr(numerology_core, "_get_dob_index", numerology_index.get_dob_index)
+    assert stale.life_path(today) is None
+
+    expected = reduce_number(reduce_number(today.month) + reduce_number(today.day) + reduce_number(today.year))
+    assert numerology_core.calculate_life_path(today) == expected
+    assert stale.end == today
+    assert stale.life_path(today) == expected
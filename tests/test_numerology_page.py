@@ -0,0 +1,94 @@
+import threading
+import time
+
+import pytest
+
+import interpretation_cache
+import numerology_page
+from benchmarks.fakes import FakeModel
+from numerology_core import NUMEROLOGY_INTERPRETATIONS
+
+NUMBERS = {"Life Path": 7, "Expression": 22, "Soul Urge": 5, "Personality": 4, "Birth Day": 3}
+
+
+class ScriptedModel(FakeModel):
+    """A FakeModel whose latency, or failure, depends on the number label in the prompt."""
+
+    def __init__(self, model_name, delays, failing=()):
+        super().__init__(model_name)
+        self.delays = delays
+        self.failing = failing
+
+    def generate_content(self, prompt):
+        label = next(label for label in NUMBERS if f"{label} Number" in prompt)
+        if label in self.failing:
+            raise RuntimeError("fake model failure")
+        self.latency = self.delays.get(label, 0.0)
+        return super().generate_content(prompt)
+
+
+@pytest.fixture
+def use_model(monkeypatch):
+    monkeypatch.setattr(interpretation_cache, "_cache", interpretation_cache.InterpretationCache(db_path=None))
+
+    def install(model):
+        numerology_page.set_model_factory(lambda model_name: model)
+        return model
+
+    yield install
+    numerology_page.set_model_factory(numerology_page._default_model_factory)
+
+
+def test_slow_and_failing_requests_fall_back_without_holding_up_the_rest(use_model):
+    use_model(ScriptedModel("fake-model", {"Life Path": 0.05, "Expression": 0.15, "Birth Day": 0.25, "Soul Urge": 3.0},
+                            failing=("Personality",)))
+
+    start = time.monotonic()
+    results = list(numerology_page.iter_numerology_interpretations(NUMBERS, "Asha", timeout=0.6))
+    elapsed = time.monotonic() - start
+
+    assert [(label, from_model) for label, _, _, from_model in results] == [
+        ("Personality", False), ("Life Path", True), ("Expression", True), ("Birth Day", True), ("Soul Urge", False),
+    ]
+    texts = {label: text for label, _, text, _ in results}
+    assert texts["Soul Urge"] == NUMEROLOGY_INTERPRETATIONS[5]
+    assert texts["Personality"] == NUMEROLOGY_INTERPRETATIONS[4]
+    assert texts["Life Path"].startswith("[fake-model]")
+    assert elapsed < 1.5 # Didn't wait for the slow call
+
+
+def test_saturated_model_calls_still_fall_back_within_the_deadline(use_model, monkeypatch):
+    use_model(FakeModel("fake-model", latency=0.1))
+    monkeypatch.setattr(numerology_page, "_model_call_slots", threading.BoundedSemaphore(2))
+    release = threading.Event()
+    hung = [threading.Thread(target=numerology_page._cached_interpretation, args=(number, "Other", "Life Path", "fake-model"),
+                             kwargs={"on_call_start": release.wait}, daemon=True) for number in (1, 2)]
+    for thread in hung: # Other sessions' model calls that never return, holding every slot
+        thread.start()
+    while numerology_page._model_call_slots._value:
+        time.sleep(0.01)
+
+    start = time.monotonic()
+    results = list(numerology_page.iter_numerology_interpretations(NUMBERS, "Asha", timeout=5.0, deadline=0.5))
+    elapsed = time.monotonic() - start
+    release.set()
+    for thread in hung:
+        thread.join()
+
+    assert sorted(label for label, _, _, _ in results) == sorted(NUMBERS)
+    assert not any(from_model for _, _, _, from_model in results)
+    assert {label: text for label, _, text, _ in results} == {
+        label: NUMEROLOGY_INTERPRETATIONS[number] for label, number in NUMBERS.items()}
+    assert elapsed < 1.5
+
+
+def test_time_waiting_for_a_slot_does_not_count_against_the_timeout(use_model, monkeypatch):
+    model = use_model(FakeModel("fake-model", latency=0.1))
+    monkeypatch.setattr(numerology_page, "_model_call_slots", threading.BoundedSemaphore(1)) # Calls run one at a time
+
+    numbers = {"Life Path": 7, "Expression": 22, "Soul Urge": 5, "Personality": 4}
+    results = list(numerology_page.iter_numerology_interpretations(numbers, "Asha", timeout=0.25, deadline=5.0))
+
+    assert sorted(label for label, _, _, _ in results) == sorted(numbers)
+    assert all(from_model for _, _, _, from_model in results)
+    assert model.calls == len(numbers)
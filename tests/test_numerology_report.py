@@ -0,0 +1,30 @@
+import json
+
+import pytest
+
+from numerology_report import generate_report
+
+
+def _write_jsonl(path, records):
+    path.write_text("".join(json.dumps(record) + "\n" for record in records), encoding="utf-8")
+
+
+def test_csv_output_rejects_columns_missing_from_the_header(tmp_path):
+    source = tmp_path / "customers.jsonl"
+    _write_jsonl(source, [{"name": "Asha Rao", "dob": "1990-05-17"},
+                          {"name": "Ravi Das", "dob": "1980-01-02", "city": "Pune"}])
+
+    with pytest.raises(ValueError, match="row 2 .*: city"):
+        generate_report(str(source), str(tmp_path / "report.csv"))
+
+
+def test_csv_output_keeps_every_column(tmp_path):
+    source = tmp_path / "customers.jsonl"
+    _write_jsonl(source, [{"name": "Asha Rao", "dob": "1990-05-17", "city": "Pune"},
+                          {"name": "Ravi Das", "dob": "1980-01-02"}])
+    output = tmp_path / "report.csv"
+
+    assert generate_report(str(source), str(output), with_meanings=False)[0] == 2
+    lines = output.read_text(encoding="utf-8").splitlines()
+    assert lines[0] == "name,dob,city,life_path,expression,soul_urge,personality,birth_day"
+    assert lines[2].startswith("Ravi Das,1980-01-02,,")
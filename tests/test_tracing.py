@@ -0,0 +1,22 @@
+import pytest
+
+import tracing
+
+
+class StopRun(Exception):
+    """Stands in for the exception st.rerun()/st.stop() end a run with."""
+
+
+def test_failed_export_does_not_replace_the_exception_ending_the_run(monkeypatch, caplog):
+    def export(path=None):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(tracing, "export", export)
+
+    with pytest.raises(StopRun):
+        with tracing.script_run("script.total"):
+            raise StopRun()
+    with tracing.script_run("script.total"): # A normal run doesn't raise either
+        pass
+
+    assert caplog.text.count("Tracing export failed") == 2
@@ -0,0 +1,34 @@
+import pytest
+
+from benchmarks.fakes import FakeDatabase, FakeFirebaseClient
+from write_queue import WriteQueue
+
+
+class RulesDatabase(FakeDatabase):
+    """Rejects every write under compatibility_index/, like a database rule would."""
+
+    def update(self, data, token=None):
+        if any(key.startswith("compatibility_index/") for key in data):
+            self._take_path()
+            raise Exception('[Errno 401 Client Error: Unauthorized] {"error": "Permission denied"}')
+        return super().update(data, token)
+
+
+def test_batches_per_top_level_path_fail_independently():
+    client = FakeFirebaseClient()
+    queue = WriteQueue(lambda: RulesDatabase(client.data, client._lock), debounce=0.0, backoff=0.0, max_attempts=2)
+    failed = []
+    queue.enqueue("u1", None, {"users/u1/name": "Asha"})
+    queue.enqueue("u1", None, {"compatibility_index/1-3-5/u1": "Asha"}, on_failure=lambda uid, error: failed.append(uid))
+    assert queue.flush(timeout=5)
+
+    assert client.data == {"users": {"u1": {"name": "Asha"}}}
+    assert failed == ["u1"]
+    assert queue.failure("u1", "users") is None
+    assert "Permission denied" in queue.failure("u1", "compatibility_index")
+
+
+def test_one_enqueue_stays_under_one_top_level_path():
+    queue = WriteQueue(FakeFirebaseClient().database)
+    with pytest.raises(ValueError):
+        queue.enqueue("u1", None, {"users/u1/name": "Asha", "compatibility_index/1-3-5/u1": "Asha"})
@@ -0,0 +1,225 @@
+# Lightweight per-rerun tracing: named spans recorded into an in-memory ring buffer,
+# with p50/p95 summaries and export to JSONL or Prometheus text format.
+#
+# Tracing is off unless NAMASKAR_TRACING=1 (or configure(enabled=True) is called).
+# When off, span() returns a shared no-op context manager and @traced functions
+# cost one flag check, so the instrumentation can stay in place permanently.
+import contextlib
+import functools
+import json
+import logging
+import math
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+RING_BUFFER_SIZE = 10000
+
+_enabled = os.environ.get("NAMASKAR_TRACING", "") not in ("", "0", "false", "False")
+_export_path = os.environ.get("NAMASKAR_TRACING_EXPORT") # *.prom -> Prometheus text, anything else -> JSONL
+
+_spans = deque(maxlen=RING_BUFFER_SIZE) # (sequence, name, started_at_epoch, duration_seconds)
+_sequence = 0
+_exported_sequence = 0
+_lock = threading.Lock()
+_export_lock = threading.Lock() # Sessions are threads of one process and may export at the same time
+_runs = threading.local() # .depth: script/fragment runs open on this thread (one script thread per session)
+
+
+def configure(enabled=None, export_path=None, buffer_size=None):
+    """Changes tracing settings at runtime; arguments left as None are unchanged."""
+    global _enabled, _export_path, _spans
+    with _lock:
+        if enabled is not None:
+            _enabled = bool(enabled)
+        if export_path is not None:
+            _export_path = export_path or None
+        if buffer_size is not None and buffer_size != _spans.maxlen:
+            _spans = deque(_spans, maxlen=buffer_size)
+
+
+def is_enabled():
+    return _enabled
+
+
+def record(name, duration, started_at=None):
+    """Adds one finished span to the ring buffer."""
+    global _sequence
+    if started_at is None:
+        started_at = time.time() - duration
+    with _lock:
+        _sequence += 1
+        _spans.append((_sequence, name, started_at, duration))
+
+
+class _Span:
+    __slots__ = ("name", "_started_at", "_start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self._started_at = time.time()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        record(self.name, time.perf_counter() - self._start, self._started_at)
+        return False
+
+    # begin()/finish() for spans that can't be a `with` block (e.g. a whole script run)
+    finish = __exit__
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def finish(self, *exc_info):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def span(name):
+    """Context manager timing the enclosed block as `name`."""
+    if not _enabled:
+        return _NOOP_SPAN
+    return _Span(name)
+
+
+def begin(name):
+    """Starts a span to be closed later with .finish()."""
+    if not _enabled:
+        return _NOOP_SPAN
+    return _Span(name).__enter__()
+
+
+@contextlib.contextmanager
+def script_run(name):
+    """
+    Times a whole script or fragment run as `name`, then exports. Also closes on
+    st.rerun()/st.stop(), which end the run with an exception. Nested runs (a
+    fragment drawn during a full run) only export when the outermost one ends.
+    A failed export is logged, never raised: it must not replace the exception
+    that st.rerun()/st.stop() use to end the run.
+    """
+    depth = getattr(_runs, "depth", 0)
+    _runs.depth = depth + 1
+    try:
+        with span(name):
+            yield
+    finally:
+        _runs.depth = depth
+        if not depth:
+            try:
+                export()
+            except Exception:
+                logger.exception("Tracing export failed")
+
+
+def traced(name=None):
+    """Decorator timing every call of the function (as `name`, default module.qualname)."""
+    def decorator(func):
+        span_name = name or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(span_name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def recent_spans():
+    """Snapshot of the ring buffer as a list of (sequence, name, started_at, duration)."""
+    with _lock:
+        return list(_spans)
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted sequence (also used by benchmarks/)."""
+    rank = math.ceil(fraction * len(sorted_values))
+    return sorted_values[max(0, rank - 1)]
+
+
+def summarize():
+    """{span name: {"count", "p50", "p95", "max", "total"}} over the ring buffer, in seconds."""
+    durations = {}
+    for _, name, _, duration in recent_spans():
+        durations.setdefault(name, []).append(duration)
+    summary = {}
+    for name, values in sorted(durations.items()):
+        values.sort()
+        summary[name] = {
+            "count": len(values),
+            "p50": percentile(values, 0.50),
+            "p95": percentile(values, 0.95),
+            "max": values[-1],
+            "total": sum(values),
+        }
+    return summary
+
+
+def prometheus_text(summary=None):
+    """Span summaries in Prometheus text exposition format."""
+    summary = summarize() if summary is None else summary
+    lines = [
+        "# HELP namaskar_span_seconds Duration of traced spans (recent ring buffer window).",
+        "# TYPE namaskar_span_seconds summary",
+    ]
+    for name, stats in summary.items():
+        label = name.replace("\\", "\\\\").replace('"', '\\"')
+        lines.append(f'namaskar_span_seconds{{span="{label}",quantile="0.5"}} {stats["p50"]:.9f}')
+        lines.append(f'namaskar_span_seconds{{span="{label}",quantile="0.95"}} {stats["p95"]:.9f}')
+        lines.append(f'namaskar_span_seconds_sum{{span="{label}"}} {stats["total"]:.9f}')
+        lines.append(f'namaskar_span_seconds_count{{span="{label}"}} {stats["count"]}')
+    return "\n".join(lines) + "\n"
+
+
+def export(path=None):
+    """
+    Writes metrics to `path` (default: NAMASKAR_TRACING_EXPORT). A .prom file is
+    rewritten with current summaries; any other path gets the spans recorded since
+    the last export appended as JSON lines. No-op when tracing is off or no path is set.
+    """
+    global _exported_sequence
+    path = path or _export_path
+    if not _enabled or not path:
+        return
+    with _export_lock:
+        if path.endswith(".prom"):
+            # Written next to the target under a unique name, then swapped in whole
+            with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=os.path.dirname(os.path.abspath(path)),
+                                             prefix=os.path.basename(path) + ".", suffix=".tmp",
+                                             delete=False) as f:
+                f.write(prometheus_text())
+            try:
+                os.replace(f.name, path)
+            except OSError:
+                os.unlink(f.name)
+                raise
+            return
+        with _lock:
+            new_spans = [s for s in _spans if s[0] > _exported_sequence]
+            if not new_spans:
+                return
+            _exported_sequence = new_spans[-1][0]
+        with open(path, "a", encoding="utf-8") as f:
+            for _, name, started_at, duration in new_spans:
+                f.write(json.dumps({"span": name, "ts": round(started_at, 6), "seconds": round(duration, 9)}) + "\n")
@@ -0,0 +1,227 @@
+# Debounced, batched Realtime Database writes: changes are queued per user and
+# top-level path, merged while they wait, and sent off the render thread as one
+# multi-path update per batch, retried with exponential backoff.
+import atexit
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+DEBOUNCE_SECONDS = 0.5 # How long the first change waits for more from the same user
+FLUSH_WORKERS = 8 # Users written in parallel
+MAX_ATTEMPTS = 5
+RETRY_BACKOFF = 1.0 # Seconds before the first retry; doubled after each failure
+MAX_RETRY_BACKOFF = 30.0
+
+
+def top_level_path(path):
+    """First segment of a root-relative path, e.g. "users" for "users/<uid>/name"."""
+    return path.strip("/").split("/", 1)[0]
+
+
+def resolve_token(id_token):
+    """An ID token from either a token or a zero-argument token provider (e.g. an AuthSession)."""
+    return id_token() if callable(id_token) else id_token
+
+
+class _PendingWrite:
+    __slots__ = ("changes", "id_token", "due", "attempts", "on_success", "on_failure")
+
+    def __init__(self, changes, id_token, due, attempts=0, on_success=(), on_failure=()):
+        self.changes = changes
+        self.id_token = id_token
+        self.due = due
+        self.attempts = attempts
+        self.on_success = list(on_success)
+        self.on_failure = list(on_failure)
+
+    def merge(self, newer):
+        """Takes on a newer write for the same user: its values and token win, callbacks add up."""
+        self.changes.update(newer.changes)
+        self.id_token = newer.id_token
+        self.on_success.extend(newer.on_success)
+        self.on_failure.extend(newer.on_failure)
+
+
+class WriteQueue:
+    """
+    enqueue() takes root-relative multi-path changes for a user under one
+    top-level path, e.g. {"users/<uid>/name": "Asha", "users/<uid>/dob": ...},
+    and returns at once. A writer thread waits `debounce` seconds after the
+    first change queued for a (user, top-level path) batch, so a burst of saves
+    becomes one write (later values win per path), then sends the batch as one
+    update() on the database root. Batches are never merged across top-level
+    paths: a multi-path update is all-or-nothing, and paths under different
+    security rules (e.g. users/ and compatibility_index/) must not be able to
+    fail each other. Batches are written in parallel; one batch's writes never
+    overlap, so they land in order.
+
+    A failed write is put back under any newer changes and retried with
+    exponential backoff. After `max_attempts` it is dropped: its on_failure
+    callbacks run, newest first (so each can undo its own change), and the
+    error is kept for failure(uid, top-level path). Paths in one batch must not
+    be nested in each other (the database rejects such updates).
+    `database_factory` returns a fresh pyrebase Database handle.
+    """
+
+    def __init__(self, database_factory, debounce=DEBOUNCE_SECONDS, workers=FLUSH_WORKERS,
+                 max_attempts=MAX_ATTEMPTS, backoff=RETRY_BACKOFF, max_backoff=MAX_RETRY_BACKOFF,
+                 clock=time.monotonic):
+        self._database_factory = database_factory
+        self.debounce = debounce
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._clock = clock
+        self._pending = {} # (uid, top-level path) -> _PendingWrite
+        self._in_flight = set() # (uid, top-level path) batches being written
+        self._failures = {} # (uid, top-level path) -> error message of the last dropped write
+        self._condition = threading.Condition()
+        self._thread = None
+        self._executor = None
+        self.stats = {"enqueued": 0, "coalesced": 0, "writes": 0, "retries": 0, "failed": 0}
+
+    def enqueue(self, uid, id_token, changes, on_failure=None, on_success=None):
+        """
+        Queues `changes` (all under one top-level path) for `uid`, written with
+        `id_token` (a token or a token provider, resolved when the write is sent).
+        `on_success(uid)` is called once the changes are stored,
+        `on_failure(uid, error)` if the write is finally dropped. Callbacks run
+        on a writer thread.
+        """
+        roots = {top_level_path(path) for path in changes}
+        if len(roots) != 1:
+            raise ValueError(f"Queue changes under different top-level paths separately, got {sorted(roots)}")
+        key = (uid, roots.pop())
+        write = _PendingWrite(dict(changes), id_token, self._clock() + self.debounce,
+                              on_success=[on_success] if on_success else (),
+                              on_failure=[on_failure] if on_failure else ())
+        with self._condition:
+            self._start()
+            self.stats["enqueued"] += 1
+            pending = self._pending.get(key)
+            if pending is None:
+                self._pending[key] = write
+            else:
+                self.stats["coalesced"] += 1
+                pending.merge(write) # The newest token provider is the likeliest to still work
+            self._condition.notify()
+
+    def pending_changes(self, uid):
+        """Changes queued (not yet sent) for `uid`, under every top-level path."""
+        with self._condition:
+            changes = {}
+            for (pending_uid, _), pending in self._pending.items():
+                if pending_uid == uid:
+                    changes.update(pending.changes)
+            return changes
+
+    def failure(self, uid, root):
+        """Pops the error of the last write for `uid` under top-level path `root` that was given up on, if any."""
+        with self._condition:
+            return self._failures.pop((uid, root), None)
+
+    def flush(self, timeout=None):
+        """Sends everything queued now (skipping the debounce) and waits until all writes have settled."""
+        deadline = None if timeout is None else self._clock() + timeout
+        with self._condition:
+            for pending in self._pending.values():
+                pending.due = min(pending.due, self._clock())
+            self._condition.notify_all()
+            while self._pending or self._in_flight:
+                remaining = None if deadline is None else deadline - self._clock()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def __len__(self):
+        with self._condition:
+            return len(self._pending) + len(self._in_flight)
+
+    # --- Writer thread ---
+    def _start(self):
+        # Called with the condition held
+        if self._thread is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="db-writer")
+            self._thread = threading.Thread(target=self._run, name="write-queue", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                due = self._take_due()
+                while not due:
+                    waits = [pending.due - self._clock() for key, pending in self._pending.items()
+                             if key not in self._in_flight]
+                    self._condition.wait(max(0.0, min(waits)) if waits else None)
+                    due = self._take_due()
+                self._in_flight.update(due)
+            for key, pending in due.items():
+                self._executor.submit(self._write, key, pending)
+
+    def _take_due(self):
+        now = self._clock()
+        due = {key: pending for key, pending in self._pending.items()
+               if pending.due <= now and key not in self._in_flight}
+        for key in due:
+            del self._pending[key]
+        return due
+
+    def _write(self, key, pending):
+        uid, root = key
+        error = None
+        try:
+            self._database_factory().update(pending.changes, resolve_token(pending.id_token))
+        except Exception as e:
+            error = e
+        with self._condition:
+            if error is None:
+                self.stats["writes"] += 1
+                callbacks = [(callback, (uid,)) for callback in pending.on_success]
+            elif pending.attempts + 1 < self.max_attempts:
+                self.stats["retries"] += 1
+                delay = min(self.max_backoff, self.backoff * 2 ** pending.attempts)
+                newer = self._pending.get(key)
+                if newer is not None: # Keep what changed since; it overrides the failed values
+                    pending.merge(newer)
+                pending.attempts += 1
+                pending.due = self._clock() + delay
+                self._pending[key] = pending
+                self._in_flight.discard(key)
+                self._condition.notify_all()
+                logger.warning("Write of %s for %s failed (attempt %d), retrying in %.1fs: %s",
+                               root, uid, pending.attempts, delay, error)
+                return
+            else:
+                self.stats["failed"] += 1
+                self._failures[key] = str(error)
+                callbacks = [(callback, (uid, error)) for callback in reversed(pending.on_failure)]
+                logger.error("Dropping write of %s for %s after %d attempts: %s", root, uid, pending.attempts + 1, error)
+        # Outside the lock, but the batch stays in flight until they are done, so flush() waits for them
+        for callback, args in callbacks:
+            try:
+                callback(*args)
+            except Exception:
+                logger.exception("Write callback for %s failed", uid)
+        with self._condition:
+            self._in_flight.discard(key)
+            self._condition.notify_all()
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_write_queue(database_factory):
+    """Returns the process-wide WriteQueue, creating it on first call."""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = WriteQueue(database_factory)
+                atexit.register(_queue.flush, timeout=30) # Send what is still queued on shutdown
+    return _queue